@@ -4,6 +4,8 @@ import requests
 import zipfile
 from datetime import datetime, timedelta
 
+from utils.instrumentation import instrument
+
 # Obtener la ruta absoluta de la carpeta donde se encuentra este script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DOWNLOAD_FOLDER = os.path.join(BASE_DIR, "downloads")
@@ -30,10 +32,11 @@ def generate_urls(start_date, end_date):
 
     return urls
 
-def download_file(url):
+@instrument()
+def download_file(url, folder=DOWNLOAD_FOLDER):
     """Descarga un archivo desde una URL."""
     filename = url.split("/")[-1]
-    filepath = os.path.join(DOWNLOAD_FOLDER, filename)
+    filepath = os.path.join(folder, filename)
 
     try:
         response = requests.get(url, stream=True, timeout=10)
@@ -49,7 +52,8 @@ def download_file(url):
         print(f"Error al descargar {filename}: {str(e)}")
         return None
 
-def process_file(filepath):
+@instrument()
+def process_file(filepath, folder=DOWNLOAD_FOLDER):
     """Procesa el archivo descargado (ZIP o XLSX)."""
     if not filepath:
         return
@@ -57,7 +61,7 @@ def process_file(filepath):
     if filepath.endswith('.zip'):
         try:
             with zipfile.ZipFile(filepath, "r") as zip_ref:
-                zip_ref.extractall(DOWNLOAD_FOLDER)
+                zip_ref.extractall(folder)
                 print(f"Extraído: {os.path.basename(filepath)}")
                 print("Archivos extraídos:", zip_ref.namelist())
             os.remove(filepath)
@@ -1,8 +1,16 @@
 import os
 import pyexcel as pe
 
+from utils.instrumentation import instrument
+
 FOLDER = "downloads"
 
+def convertir_archivo(ruta_xls, ruta_xlsx):
+    """Convierte un libro .xls a .xlsx."""
+    libro = pe.get_book(file_name=ruta_xls)
+    libro.save_as(ruta_xlsx)
+
+@instrument()
 def convertir_todos_los_xls(carpeta):
     for archivo in os.listdir(carpeta):
         if archivo.endswith(".xls"):
@@ -15,12 +23,11 @@ def convertir_todos_los_xls(carpeta):
                 continue
 
             try:
-                libro = pe.get_book(file_name=ruta_xls)
-                libro.save_as(ruta_xlsx)
+                convertir_archivo(ruta_xls, ruta_xlsx)
                 print(f"Convertido exitosamente: {ruta_xlsx}")
             except Exception as e:
                 print(f"Error al convertir {ruta_xls}: {e}")
 
 # Ejecutar conversión
-convertir_todos_los_xls(FOLDER)
-
+if __name__ == "__main__":
+    convertir_todos_los_xls(FOLDER)
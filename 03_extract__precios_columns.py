@@ -1,5 +1,8 @@
 import os
-import pandas as pd
+
+from pipeline.normalizar import extraer_columnas
+from utils.instrumentation import count_classes, count_rows, instrument
+from utils.spreadsheet import write_sheet
 
 # Obtener la ruta absoluta de la carpeta donde se encuentra este script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -8,6 +11,24 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DOWNLOAD_FOLDER = os.path.join(BASE_DIR, "downloads")
 
 
+def extract_file(filepath, output_file):
+    """Extrae las columnas de precios de energía y potencia de un archivo c_iny y las guarda en output_file."""
+    # Leer por filas sólo las columnas necesarias (por índice), sin las filas basura
+    df, conteo = extraer_columnas(filepath, [0, 2, 6])
+
+    # Renombrar columnas
+    df.columns = [
+        "AGENTE",
+        "Precio Energía USD/MWh",
+        "Precio Potencia USD/kW",
+    ]
+
+    count_rows(rows_in=sum(conteo.values()), rows_out=len(df))
+    count_classes(conteo)
+    write_sheet(df, output_file)
+
+
+@instrument("extract_columns_and_save:precios")
 def extract_columns_and_save(folder):
     """
     Extrae las columnas CENTRAL, Peaje filiales ENDE US$/MWh y PROMEDIO US$/MWh
@@ -32,22 +53,9 @@ def extract_columns_and_save(folder):
             # Procesar archivo
             filepath = os.path.join(folder, file)
             try:
-                # Leer el archivo Excel
-                df = pd.read_excel(filepath)
-
-                # Seleccionar columnas específicas por índice
-                df = df.iloc[:, [0, 2, 6]]
-
-                # Renombrar columnas
-                df.columns = [
-                    "AGENTE",
-                    "Precio Energía USD/MWh",
-                    "Precio Potencia USD/kW",
-                ]
-
                 # Guardar archivo con las columnas extraídas
                 output_file = os.path.join(folder, f"extracted_precios_{file}")
-                df.to_excel(output_file, index=False)
+                extract_file(filepath, output_file)
                 print(f"✅ Archivo {file} procesado y guardado como {output_file}.")
             except Exception as e:
                 print(f"❌ Error al procesar {file}: {e}")
@@ -1,95 +1,81 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
 from pathlib import Path
 
+from utils.anomalies import anomalies_version, central_anomalies, mark_anomalies
+from utils.charts import bar_text_auto, downsample, line_options
+from utils.figure_cache import cached_figure
+from utils.forecast import render_central_forecast
+from utils.instrumentation import count_rows, instrument
+from utils.live_data import LoadError, live_dataset
+from utils.perf_panel import begin_rerun, render_panel, timed_load, timer
+from utils.query import query
+from utils.spreadsheet import read_sheet
+from utils.transform import melt_measure, names_by_id
+from utils.trends import render_system_trend
+
+DATASET = "serie_energia"
+PAGE = Path(__file__).stem
+
 # Configuración de la página
 st.set_page_config(page_title="Dashboard de Energía", layout="wide")
 st.title("Análisis Integral de Energía por Tecnología")
 
 # 1. Optimización de carga de datos con manejo de nombres de columnas
-@st.cache_data
+@instrument(f"pagina:{PAGE}")
 def load_and_transform_data():
-    try:
-        # Ruta optimizada usando Path
-        current_dir = Path(__file__).parent
-        file_path = current_dir.parent / "data" / "serie_energia.xlsx"
-        
-        # Validación de ruta
-        if not file_path.exists():
-            st.error(f"Archivo no encontrado: {file_path}")
-            return None
-            
-        # Leer todo el archivo para inspeccionar columnas
-        df_full = pd.read_excel(file_path, engine="openpyxl", nrows=1)
-        available_columns = df_full.columns.tolist()
-        
-        # Buscar columna de tecnología (manejar diferentes nombres)
-        tech_col = None
-        possible_names = ['TECNOLOGÍA', 'TECNOLOGIA', 'TECNOLOGÍA', 'TIPO', 'TECNOLOGIA', 'TEC']
-        for name in possible_names:
-            if name in available_columns:
-                tech_col = name
-                break
+    # Ruta optimizada usando Path
+    current_dir = Path(__file__).parent
+    file_path = current_dir.parent / "data" / f"{DATASET}.xlsx"
+    
+    # Validación de ruta
+    if not file_path.exists():
+        raise LoadError(f"Archivo no encontrado: {file_path}")
         
-        if not tech_col:
-            st.error(f"No se encontró columna de tecnología. Columnas disponibles: {available_columns}")
-            return None
-            
-        # Leer solo columnas necesarias usando el nombre encontrado
-        df = pd.read_excel(file_path, engine="openpyxl", 
-                          usecols=lambda x: "Energía kWh" in x or x in ['CENTRAL', tech_col])
+    # Leer todo el archivo para inspeccionar columnas
+    df_full = read_sheet(file_path, nrows=1)
+    available_columns = df_full.columns.tolist()
+    
+    # Buscar columna de tecnología (manejar diferentes nombres)
+    tech_col = None
+    possible_names = ['TECNOLOGÍA', 'TECNOLOGIA', 'TECNOLOGÍA', 'TIPO', 'TECNOLOGIA', 'TEC']
+    for name in possible_names:
+        if name in available_columns:
+            tech_col = name
+            break
+    
+    if not tech_col:
+        raise LoadError(f"No se encontró columna de tecnología. Columnas disponibles: {available_columns}")
         
-        if df.empty:
-            st.error("El archivo está vacío")
-            return None
+    # Leer solo columnas necesarias usando el nombre encontrado
+    df = read_sheet(file_path, 
+                   usecols=lambda x: "Energía kWh" in x or x in ['CENTRAL', tech_col, 'central_id', 'tecnologia_id'])
+    
+    count_rows(rows_in=len(df))
+    if df.empty:
+        raise LoadError("El archivo está vacío")
 
-        # 2. Transformación vectorizada
-        df.columns = df.columns.str.strip()
-        energy_cols = [col for col in df.columns if "Energía kWh" in col]
-        
-        # Renombrar columna de tecnología a nombre consistente
-        df = df.rename(columns={tech_col: 'TECNOLOGIA'})
-        
-        # Crear mapeo de fechas optimizado
-        date_mapping = {}
-        current_date = datetime(2023, 1, 1)
-        while current_date <= datetime(2025, 12, 1):
-            key = current_date.strftime('%m%Y')
-            date_mapping[key] = current_date.strftime('%Y-%m-01')
-            # Avanzar al siguiente mes
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
-
-        # Transformación con melt
-        melted = df.melt(
-            id_vars=['CENTRAL', 'TECNOLOGIA'],
-            value_vars=energy_cols,
-            var_name='Periodo',
-            value_name='Energía kWh'
-        )
-        
-        # Extraer periodo y mapear fecha
-        melted['Periodo'] = melted['Periodo'].str.split().str[-1]
-        melted['FECHA'] = melted['Periodo'].apply(
-            lambda x: date_mapping.get(x[:2] + x[2:], pd.NaT)
-        )
-        
-        # Filtrar y convertir fechas
-        melted = melted[melted['FECHA'].notna()]
-        melted['FECHA'] = pd.to_datetime(melted['FECHA'])
-        
-        return melted
+    # 2. Transformación vectorizada
+    df.columns = df.columns.str.strip()
+    
+    # Renombrar columna de tecnología a nombre consistente
+    df = df.rename(columns={tech_col: 'TECNOLOGIA'})
 
-    except Exception as e:
-        st.error(f"Error al cargar datos: {str(e)}")
-        return None
+    # Ids de pipeline.claves: la página agrupa y filtra por id y muestra los nombres
+    ids = ['central_id', 'tecnologia_id']
+    if not set(ids) <= set(df.columns):
+        raise LoadError("La serie no tiene ids de pipeline.claves: regenerarla con python -m pipeline")
+    df[ids] = df[ids].astype('Int32')
+    
+    # Transformación con melt y parseo vectorizado de periodos (sin horizonte fijo)
+    melted = melt_measure(df, 'Energía kWh', id_vars=['CENTRAL', 'TECNOLOGIA', 'central_id', 'tecnologia_id'], dropna=False)
+    
+    return melted
 
 # Cargar datos
-df = load_and_transform_data()
+begin_rerun(PAGE)
+df = timed_load(lambda: live_dataset(PAGE, DATASET, load_and_transform_data))
 if df is None:
     st.stop()
 
@@ -110,23 +96,38 @@ if not df.empty:
     )
     
     # Filtrar DataFrame
-    mask = (df['FECHA'] >= pd.Timestamp(selected_range[0])) & (df['FECHA'] <= pd.Timestamp(selected_range[1]))
-    df_filtered = df[mask].copy()
+    with timer("filtro de fechas", "filtro"):
+        mask = (df['FECHA'] >= pd.Timestamp(selected_range[0])) & (df['FECHA'] <= pd.Timestamp(selected_range[1]))
+        df_filtered = df[mask].copy()
 else:
     df_filtered = df
     st.warning("No hay datos disponibles para filtrar")
 
 # 4. Pre-cálculos globales
 total_energia_sistema = df_filtered['Energía kWh'].sum()
-tecnologias = df_filtered['TECNOLOGIA'].unique().tolist()
+tecnologias = names_by_id(df_filtered, 'tecnologia_id', 'TECNOLOGIA')
 
-# Selección de tecnología
-selected_tecnologia = st.sidebar.selectbox("Seleccionar Tecnología", tecnologias)
-centrales_disponibles = df_filtered[df_filtered['TECNOLOGIA'] == selected_tecnologia]['CENTRAL'].unique().tolist()
-selected_central = st.sidebar.selectbox("Seleccionar Central", centrales_disponibles)
+# Selección de tecnología (por id, mostrando el nombre)
+selected_tecnologia_id = st.sidebar.selectbox(
+    "Seleccionar Tecnología", tecnologias.index.tolist(), format_func=tecnologias.get
+)
+selected_tecnologia = tecnologias.get(selected_tecnologia_id)
+centrales_disponibles = names_by_id(
+    df_filtered[df_filtered['tecnologia_id'] == selected_tecnologia_id], 'central_id', 'CENTRAL'
+)
+selected_central_id = st.sidebar.selectbox(
+    "Seleccionar Central", centrales_disponibles.index.tolist(), format_func=centrales_disponibles.get
+)
+selected_central = centrales_disponibles.get(selected_central_id)
 
 # Layout principal
-tab1, tab2 = st.tabs(["Visión Detallada", "Visión de Promedios"])
+# Selector de vista: solo se calcula la sección visible (st.tabs ejecuta ambas)
+vista = st.radio(
+    "Vista",
+    ["Visión Detallada", "Visión de Promedios"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
 # 5. Funciones para gráficos
 def plot_central_energy(df_central, central_name):
@@ -180,18 +181,108 @@ def plot_tecnologia_energy(df_tecnologia, tecnologia_name):
     )
     return fig
 
+def plot_sistema_energy(df_sistema):
+    """Crea gráfico de barras con la evolución del sistema"""
+    fig = px.bar(
+        df_sistema,
+        x='FECHA',
+        y='Energía kWh',
+        color='Energía kWh',
+        color_continuous_scale='cividis',
+        title="Evolución de la Energía Móvil del Sistema",
+        text_auto=bar_text_auto(len(df_sistema))
+    )
+
+    fig.update_traces(
+        textposition='inside',
+        textfont=dict(size=16, color='white'))
+
+    fig.update_layout(
+        yaxis_title="Potencia kW", 
+        xaxis_title="Fecha", 
+        showlegend=False, 
+        bargap=0.2
+    )
+    return fig
+
+def plot_participacion_energy(df, total):
+    """Crea gráfico de barras horizontales con la participación por tecnología"""
+    participacion = (
+        df.groupby('tecnologia_id', as_index=False)['Energía kWh']
+        .sum()
+        .assign(TECNOLOGIA=lambda x: x['tecnologia_id'].map(names_by_id(df, 'tecnologia_id', 'TECNOLOGIA')))
+        .assign(Porcentaje=lambda x: (x['Energía kWh'] / total) * 100)
+        .sort_values('Porcentaje', ascending=False)
+    )
+
+    fig = px.bar(
+        participacion,
+        x='Porcentaje',
+        y='TECNOLOGIA',
+        orientation='h',
+        color='Porcentaje',
+        color_continuous_scale='Oranges',
+        text='Porcentaje',
+        labels={'Porcentaje': 'Participación (%)', 'TECNOLOGIA': ''}
+    )
+
+    fig.update_traces(
+        texttemplate='%{x:.2f}%',
+        textposition='outside',
+        marker_line=dict(color='#000', width=0.5)
+    )
+
+    fig.update_layout(
+        height=600,
+        xaxis_range=[0, participacion['Porcentaje'].max() * 1.15],
+        yaxis={'categoryorder': 'total ascending'},
+        showlegend=False
+    )
+    return fig
+
+def plot_comparativo_energy(df):
+    """Crea gráfico comparativo por tecnología"""
+    df_comparacion = (
+        df.groupby(['FECHA', 'tecnologia_id'], as_index=False)
+        ['Energía kWh'].sum()
+    )
+    df_comparacion = downsample(df_comparacion, 'FECHA', 'Energía kWh', by='tecnologia_id')
+    df_comparacion['TECNOLOGIA'] = df_comparacion['tecnologia_id'].map(names_by_id(df, 'tecnologia_id', 'TECNOLOGIA'))
+
+    fig = px.line(
+        df_comparacion,
+        x='FECHA',
+        y='Energía kWh',
+        color='TECNOLOGIA',
+        **line_options(len(df_comparacion)),
+        title="Comparación de Energía por Tecnología"
+    )
+
+    fig.update_layout(
+        yaxis_title="Energía (kWh)",
+        xaxis_title="Fecha",
+        legend_title="Tecnologías",
+        height=500
+    )
+    return fig
+
 # 6. Contenido para pestañas
-with tab1:
+if vista == "Visión Detallada":
     col_left, col_right = st.columns(2)
     
     # Columna izquierda - Central
     with col_left:
         st.subheader(f"Evolución de la Central: {selected_central}")
-        df_central = df_filtered[df_filtered['CENTRAL'] == selected_central]
+        df_central = df_filtered[df_filtered['central_id'] == selected_central_id]
         
         if not df_central.empty:
             # Gráfico
-            fig_central = plot_central_energy(df_central, selected_central)
+            # Puntos marcados por pipeline.anomalias
+            flags_central = central_anomalies('Energía kWh', selected_central_id, selected_range)
+            fig_central = cached_figure(
+                DATASET, (PAGE, 'central', selected_central_id, selected_range, anomalies_version()),
+                lambda: mark_anomalies(plot_central_energy(df_central, selected_central), flags_central, 'Energía kWh')
+            )
             st.plotly_chart(fig_central, use_container_width=True)
             
             # Métricas optimizadas
@@ -202,22 +293,32 @@ with tab1:
             col1, col2 = st.columns(2)
             col1.metric("Energía Promedio", f"{energia_promedio_central:,.2f} kWh")
             col2.metric("Participación", f"{porcentaje_central:.2f}%")
+
+            # Pronósticos precalculados (pipeline.pronostico)
+            render_central_forecast(PAGE, DATASET, 'Energía kWh', selected_central_id, selected_central, df_central)
         else:
             st.warning(f"No hay datos para: {selected_central}")
     
     # Columna derecha - Tecnología
     with col_right:
         st.subheader(f"Evolución de la Tecnología: {selected_tecnologia}")
-        df_tecnologia = df_filtered[df_filtered['TECNOLOGIA'] == selected_tecnologia]
+        df_tecnologia = df_filtered[df_filtered['tecnologia_id'] == selected_tecnologia_id]
         
         if not df_tecnologia.empty:
             # Gráfico
-            fig_tecnologia = plot_tecnologia_energy(df_tecnologia, selected_tecnologia)
+            fig_tecnologia = cached_figure(
+                DATASET, (PAGE, 'tecnologia', selected_tecnologia_id, selected_range),
+                lambda: plot_tecnologia_energy(df_tecnologia, selected_tecnologia)
+            )
             st.plotly_chart(fig_tecnologia, use_container_width=True)
             
             # Métricas optimizadas
             energia_total_tecnologia = df_tecnologia['Energía kWh'].sum()
-            energia_promedio_tecnologia = df_tecnologia.groupby('FECHA')['Energía kWh'].sum().mean()
+            with timer("energia_promedio_tecnologia", "consulta"):
+                energia_promedio_tecnologia = query(
+                    DATASET, 'Energía kWh', by=['FECHA'], fechas=selected_range,
+                    filtros={'tecnologia_id': selected_tecnologia_id}, df=df
+                )['Energía kWh'].mean()
             porcentaje_tecnologia = (energia_total_tecnologia / total_energia_sistema) * 100
             
             col1, col2 = st.columns(2)
@@ -230,126 +331,76 @@ with tab1:
     st.subheader("Evolución del Sistema")
 
     if not df_filtered.empty:
-        df_sistema = df_filtered.groupby('FECHA')['Energía kWh'].sum().reset_index()
+        with timer("df_sistema", "consulta"):
+            df_sistema = query(DATASET, 'Energía kWh', by=['FECHA'], fechas=selected_range, df=df)
         df_sistema['Energía kWh'] = df_sistema['Energía kWh'].round(2)
         energia_promedio_sistema = df_sistema['Energía kWh'].mean()
 
-        fig_sistema = px.bar(
-            df_sistema,
-            x='FECHA',
-            y='Energía kWh',
-            color='Energía kWh',
-            color_continuous_scale='cividis',
-            title="Evolución de la Energía Móvil del Sistema",
-            text_auto=True
-        )
-        
-        fig_sistema.update_traces(
-            textposition='inside',
-            textfont=dict(size=16, color='white'))
-        
-        fig_sistema.update_layout(
-            yaxis_title="Potencia kW", 
-            xaxis_title="Fecha", 
-            showlegend=False, 
-            bargap=0.2
+        fig_sistema = cached_figure(
+            DATASET, (PAGE, 'sistema', selected_range),
+            lambda: plot_sistema_energy(df_sistema)
         )
         st.plotly_chart(fig_sistema, use_container_width=True)
 
         st.metric(label="Energía Promedio del Sistema", value=f"{energia_promedio_sistema:,.2f} MWh")
+
+        # Vistas móviles, interanuales y acumuladas precalculadas (pipeline.tendencias)
+        render_system_trend(PAGE, DATASET, 'Energía kWh', selected_range)
     else:
         st.warning("No hay datos disponibles para mostrar la evolución del sistema")
     
     # Participación por tecnología
     st.subheader("Participación por Tecnología")
     if not df_filtered.empty:
-        participacion = (
-            df_filtered.groupby('TECNOLOGIA', as_index=False)['Energía kWh']
-            .sum()
-            .assign(Porcentaje=lambda x: (x['Energía kWh'] / total_energia_sistema) * 100)
-            .sort_values('Porcentaje', ascending=False)
-        )
-        
-        fig_bar = px.bar(
-            participacion,
-            x='Porcentaje',
-            y='TECNOLOGIA',
-            orientation='h',
-            color='Porcentaje',
-            color_continuous_scale='Oranges',
-            text='Porcentaje',
-            labels={'Porcentaje': 'Participación (%)', 'TECNOLOGIA': ''}
-        )
-        
-        fig_bar.update_traces(
-            texttemplate='%{x:.2f}%',
-            textposition='outside',
-            marker_line=dict(color='#000', width=0.5)
-        )
-        
-        fig_bar.update_layout(
-            height=600,
-            xaxis_range=[0, participacion['Porcentaje'].max() * 1.15],
-            yaxis={'categoryorder': 'total ascending'},
-            showlegend=False
+        fig_bar = cached_figure(
+            DATASET, (PAGE, 'participacion', selected_range),
+            lambda: plot_participacion_energy(df_filtered, total_energia_sistema)
         )
-        
         st.plotly_chart(fig_bar, use_container_width=True)
     else:
         st.warning("Datos insuficientes para participación")
 
 # 7. Pestaña de comparación
-with tab2:
+else:
     st.header("Análisis Comparativo")
     
     if not df_filtered.empty:
         # Gráfico comparativo de tecnologías
         st.subheader("Comparación entre Tecnologías")
         
-        df_comparacion = (
-            df_filtered.groupby(['FECHA', 'TECNOLOGIA'], as_index=False)
-            ['Energía kWh'].sum()
-        )
-        
-        fig_comparativo = px.line(
-            df_comparacion,
-            x='FECHA',
-            y='Energía kWh',
-            color='TECNOLOGIA',
-            markers=True,
-            line_shape='spline',
-            title="Comparación de Energía por Tecnología"
-        )
-        
-        fig_comparativo.update_layout(
-            yaxis_title="Energía (kWh)",
-            xaxis_title="Fecha",
-            legend_title="Tecnologías",
-            height=500
+        fig_comparativo = cached_figure(
+            DATASET, (PAGE, 'comparativo', selected_range),
+            lambda: plot_comparativo_energy(df_filtered)
         )
         st.plotly_chart(fig_comparativo, use_container_width=True)
         
         # Tabla de resumen
         st.subheader("Resumen Estadístico por Tecnología")
 
-        total_por_mes = df_filtered.groupby('FECHA', as_index=False, sort=False)['Energía kWh'].sum()
+        with timer("total_por_mes", "consulta"):
+            total_por_mes = query(DATASET, 'Energía kWh', by=['FECHA'], fechas=selected_range, df=df)
         total_por_mes = total_por_mes.rename(columns={'Energía kWh': 'Total_Sistema'})
 
-        tecnologia_por_mes = df_filtered.groupby(['FECHA', 'TECNOLOGIA'], as_index=False)['Energía kWh'].sum()
+        with timer("tecnologia_por_mes", "consulta"):
+            tecnologia_por_mes = query(
+                DATASET, 'Energía kWh', by=['FECHA', 'tecnologia_id'], fechas=selected_range, df=df
+            )
 
         df_participacion = pd.merge(tecnologia_por_mes, total_por_mes, on='FECHA')
         df_participacion['Participacion'] = (df_participacion['Energía kWh'] / df_participacion['Total_Sistema']) * 100
 
-        stats = (
-            df_participacion.groupby('TECNOLOGIA', as_index=False)
-            .agg(
-                Minimo=('Energía kWh', 'min'),
-                Promedio=('Energía kWh', 'mean'),
-                Maximo=('Energía kWh', 'max'),
-                Participacion_Promedio=('Participacion', 'mean')
+        with timer("stats", "groupby"):
+            stats = (
+                df_participacion.groupby('tecnologia_id', as_index=False)
+                .agg(
+                    Minimo=('Energía kWh', 'min'),
+                    Promedio=('Energía kWh', 'mean'),
+                    Maximo=('Energía kWh', 'max'),
+                    Participacion_Promedio=('Participacion', 'mean')
+                )
             )
-        )
 
+        stats.insert(0, 'TECNOLOGIA', stats.pop('tecnologia_id').map(tecnologias))
         stats = stats.sort_values(by='Participacion_Promedio', ascending=False)
 
         stats = stats.rename(columns={
@@ -371,9 +422,11 @@ with tab2:
 st.sidebar.markdown("---")
 st.sidebar.subheader("Métricas del Sistema")
 if not df_filtered.empty:
-    st.sidebar.metric("Centrales", df_filtered['CENTRAL'].nunique())
+    st.sidebar.metric("Centrales", df_filtered['central_id'].nunique())
     st.sidebar.metric("Tecnologías", len(tecnologias))
     st.sidebar.metric("Energía Total", f"{total_energia_sistema:,.2f} kWh")
     st.sidebar.caption(f"Periodo: {df_filtered['FECHA'].min().strftime('%Y-%m')} a {df_filtered['FECHA'].max().strftime('%Y-%m')}")
 else:
-    st.sidebar.warning("Sin datos para mostrar métricas")
\ No newline at end of file
+    st.sidebar.warning("Sin datos para mostrar métricas")
+
+render_panel()
@@ -1,72 +1,63 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
 from pathlib import Path
 
+from utils.anomalies import anomalies_version, central_anomalies, mark_anomalies
+from utils.charts import bar_text_auto, downsample, line_options
+from utils.figure_cache import cached_figure
+from utils.forecast import render_central_forecast
+from utils.instrumentation import count_rows, instrument
+from utils.live_data import LoadError, live_dataset
+from utils.perf_panel import begin_rerun, render_panel, timed_load, timer
+from utils.query import query
+from utils.spreadsheet import read_sheet
+from utils.transform import melt_measure, names_by_id
+from utils.trends import render_system_trend
+
+DATASET = "serie_potencia"
+PAGE = Path(__file__).stem
+
 # Configuración de la página
 st.set_page_config(page_title="Dashboard de Potencia", layout="wide")
 st.title("Análisis Integral de Potencia")
 
 # 1. Optimización de carga de datos
-@st.cache_data
+@instrument(f"pagina:{PAGE}")
 def load_and_transform_data():
-    try:
-        # Ruta optimizada usando Path
-        current_dir = Path(__file__).parent
-        file_path = current_dir.parent / "data" / "serie_potencia.xlsx"
-        
-        # Validación de ruta
-        if not file_path.exists():
-            st.error(f"Archivo no encontrado: {file_path}")
-            return None
-            
-        # Leer solo columnas necesarias (cambiar a Potencia kW)
-        df = pd.read_excel(file_path, engine="openpyxl", 
-                          usecols=lambda x: "Potencia kW" in x or x in ['CENTRAL', 'GENERADOR'])
+    # Ruta optimizada usando Path
+    current_dir = Path(__file__).parent
+    file_path = current_dir.parent / "data" / f"{DATASET}.xlsx"
+    
+    # Validación de ruta
+    if not file_path.exists():
+        raise LoadError(f"Archivo no encontrado: {file_path}")
         
-        if df.empty:
-            st.error("El archivo está vacío")
-            return None
+    # Leer solo columnas necesarias (cambiar a Potencia kW)
+    df = read_sheet(file_path, 
+                   usecols=lambda x: "Potencia kW" in x or x in ['CENTRAL', 'GENERADOR', 'central_id', 'generador_id'])
+    
+    count_rows(rows_in=len(df))
+    if df.empty:
+        raise LoadError("El archivo está vacío")
 
-        # 2. Transformación vectorizada
-        df.columns = df.columns.str.strip()
-        potencia_cols = [col for col in df.columns if "Potencia kW" in col]
-        
-        # Crear mapeo de fechas optimizado
-        date_mapping = {}
-        current_date = datetime(2023, 1, 1)
-        while current_date <= datetime(2025, 12, 1):
-            key = current_date.strftime('%m%Y')
-            date_mapping[key] = current_date.strftime('%Y-%m-01')
-            current_date = current_date.replace(month=current_date.month + 1) if current_date.month < 12 else current_date.replace(year=current_date.year + 1, month=1)
-
-        # Transformación con melt (cambiar nombre de valor)
-        melted = df.melt(
-            id_vars=['CENTRAL', 'GENERADOR'],
-            value_vars=potencia_cols,
-            var_name='Periodo',
-            value_name='Potencia kW'
-        )
-        
-        # Extraer periodo y mapear fecha
-        melted['Periodo'] = melted['Periodo'].str.split().str[-1]
-        melted['FECHA'] = melted['Periodo'].apply(
-            lambda x: date_mapping.get(x[:2] + x[2:], pd.NaT)
-        )
-        
-        # Filtrar y convertir fechas
-        melted = melted[melted['FECHA'].notna()]
-        melted['FECHA'] = pd.to_datetime(melted['FECHA'])
-        
-        return melted
+    # 2. Transformación vectorizada
+    df.columns = df.columns.str.strip()
 
-    except Exception as e:
-        st.error(f"Error al cargar datos: {str(e)}")
-        return None
+    # Ids de pipeline.claves: la página agrupa y filtra por id y muestra los nombres
+    ids = ['central_id', 'generador_id']
+    if not set(ids) <= set(df.columns):
+        raise LoadError("La serie no tiene ids de pipeline.claves: regenerarla con python -m pipeline")
+    df[ids] = df[ids].astype('Int32')
+    
+    # Transformación con melt y parseo vectorizado de periodos (sin horizonte fijo)
+    melted = melt_measure(df, 'Potencia kW', id_vars=['CENTRAL', 'GENERADOR', 'central_id', 'generador_id'], dropna=False)
+    
+    return melted
 
 # Cargar datos
-df = load_and_transform_data()
+begin_rerun(PAGE)
+df = timed_load(lambda: live_dataset(PAGE, DATASET, load_and_transform_data))
 if df is None:
     st.stop()
 
@@ -87,23 +78,38 @@ if not df.empty:
     )
     
     # Filtrar DataFrame
-    mask = (df['FECHA'] >= pd.Timestamp(selected_range[0])) & (df['FECHA'] <= pd.Timestamp(selected_range[1]))
-    df_filtered = df[mask].copy()
+    with timer("filtro de fechas", "filtro"):
+        mask = (df['FECHA'] >= pd.Timestamp(selected_range[0])) & (df['FECHA'] <= pd.Timestamp(selected_range[1]))
+        df_filtered = df[mask].copy()
 else:
     df_filtered = df
     st.warning("No hay datos disponibles para filtrar")
 
 # 4. Pre-cálculos globales (cambiar a Potencia kW)
 total_potencia_sistema = df_filtered['Potencia kW'].sum()
-generadores = df_filtered['GENERADOR'].unique().tolist()
+generadores = names_by_id(df_filtered, 'generador_id', 'GENERADOR')
 
-# Selección de generador
-selected_generador = st.sidebar.selectbox("Seleccionar Generador", generadores)
-centrales_disponibles = df_filtered[df_filtered['GENERADOR'] == selected_generador]['CENTRAL'].unique().tolist()
-selected_central = st.sidebar.selectbox("Seleccionar Central", centrales_disponibles)
+# Selección de generador (por id, mostrando el nombre)
+selected_generador_id = st.sidebar.selectbox(
+    "Seleccionar Generador", generadores.index.tolist(), format_func=generadores.get
+)
+selected_generador = generadores.get(selected_generador_id)
+centrales_disponibles = names_by_id(
+    df_filtered[df_filtered['generador_id'] == selected_generador_id], 'central_id', 'CENTRAL'
+)
+selected_central_id = st.sidebar.selectbox(
+    "Seleccionar Central", centrales_disponibles.index.tolist(), format_func=centrales_disponibles.get
+)
+selected_central = centrales_disponibles.get(selected_central_id)
 
 # Layout principal
-tab1, tab2 = st.tabs(["Visión Detallada", "Visión de Promedios"])
+# Selector de vista: solo se calcula la sección visible (st.tabs ejecuta ambas)
+vista = st.radio(
+    "Vista",
+    ["Visión Detallada", "Visión de Promedios"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
 # 5. Funciones para gráficos (actualizadas para potencia)
 def plot_central_potencia(df_central, central_name):
@@ -157,18 +163,108 @@ def plot_generador_potencia(df_generador, generador_name):
     )
     return fig
 
+def plot_sistema_potencia(df_sistema):
+    """Crea gráfico de barras con la evolución del sistema"""
+    fig = px.bar(
+        df_sistema,
+        x='FECHA',
+        y='Potencia kW',  # Actualizado
+        color='Potencia kW',  # Actualizado
+        color_continuous_scale='Viridis',
+        title="Evolución de la Potencia del Sistema",  # Actualizado
+        text_auto=bar_text_auto(len(df_sistema))
+    )
+
+    fig.update_traces(
+        textposition='inside',
+        textfont=dict(size=16, color='white'))
+
+    fig.update_layout(
+        yaxis_title="Potencia kW",  # Actualizado
+        xaxis_title="Fecha", 
+        showlegend=False, 
+        bargap=0.2
+    )
+    return fig
+
+def plot_participacion_potencia(df, total):
+    """Crea gráfico de barras horizontales con la participación por generador"""
+    participacion = (
+        df.groupby('generador_id', as_index=False)['Potencia kW']  # Actualizado
+        .sum()
+        .assign(GENERADOR=lambda x: x['generador_id'].map(names_by_id(df, 'generador_id', 'GENERADOR')))
+        .assign(Porcentaje=lambda x: (x['Potencia kW'] / total) * 100)  # Actualizado
+        .sort_values('Porcentaje', ascending=False)
+    )
+
+    fig = px.bar(
+        participacion,
+        x='Porcentaje',
+        y='GENERADOR',
+        orientation='h',
+        color='Porcentaje',
+        color_continuous_scale='Blues',
+        text='Porcentaje',
+        labels={'Porcentaje': 'Participación (%)', 'GENERADOR': ''}
+    )
+
+    fig.update_traces(
+        texttemplate='%{x:.2f}%',
+        textposition='outside',
+        marker_line=dict(color='#000', width=0.5)
+    )
+
+    fig.update_layout(
+        height=600,
+        xaxis_range=[0, participacion['Porcentaje'].max() * 1.15],
+        yaxis={'categoryorder': 'total ascending'},
+        showlegend=False
+    )
+    return fig
+
+def plot_comparativo_potencia(df):
+    """Crea gráfico comparativo por generador"""
+    df_comparacion = (
+        df.groupby(['FECHA', 'generador_id'], as_index=False)
+        ['Potencia kW'].sum()  # Actualizado
+    )
+    df_comparacion = downsample(df_comparacion, 'FECHA', 'Potencia kW', by='generador_id')
+    df_comparacion['GENERADOR'] = df_comparacion['generador_id'].map(names_by_id(df, 'generador_id', 'GENERADOR'))
+
+    fig = px.line(
+        df_comparacion,
+        x='FECHA',
+        y='Potencia kW',  # Actualizado
+        color='GENERADOR',
+        **line_options(len(df_comparacion)),
+        title="Comparación de Potencia por Generador"  # Actualizado
+    )
+
+    fig.update_layout(
+        yaxis_title="Potencia (kW)",  # Actualizado
+        xaxis_title="Fecha",
+        legend_title="Generadores",
+        height=500
+    )
+    return fig
+
 # 6. Contenido para pestañas
-with tab1:
+if vista == "Visión Detallada":
     col_left, col_right = st.columns(2)
     
     # Columna izquierda - Central
     with col_left:
         st.subheader(f"Evolución de la Central: {selected_central}")
-        df_central = df_filtered[df_filtered['CENTRAL'] == selected_central]
+        df_central = df_filtered[df_filtered['central_id'] == selected_central_id]
         
         if not df_central.empty:
             # Gráfico
-            fig_central = plot_central_potencia(df_central, selected_central)
+            # Puntos marcados por pipeline.anomalias
+            flags_central = central_anomalies('Potencia kW', selected_central_id, selected_range)
+            fig_central = cached_figure(
+                DATASET, (PAGE, 'central', selected_central_id, selected_range, anomalies_version()),
+                lambda: mark_anomalies(plot_central_potencia(df_central, selected_central), flags_central, 'Potencia kW')
+            )
             st.plotly_chart(fig_central, use_container_width=True)
             
             # Métricas optimizadas (actualizadas)
@@ -179,22 +275,32 @@ with tab1:
             col1, col2 = st.columns(2)
             col1.metric("Potencia Promedio", f"{potencia_promedio_central:,.2f} kW")  # Actualizado
             col2.metric("Participación", f"{porcentaje_central:.2f}%")
+
+            # Pronósticos precalculados (pipeline.pronostico)
+            render_central_forecast(PAGE, DATASET, 'Potencia kW', selected_central_id, selected_central, df_central)
         else:
             st.warning(f"No hay datos para: {selected_central}")
     
     # Columna derecha - Generador
     with col_right:
         st.subheader(f"Evolución del Generador: {selected_generador}")
-        df_generador = df_filtered[df_filtered['GENERADOR'] == selected_generador]
+        df_generador = df_filtered[df_filtered['generador_id'] == selected_generador_id]
         
         if not df_generador.empty:
             # Gráfico
-            fig_generador = plot_generador_potencia(df_generador, selected_generador)
+            fig_generador = cached_figure(
+                DATASET, (PAGE, 'generador', selected_generador_id, selected_range),
+                lambda: plot_generador_potencia(df_generador, selected_generador)
+            )
             st.plotly_chart(fig_generador, use_container_width=True)
             
             # Métricas optimizadas (actualizadas)
             potencia_total_generador = df_generador['Potencia kW'].sum()
-            potencia_promedio_generador = df_generador.groupby('FECHA')['Potencia kW'].sum().mean()
+            with timer("potencia_promedio_generador", "consulta"):
+                potencia_promedio_generador = query(
+                    DATASET, 'Potencia kW', by=['FECHA'], fechas=selected_range,
+                    filtros={'generador_id': selected_generador_id}, df=df
+                )['Potencia kW'].mean()
             porcentaje_generador = (potencia_total_generador / total_potencia_sistema) * 100
             
             col1, col2 = st.columns(2)
@@ -209,100 +315,44 @@ with tab1:
     # Evolución del sistema
     if not df_filtered.empty:
         st.subheader("Evolución de la Potencia del Sistema")
-        df_sistema = df_filtered.groupby('FECHA')['Potencia kW'].sum().reset_index()  # Actualizado
+        with timer("df_sistema", "consulta"):
+            df_sistema = query(
+                DATASET, 'Potencia kW', by=['FECHA'], fechas=selected_range, df=df
+            )  # Actualizado
         df_sistema['Potencia kW'] = df_sistema['Potencia kW'].round(2)  # Actualizado
         potencia_promedio_sistema = df_sistema['Potencia kW'].mean()  # Actualizado
 
-        fig_sistema = px.bar(
-            df_sistema,
-            x='FECHA',
-            y='Potencia kW',  # Actualizado
-            color='Potencia kW',  # Actualizado
-            color_continuous_scale='Viridis',
-            title="Evolución de la Potencia del Sistema",  # Actualizado
-            text_auto=True
-        )
-        
-        fig_sistema.update_traces(
-            textposition='inside',
-            textfont=dict(size=16, color='white'))
-        
-        fig_sistema.update_layout(
-            yaxis_title="Potencia kW",  # Actualizado
-            xaxis_title="Fecha", 
-            showlegend=False, 
-            bargap=0.2
+        fig_sistema = cached_figure(
+            DATASET, (PAGE, 'sistema', selected_range),
+            lambda: plot_sistema_potencia(df_sistema)
         )
         st.plotly_chart(fig_sistema, use_container_width=True)
 
         st.metric(label="Potencia Promedio del Sistema", value=f"{potencia_promedio_sistema:,.2f} kW")  # Actualizado
+
+        # Vistas móviles, interanuales y acumuladas precalculadas (pipeline.tendencias)
+        render_system_trend(PAGE, DATASET, 'Potencia kW', selected_range)
     
     # Participación por generador (barras horizontales)
     st.subheader("Participación por Generador")
     if not df_filtered.empty:
-        # Cálculo optimizado (actualizado)
-        participacion = (
-            df_filtered.groupby('GENERADOR', as_index=False)['Potencia kW']  # Actualizado
-            .sum()
-            .assign(Porcentaje=lambda x: (x['Potencia kW'] / total_potencia_sistema) * 100)  # Actualizado
-            .sort_values('Porcentaje', ascending=False)
+        fig_bar = cached_figure(
+            DATASET, (PAGE, 'participacion', selected_range),
+            lambda: plot_participacion_potencia(df_filtered, total_potencia_sistema)
         )
-        
-        fig_bar = px.bar(
-            participacion,
-            x='Porcentaje',
-            y='GENERADOR',
-            orientation='h',
-            color='Porcentaje',
-            color_continuous_scale='Blues',
-            text='Porcentaje',
-            labels={'Porcentaje': 'Participación (%)', 'GENERADOR': ''}
-        )
-        
-        fig_bar.update_traces(
-            texttemplate='%{x:.2f}%',
-            textposition='outside',
-            marker_line=dict(color='#000', width=0.5)
-        )
-        
-        fig_bar.update_layout(
-            height=600,
-            xaxis_range=[0, participacion['Porcentaje'].max() * 1.15],
-            yaxis={'categoryorder': 'total ascending'},
-            showlegend=False
-        )
-        
         st.plotly_chart(fig_bar, use_container_width=True)
 
 # 7. Pestaña de comparación con PARTICIPACIÓN PROMEDIO
-with tab2:
+else:
     st.header("Análisis Comparativo")
     
     if not df_filtered.empty:
         # Gráfico comparativo de generadores
         st.subheader("Comparación entre Generadores")
         
-        # Agrupación eficiente (actualizada)
-        df_comparacion = (
-            df_filtered.groupby(['FECHA', 'GENERADOR'], as_index=False)
-            ['Potencia kW'].sum()  # Actualizado
-        )
-        
-        fig_comparativo = px.line(
-            df_comparacion,
-            x='FECHA',
-            y='Potencia kW',  # Actualizado
-            color='GENERADOR',
-            markers=True,
-            line_shape='spline',
-            title="Comparación de Potencia por Generador"  # Actualizado
-        )
-        
-        fig_comparativo.update_layout(
-            yaxis_title="Potencia (kW)",  # Actualizado
-            xaxis_title="Fecha",
-            legend_title="Generadores",
-            height=500
+        fig_comparativo = cached_figure(
+            DATASET, (PAGE, 'comparativo', selected_range),
+            lambda: plot_comparativo_potencia(df_filtered)
         )
         st.plotly_chart(fig_comparativo, use_container_width=True)
         
@@ -310,26 +360,35 @@ with tab2:
         st.subheader("Resumen Estadístico")
 
         # Calcular total del sistema por fecha (actualizado)
-        total_por_mes = df_filtered.groupby('FECHA', as_index=False, sort=False)['Potencia kW'].sum()  # Actualizado
+        with timer("total_por_mes", "consulta"):
+            total_por_mes = query(
+                DATASET, 'Potencia kW', by=['FECHA'], fechas=selected_range, df=df
+            )  # Actualizado
         total_por_mes = total_por_mes.rename(columns={'Potencia kW': 'Total_Sistema'})  # Actualizado
 
         # Calcular potencia por generador por fecha (actualizado)
-        generador_por_mes = df_filtered.groupby(['FECHA', 'GENERADOR'], as_index=False)['Potencia kW'].sum()  # Actualizado
+        with timer("generador_por_mes", "consulta"):
+            generador_por_mes = query(
+                DATASET, 'Potencia kW', by=['FECHA', 'generador_id'], fechas=selected_range, df=df
+            )  # Actualizado
 
         # Combinar y calcular participación mensual
         df_participacion = pd.merge(generador_por_mes, total_por_mes, on='FECHA')
         df_participacion['Participacion'] = (df_participacion['Potencia kW'] / df_participacion['Total_Sistema']) * 100  # Actualizado
 
         # Calcular estadísticas (actualizado)
-        stats = (
-            df_participacion.groupby('GENERADOR', as_index=False)
-            .agg(
-                Minimo=('Potencia kW', 'min'),  # Actualizado
-                Promedio=('Potencia kW', 'mean'),  # Actualizado
-                Maximo=('Potencia kW', 'max'),  # Actualizado
-                Participacion_Promedio=('Participacion', 'mean')
+        with timer("stats", "groupby"):
+            stats = (
+                df_participacion.groupby('generador_id', as_index=False)
+                .agg(
+                    Minimo=('Potencia kW', 'min'),  # Actualizado
+                    Promedio=('Potencia kW', 'mean'),  # Actualizado
+                    Maximo=('Potencia kW', 'max'),  # Actualizado
+                    Participacion_Promedio=('Participacion', 'mean')
+                )
             )
-        )
+
+        stats.insert(0, 'GENERADOR', stats.pop('generador_id').map(generadores))
 
         # ORDENAR por participación promedio
         stats = stats.sort_values(by='Participacion_Promedio', ascending=False)
@@ -356,7 +415,9 @@ with tab2:
 st.sidebar.markdown("---")
 st.sidebar.subheader("Métricas del Sistema")
 if not df_filtered.empty:
-    st.sidebar.metric("Centrales", df_filtered['CENTRAL'].nunique())
-    st.sidebar.metric("Generadores", df_filtered['GENERADOR'].nunique())
+    st.sidebar.metric("Centrales", df_filtered['central_id'].nunique())
+    st.sidebar.metric("Generadores", df_filtered['generador_id'].nunique())
     st.sidebar.metric("Potencia Total", f"{total_potencia_sistema:,.2f} kW")  # Actualizado
-    st.sidebar.caption(f"Periodo: {df_filtered['FECHA'].min().strftime('%Y-%m')} a {df_filtered['FECHA'].max().strftime('%Y-%m')}")
\ No newline at end of file
+    st.sidebar.caption(f"Periodo: {df_filtered['FECHA'].min().strftime('%Y-%m')} a {df_filtered['FECHA'].max().strftime('%Y-%m')}")
+
+render_panel()
@@ -5,77 +5,53 @@ import plotly.graph_objects as go
 from datetime import datetime
 from pathlib import Path
 
+from utils.anomalies import anomalies_version, central_anomalies, mark_anomalies
+from utils.charts import bar_text_auto, downsample, use_webgl
+from utils.figure_cache import cached_figure
+from utils.instrumentation import count_rows, instrument
+from utils.live_data import LoadError, live_dataset
+from utils.perf_panel import begin_rerun, render_panel, timed_load, timer
+from utils.query import query
+from utils.spreadsheet import read_sheet
+from utils.transform import melt_measure, names_by_id
+
+DATASET = "serie_precios_potencia"
+PAGE = Path(__file__).stem
+
 # Configuración de la página
 st.set_page_config(page_title="Dashboard de Precios de Potencia", layout="wide")
 st.title("Análisis Integral de Precios de Potencia")
-@st.cache_data
+@instrument(f"pagina:{PAGE}")
 def load_and_transform_data():
-    try:
-        current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
-        file_path = current_dir / "data" / "serie_precios_potencia.xlsx"
-
-        if not file_path.exists():
-            st.error("Archivo no encontrado")
-            return None
-
-        df = pd.read_excel(file_path, engine="openpyxl")
-        if df.empty:
-            st.error("El archivo está vacío")
-            return None
-
-        df.columns = df.columns.str.strip()
-        price_columns = [col for col in df.columns if "Precio Potencia USD/kW" in col]
-
-        dfs = []
-        for col in price_columns:
-            # Extraer el código de fecha (última palabra en el nombre de la columna)
-            period_code = col.split()[-1].strip()
-            
-            # Convertir código MES/AÑO a fecha
-            try:
-                # Mes es siempre los primeros dígitos (1-2 caracteres)
-                # Año es el resto (4 caracteres para años completos)
-                if len(period_code) == 5:  # Ej: "10224" sería octubre 2024? -> pero debería ser 102024
-                    # Asumir formato MYYYY (M=1 dígito, YYYY=4 dígitos)
-                    month = int(period_code[0])
-                    year = int(period_code[1:5])
-                elif len(period_code) == 6:  # Formato correcto MMYYYY
-                    month = int(period_code[0:2])
-                    year = int(period_code[2:6])
-                else:
-                    continue  # Saltar formatos desconocidos
-                
-                date = datetime(year, month, 1)
-            except Exception as e:
-                st.warning(f"Error convirtiendo periodo {period_code}: {str(e)}")
-                continue
-
-            temp_df = df[['CENTRAL', 'TECNOLOGIA', col]].copy()
-            temp_df['FECHA'] = date
-            temp_df['Precio Potencia USD/kW'] = pd.to_numeric(
-                temp_df[col].astype(str).str.replace(',', ''), 
-                errors='coerce'
-            )
-            temp_df['Periodo'] = period_code
-            dfs.append(temp_df)
-
-        if not dfs:
-            st.error("No se pudieron procesar columnas de precios")
-            return None
-            
-        transformed_df = pd.concat(dfs)
-        transformed_df = transformed_df.dropna(subset=['FECHA', 'Precio Potencia USD/kW'])
-        transformed_df = transformed_df[['FECHA', 'CENTRAL', 'TECNOLOGIA', 'Precio Potencia USD/kW', 'Periodo']]
-        transformed_df['FECHA'] = pd.to_datetime(transformed_df['FECHA'], errors='coerce')
-        transformed_df = transformed_df.dropna(subset=['FECHA'])
-        return transformed_df
-
-    except Exception as e:
-        st.error(f"Error al cargar datos: {str(e)}")
-        return None
+    current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
+    file_path = current_dir / "data" / f"{DATASET}.xlsx"
+
+    if not file_path.exists():
+        raise LoadError("Archivo no encontrado")
+
+    df = read_sheet(file_path)
+    count_rows(rows_in=len(df))
+    if df.empty:
+        raise LoadError("El archivo está vacío")
+
+    df.columns = df.columns.str.strip()
+
+    # Ids de pipeline.claves: la página agrupa y filtra por id y muestra los nombres
+    ids = ['central_id', 'tecnologia_id']
+    if not set(ids) <= set(df.columns):
+        raise LoadError("La serie no tiene ids de pipeline.claves: regenerarla con python -m pipeline")
+    df[ids] = df[ids].astype('Int32')
+
+    # Transformación vectorizada: un solo melt y una sola conversión numérica
+    transformed_df = melt_measure(df, 'Precio Potencia USD/kW', id_vars=['CENTRAL', 'TECNOLOGIA', 'central_id', 'tecnologia_id'])
+    if transformed_df.empty:
+        raise LoadError("No se pudieron procesar columnas de precios")
+
+    return transformed_df
 
 # Cargar datos
-df = load_and_transform_data()
+begin_rerun(PAGE)
+df = timed_load(lambda: live_dataset(PAGE, DATASET, load_and_transform_data))
 if df is None:
     st.stop()
 
@@ -109,104 +85,165 @@ if 'FECHA' in df.columns:
         datetime.fromtimestamp(selected_range[1])
     ]
 
-    df_filtered = df[(df['FECHA'] >= date_range[0]) & (df['FECHA'] <= date_range[1])]
+    with timer("filtro de fechas", "filtro"):
+        df_filtered = df[(df['FECHA'] >= date_range[0]) & (df['FECHA'] <= date_range[1])]
 else:
     st.sidebar.warning("No se encontró la columna 'FECHA' en los datos.")
     df_filtered = df
+    selected_range = None
+    date_range = None
+
+generadores = names_by_id(df_filtered, 'tecnologia_id', 'TECNOLOGIA')
+selected_generador_id = st.sidebar.selectbox("Seleccionar Generador", generadores.index.tolist(), format_func=generadores.get)
+selected_generador = generadores.get(selected_generador_id)
+
+agentes_disponibles = names_by_id(
+    df_filtered[df_filtered['tecnologia_id'] == selected_generador_id], 'central_id', 'CENTRAL'
+)
+selected_agente_id = st.sidebar.selectbox(
+    "Seleccionar Agente", agentes_disponibles.index.tolist(), format_func=agentes_disponibles.get
+)
+selected_agente = agentes_disponibles.get(selected_agente_id)
+
+# Funciones para gráficos
+def plot_agente(df_agente, agente):
+    """Crea gráfico de evolución de precios para un agente"""
+    fig = px.line(
+        df_agente,
+        x='FECHA',
+        y='Precio Potencia USD/kW',
+        title=f"Precios para {agente}",
+        markers=True,
+        line_shape='linear'
+    )
+    fig.update_traces(line=dict(width=3), marker=dict(size=8))
+    fig.update_layout(yaxis_title="Precio Potencia USD/kW", xaxis_title="Fecha", showlegend=False)
+    return fig
+
+def plot_generador(df_generador_prom, generador):
+    """Crea gráfico de precio promedio para un generador"""
+    fig = px.line(
+        df_generador_prom,
+        x='FECHA',
+        y='Precio Potencia USD/kW',
+        title=f"Precio Promedio para {generador}",
+        markers=True,
+        line_shape='spline'
+    )
+    fig.update_traces(line=dict(width=3, dash='dot'), marker=dict(size=8, symbol='diamond'))
+    fig.update_layout(yaxis_title="Precio Promedio (USD/kW)", xaxis_title="Fecha", showlegend=False)
+    return fig
 
-generadores = df_filtered['TECNOLOGIA'].unique()
-selected_generador = st.sidebar.selectbox("Seleccionar Generador", generadores)
+def plot_sistema(df_sistema):
+    """Crea gráfico de barras con el precio promedio del sistema"""
+    fig = px.bar(
+        df_sistema,
+        x='FECHA',
+        y='Precio Potencia USD/kW',
+        title="Evolución del Precio Promedio del Sistema",
+        text_auto=bar_text_auto(len(df_sistema)),
+        color_discrete_sequence=['#ff7f0e']  # Color naranja,
+    )
 
-agentes_disponibles = df_filtered[df_filtered['TECNOLOGIA'] == selected_generador]['CENTRAL'].unique()
-selected_agente = st.sidebar.selectbox("Seleccionar Agente", agentes_disponibles)
+    fig.update_traces(
+        textposition='inside',
+        textfont=dict(size=18, color='white'))
 
-# Layout
-tab1, tab2 = st.tabs(["Visión Detallada", "Visión de Promedios"])
+    fig.update_layout(yaxis_title="Precio Promedio (US$/kW)", xaxis_title="Fecha", showlegend=False, bargap=0.2)
+    return fig
 
-with tab1:
+def plot_comparacion(df):
+    """Crea gráfico comparativo de precios promedio por tecnología"""
+    df_generadores_prom_tab2 = df.groupby(['FECHA', 'tecnologia_id'])['Precio Potencia USD/kW'].mean().reset_index()
+    df_generadores_prom_tab2 = downsample(df_generadores_prom_tab2, 'FECHA', 'Precio Potencia USD/kW', by='tecnologia_id')
+    df_generadores_prom_tab2['TECNOLOGIA'] = df_generadores_prom_tab2['tecnologia_id'].map(names_by_id(df, 'tecnologia_id', 'TECNOLOGIA'))
+    denso = use_webgl(len(df_generadores_prom_tab2))
+    fig = px.line(
+        df_generadores_prom_tab2,
+        x='FECHA',
+        y='Precio Potencia USD/kW',
+        color='TECNOLOGIA',
+        line_dash='TECNOLOGIA',
+        symbol=None if denso else 'TECNOLOGIA',
+        render_mode='webgl' if denso else 'svg',
+        title="Comparación de Precios Promedio por Generador"
+    )
+    fig.update_layout(
+        yaxis_title="Precio Promedio (USD/kW)",
+        xaxis_title="Fecha",
+        legend_title="Empresas"
+    )
+    return fig
+
+# Layout
+# Selector de vista: solo se calcula la sección visible (st.tabs ejecuta ambas)
+vista = st.radio(
+    "Vista",
+    ["Visión Detallada", "Visión de Promedios"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
+
+if vista == "Visión Detallada":
     col_left, col_right = st.columns(2)
 
     with col_left:
         st.subheader(f"Evolución de Precios para Agente: {selected_agente}")
-        df_agente = df_filtered[df_filtered['CENTRAL'] == selected_agente]
+        df_agente = df_filtered[df_filtered['central_id'] == selected_agente_id]
         precio_promedio_agente = df_agente['Precio Potencia USD/kW'].mean()
 
-        fig_agente = px.line(
-            df_agente,
-            x='FECHA',
-            y='Precio Potencia USD/kW',
-            title=f"Precios para {selected_agente}",
-            markers=True,
-            line_shape='linear'
+        # Puntos marcados por pipeline.anomalias
+        flags_agente = central_anomalies('Precio Potencia USD/kW', selected_agente_id, date_range)
+        fig_agente = cached_figure(
+            DATASET, (PAGE, 'agente', selected_agente_id, selected_range, anomalies_version()),
+            lambda: mark_anomalies(plot_agente(df_agente, selected_agente), flags_agente, 'Precio Potencia USD/kW')
         )
-        fig_agente.update_traces(line=dict(width=3), marker=dict(size=8))
-        fig_agente.update_layout(yaxis_title="Precio Potencia USD/kW", xaxis_title="Fecha", showlegend=False)
         st.plotly_chart(fig_agente, use_container_width=True)
 
         st.metric(label=f"Precio Promedio {selected_agente}", value=f"{precio_promedio_agente:.2f} USD/kW")
 
     with col_right:
         st.subheader(f"Precio Promedio para Generador: {selected_generador}")
-        df_generador = df_filtered[df_filtered['TECNOLOGIA'] == selected_generador]
-        df_generador_prom = df_generador.groupby(['FECHA', 'TECNOLOGIA'])['Precio Potencia USD/kW'].mean().reset_index()
+        df_generador = df_filtered[df_filtered['tecnologia_id'] == selected_generador_id]
+        with timer("df_generador_prom", "consulta"):
+            df_generador_prom = query(
+                DATASET, 'Precio Potencia USD/kW', by=['FECHA', 'tecnologia_id'], fechas=date_range,
+                filtros={'tecnologia_id': selected_generador_id}, agg='mean', dropna=True, df=df
+            )
         precio_promedio_generador = df_generador['Precio Potencia USD/kW'].mean()
 
-        fig_generador = px.line(
-            df_generador_prom,
-            x='FECHA',
-            y='Precio Potencia USD/kW',
-            title=f"Precio Promedio para {selected_generador}",
-            markers=True,
-            line_shape='spline'
+        fig_generador = cached_figure(
+            DATASET, (PAGE, 'generador', selected_generador_id, selected_range),
+            lambda: plot_generador(df_generador_prom, selected_generador)
         )
-        fig_generador.update_traces(line=dict(width=3, dash='dot'), marker=dict(size=8, symbol='diamond'))
-        fig_generador.update_layout(yaxis_title="Precio Promedio (USD/kW)", xaxis_title="Fecha", showlegend=False)
         st.plotly_chart(fig_generador, use_container_width=True)
 
         st.metric(label=f"Promedio {selected_generador}", value=f"{precio_promedio_generador:.2f} USD/kW")
 
     # Evolución del Precio Promedio del Sistema
     st.subheader("Evolución del Precio Promedio del Sistema")
-    df_sistema = df_filtered.groupby('FECHA')['Precio Potencia USD/kW'].mean().reset_index()
+    with timer("df_sistema", "consulta"):
+        df_sistema = query(
+            DATASET, 'Precio Potencia USD/kW', by=['FECHA'], fechas=date_range, agg='mean', dropna=True, df=df
+        )
     df_sistema['Precio Potencia USD/kW'] = df_sistema['Precio Potencia USD/kW'].round(2)
     precio_promedio_sistema = df_sistema['Precio Potencia USD/kW'].mean()
 
-    fig_sistema = px.bar(
-        df_sistema,
-        x='FECHA',
-        y='Precio Potencia USD/kW',
-        title="Evolución del Precio Promedio del Sistema",
-        text_auto=True,
-        color_discrete_sequence=['#ff7f0e']  # Color naranja,
+    fig_sistema = cached_figure(
+        DATASET, (PAGE, 'sistema', selected_range),
+        lambda: plot_sistema(df_sistema)
     )
-    
-    fig_sistema.update_traces(
-        textposition='inside',
-        textfont=dict(size=18, color='white'))
-
-    fig_sistema.update_layout(yaxis_title="Precio Promedio (US$/kW)", xaxis_title="Fecha", showlegend=False, bargap=0.2)
     st.plotly_chart(fig_sistema, use_container_width=True)
 
     st.metric(label="Precio Promedio del Sistema", value=f"{precio_promedio_sistema:.2f} USD/kW")
 
-with tab2:
+else:
     st.header("Análisis Comparativo")
     st.subheader("Comparación de Generadores")
 
-    df_generadores_prom_tab2 = df_filtered.groupby(['FECHA', 'TECNOLOGIA'])['Precio Potencia USD/kW'].mean().reset_index()
-    fig_comparacion = px.line(
-        df_generadores_prom_tab2,
-        x='FECHA',
-        y='Precio Potencia USD/kW',
-        color='TECNOLOGIA',
-        line_dash='TECNOLOGIA',
-        symbol='TECNOLOGIA',
-        title="Comparación de Precios Promedio por Generador"
-    )
-    fig_comparacion.update_layout(
-        yaxis_title="Precio Promedio (USD/kW)",
-        xaxis_title="Fecha",
-        legend_title="Empresas"
+    fig_comparacion = cached_figure(
+        DATASET, (PAGE, 'comparacion', selected_range),
+        lambda: plot_comparacion(df_filtered)
     )
     st.plotly_chart(fig_comparacion, use_container_width=True)
 
@@ -222,9 +259,11 @@ with tab2:
 # Sidebar: información del sistema
 st.sidebar.markdown("---")
 st.sidebar.subheader("Información del Sistema")
-st.sidebar.write(f"Total de agentes: {df_filtered['CENTRAL'].nunique()}")
-st.sidebar.write(f"Total de generadores: {df_filtered['TECNOLOGIA'].nunique()}")
+st.sidebar.write(f"Total de agentes: {df_filtered['central_id'].nunique()}")
+st.sidebar.write(f"Total de generadores: {df_filtered['tecnologia_id'].nunique()}")
 if 'FECHA' in df_filtered.columns and not df_filtered.empty:
     min_fecha = df_filtered['FECHA'].min().strftime('%Y-%m-%d')
     max_fecha = df_filtered['FECHA'].max().strftime('%Y-%m-%d')
-    st.sidebar.write(f"Rango de fechas: {min_fecha} a {max_fecha}")
\ No newline at end of file
+    st.sidebar.write(f"Rango de fechas: {min_fecha} a {max_fecha}")
+
+render_panel()
@@ -5,76 +5,54 @@ import plotly.graph_objects as go
 from datetime import datetime
 from pathlib import Path
 
+from utils.anomalies import anomalies_version, central_anomalies, mark_anomalies
+from utils.charts import bar_text_auto, downsample, use_webgl
+from utils.figure_cache import cached_figure
+from utils.instrumentation import count_rows, instrument
+from utils.live_data import LoadError, live_dataset
+from utils.perf_panel import begin_rerun, render_panel, timed_load, timer
+from utils.query import query
+from utils.spreadsheet import read_sheet
+from utils.transform import melt_measure, names_by_id
+
+DATASET = "serie_peaje"
+PAGE = Path(__file__).stem
+
 # Configuración de la página
 st.set_page_config(page_title="Dashboard de Peaje de Generacion", layout="wide")
 st.title("Análisis Integral de Peajes de Generación")
 
-@st.cache_data
+@instrument(f"pagina:{PAGE}")
 def load_and_transform_data():
-    try:
-        current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
-        file_path = current_dir / "data" / "serie_peaje.xlsx"
-
-        if not file_path.exists():
-            st.error("Archivo no encontrado")
-            return None
-
-        df = pd.read_excel(file_path, engine="openpyxl")
-        if df.empty:
-            st.error("El archivo está vacío")
-            return None
-
-        df.columns = df.columns.str.strip()
-        price_columns = [col for col in df.columns if "Peaje generación USD/MWh" in col]
-
-        dfs = []
-        for col in price_columns:
-            # Extraer el código de fecha (última palabra en el nombre de la columna)
-            period_code = col.split()[-1].strip()
-            
-            # Convertir código MES/AÑO a fecha
-            try:
-                # Mes es siempre los primeros dígitos (1-2 caracteres)
-                # Año es el resto (4 caracteres para años completos)
-                if len(period_code) == 5:  # Ej: "10224" sería octubre 2024? -> pero debería ser 102024
-                    # Asumir formato MYYYY (M=1 dígito, YYYY=4 dígitos)
-                    month = int(period_code[0])
-                    year = int(period_code[1:5])
-                elif len(period_code) == 6:  # Formato correcto MMYYYY
-                    month = int(period_code[0:2])
-                    year = int(period_code[2:6])
-                else:
-                    continue  # Saltar formatos desconocidos
-                
-                date = datetime(year, month, 1)
-            except Exception as e:
-                st.warning(f"Error convirtiendo periodo {period_code}: {str(e)}")
-                continue
-
-            temp_df = df[['CENTRAL', 'TECNOLOGIA', col]].copy()
-            temp_df['FECHA'] = date
-            temp_df['Peaje generación USD/MWh'] = pd.to_numeric(
-                temp_df[col].astype(str).str.replace(',', ''), 
-                errors='coerce'
-            )
-            temp_df['Periodo'] = period_code
-            dfs.append(temp_df)
+    current_dir = Path(__file__).parent if "__file__" in locals() else Path.cwd()
+    file_path = current_dir / "data" / f"{DATASET}.xlsx"
+
+    if not file_path.exists():
+        raise LoadError("Archivo no encontrado")
+
+    df = read_sheet(file_path)
+    count_rows(rows_in=len(df))
+    if df.empty:
+        raise LoadError("El archivo está vacío")
 
-        if not dfs:
-            st.error("No se pudieron procesar columnas de precios")
-            return None
-            
-        transformed_df = pd.concat(dfs)
-        transformed_df = transformed_df.dropna(subset=['FECHA', 'Peaje generación USD/MWh'])
+    df.columns = df.columns.str.strip()
 
-        return transformed_df
+    # Ids de pipeline.claves: la página agrupa y filtra por id y muestra los nombres
+    ids = ['central_id', 'tecnologia_id']
+    if not set(ids) <= set(df.columns):
+        raise LoadError("La serie no tiene ids de pipeline.claves: regenerarla con python -m pipeline")
+    df[ids] = df[ids].astype('Int32')
 
-    except Exception as e:
-        st.error(f"Error al cargar datos: {str(e)}")
-        return None
+    # Transformación vectorizada: un solo melt y una sola conversión numérica
+    transformed_df = melt_measure(df, 'Peaje generación USD/MWh', id_vars=['CENTRAL', 'TECNOLOGIA', 'central_id', 'tecnologia_id'])
+    if transformed_df.empty:
+        raise LoadError("No se pudieron procesar columnas de precios")
+
+    return transformed_df
 
 # Cargar datos
-df = load_and_transform_data()
+begin_rerun(PAGE)
+df = timed_load(lambda: live_dataset(PAGE, DATASET, load_and_transform_data))
 if df is None:
     st.stop()
 
@@ -108,59 +86,138 @@ if 'FECHA' in df.columns:
         datetime.fromtimestamp(selected_range[1])
     ]
 
-    df_filtered = df[(df['FECHA'] >= date_range[0]) & (df['FECHA'] <= date_range[1])]
+    with timer("filtro de fechas", "filtro"):
+        df_filtered = df[(df['FECHA'] >= date_range[0]) & (df['FECHA'] <= date_range[1])]
 else:
     st.sidebar.warning("No se encontró la columna 'FECHA' en los datos.")
     df_filtered = df
+    selected_range = None
+    date_range = None
 
 # Selección de empresa y agente
-empresas = df_filtered['TECNOLOGIA'].unique()
-selected_empresa = st.sidebar.selectbox("Seleccionar Empresa", empresas)
+empresas = names_by_id(df_filtered, 'tecnologia_id', 'TECNOLOGIA')
+selected_empresa_id = st.sidebar.selectbox("Seleccionar Empresa", empresas.index.tolist(), format_func=empresas.get)
+selected_empresa = empresas.get(selected_empresa_id)
+
+agentes_disponibles = names_by_id(
+    df_filtered[df_filtered['tecnologia_id'] == selected_empresa_id], 'central_id', 'CENTRAL'
+)
+selected_agente_id = st.sidebar.selectbox(
+    "Seleccionar Agente", agentes_disponibles.index.tolist(), format_func=agentes_disponibles.get
+)
+selected_agente = agentes_disponibles.get(selected_agente_id)
+
+# Funciones para gráficos
+def plot_agente(df_agente, agente):
+    """Crea gráfico de evolución de precios para un agente"""
+    fig = px.line(
+        df_agente,
+        x='FECHA',
+        y='Peaje generación USD/MWh',
+        title=f"Precios para {agente}",
+        markers=True,
+        line_shape='linear'
+    )
+    fig.update_traces(line=dict(width=3), marker=dict(size=8))
+    fig.update_layout(yaxis_title="Peaje generación USD/MWh", xaxis_title="Fecha", showlegend=False)
+    return fig
+
+def plot_empresa(df_empresa_prom, empresa):
+    """Crea gráfico de precio promedio para una empresa"""
+    fig = px.line(
+        df_empresa_prom,
+        x='FECHA',
+        y='Peaje generación USD/MWh',
+        title=f"Precio Promedio para {empresa}",
+        markers=True,
+        line_shape='spline'
+    )
+    fig.update_traces(line=dict(width=3, dash='dot'), marker=dict(size=8, symbol='diamond'))
+    fig.update_layout(yaxis_title="Peaje generación USD/MWh", xaxis_title="Fecha", showlegend=False)
+    return fig
 
-agentes_disponibles = df_filtered[df_filtered['TECNOLOGIA'] == selected_empresa]['CENTRAL'].unique()
-selected_agente = st.sidebar.selectbox("Seleccionar Agente", agentes_disponibles)
+def plot_sistema(df_sistema):
+    """Crea gráfico de barras con el precio promedio del sistema"""
+    fig = px.bar(
+        df_sistema,
+        x='FECHA',
+        y='Peaje generación USD/MWh',
+        title="Evolución del Precio Promedio del Sistema",
+        text_auto=bar_text_auto(len(df_sistema)),
+        color_discrete_sequence=["#b4291f"],
+    )
 
-# Layout
-tab1, tab2 = st.tabs(["Visión Detallada", "Visión de Promedios"])
+    fig.update_traces(
+        textposition='inside',
+        textfont=dict(size=18, color='white'))
+
+    fig.update_layout(yaxis_title="Peaje generación Promedio (USD/MWh)", xaxis_title="Fecha", showlegend=False, bargap=0.2)
+    return fig
 
-with tab1:
+def plot_comparacion(df):
+    """Crea gráfico comparativo de precios promedio por tecnología"""
+    df_empresas_prom_tab2 = df.groupby(['FECHA', 'tecnologia_id'])['Peaje generación USD/MWh'].mean().reset_index()
+    df_empresas_prom_tab2 = downsample(df_empresas_prom_tab2, 'FECHA', 'Peaje generación USD/MWh', by='tecnologia_id')
+    df_empresas_prom_tab2['TECNOLOGIA'] = df_empresas_prom_tab2['tecnologia_id'].map(names_by_id(df, 'tecnologia_id', 'TECNOLOGIA'))
+    denso = use_webgl(len(df_empresas_prom_tab2))
+    fig = px.line(
+        df_empresas_prom_tab2,
+        x='FECHA',
+        y='Peaje generación USD/MWh',
+        color='TECNOLOGIA',
+        line_dash='TECNOLOGIA',
+        symbol=None if denso else 'TECNOLOGIA',
+        render_mode='webgl' if denso else 'svg',
+        title="Comparación de Precios Promedio por Empresa"
+    )
+    fig.update_layout(
+        yaxis_title="Peaje generación Promedio (USD/MWh)",
+        xaxis_title="Fecha",
+        legend_title="Tecnologias",
+    )
+    return fig
+
+# Layout
+# Selector de vista: solo se calcula la sección visible (st.tabs ejecuta ambas)
+vista = st.radio(
+    "Vista",
+    ["Visión Detallada", "Visión de Promedios"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
+
+if vista == "Visión Detallada":
     col_left, col_right = st.columns(2)
 
     with col_left:
         st.subheader(f"Evolución de Precios para Agente: {selected_agente}")
-        df_agente = df_filtered[df_filtered['CENTRAL'] == selected_agente]
+        df_agente = df_filtered[df_filtered['central_id'] == selected_agente_id]
         precio_promedio_agente = df_agente['Peaje generación USD/MWh'].mean()
 
-        fig_agente = px.line(
-            df_agente,
-            x='FECHA',
-            y='Peaje generación USD/MWh',
-            title=f"Precios para {selected_agente}",
-            markers=True,
-            line_shape='linear'
+        # Puntos marcados por pipeline.anomalias
+        flags_agente = central_anomalies('Peaje generación USD/MWh', selected_agente_id, date_range)
+        fig_agente = cached_figure(
+            DATASET, (PAGE, 'agente', selected_agente_id, selected_range, anomalies_version()),
+            lambda: mark_anomalies(plot_agente(df_agente, selected_agente), flags_agente, 'Peaje generación USD/MWh')
         )
-        fig_agente.update_traces(line=dict(width=3), marker=dict(size=8))
-        fig_agente.update_layout(yaxis_title="Peaje generación USD/MWh", xaxis_title="Fecha", showlegend=False)
         st.plotly_chart(fig_agente, use_container_width=True)
 
         st.metric(label=f"Precio Promedio {selected_agente}", value=f"{precio_promedio_agente:.2f} US$/MWh")
 
     with col_right:
         st.subheader(f"Precio Promedio para Empresa: {selected_empresa}")
-        df_empresa = df_filtered[df_filtered['TECNOLOGIA'] == selected_empresa]
-        df_empresa_prom = df_empresa.groupby(['FECHA', 'TECNOLOGIA'])['Peaje generación USD/MWh'].mean().reset_index()
+        df_empresa = df_filtered[df_filtered['tecnologia_id'] == selected_empresa_id]
+        with timer("df_empresa_prom", "consulta"):
+            df_empresa_prom = query(
+                DATASET, 'Peaje generación USD/MWh', by=['FECHA', 'tecnologia_id'], fechas=date_range,
+                filtros={'tecnologia_id': selected_empresa_id}, agg='mean', dropna=True, df=df
+            )
         precio_promedio_empresa = df_empresa['Peaje generación USD/MWh'].mean()
 
-        fig_empresa = px.line(
-            df_empresa_prom,
-            x='FECHA',
-            y='Peaje generación USD/MWh',
-            title=f"Precio Promedio para {selected_empresa}",
-            markers=True,
-            line_shape='spline'
+        fig_empresa = cached_figure(
+            DATASET, (PAGE, 'empresa', selected_empresa_id, selected_range),
+            lambda: plot_empresa(df_empresa_prom, selected_empresa)
         )
-        fig_empresa.update_traces(line=dict(width=3, dash='dot'), marker=dict(size=8, symbol='diamond'))
-        fig_empresa.update_layout(yaxis_title="Peaje generación USD/MWh", xaxis_title="Fecha", showlegend=False)
         st.plotly_chart(fig_empresa, use_container_width=True)
 
         cols_empresa = st.columns(2)
@@ -169,46 +226,28 @@ with tab1:
 
     # Evolución del Precio Promedio del Sistema
     st.subheader("Evolución del Precio Promedio del Sistema")
-    df_sistema = df_filtered.groupby('FECHA')['Peaje generación USD/MWh'].mean().reset_index()
+    with timer("df_sistema", "consulta"):
+        df_sistema = query(
+            DATASET, 'Peaje generación USD/MWh', by=['FECHA'], fechas=date_range, agg='mean', dropna=True, df=df
+        )
     df_sistema['Peaje generación USD/MWh'] = df_sistema['Peaje generación USD/MWh'].round(2)
     precio_promedio_sistema = df_sistema['Peaje generación USD/MWh'].mean()
 
-    fig_sistema = px.bar(
-        df_sistema,
-        x='FECHA',
-        y='Peaje generación USD/MWh',
-        title="Evolución del Precio Promedio del Sistema",
-        text_auto=True,
-        color_discrete_sequence=["#b4291f"],
+    fig_sistema = cached_figure(
+        DATASET, (PAGE, 'sistema', selected_range),
+        lambda: plot_sistema(df_sistema)
     )
-    
-    fig_sistema.update_traces(
-        textposition='inside',
-        textfont=dict(size=18, color='white'))
-
-    fig_sistema.update_layout(yaxis_title="Peaje generación Promedio (USD/MWh)", xaxis_title="Fecha", showlegend=False, bargap=0.2)
     st.plotly_chart(fig_sistema, use_container_width=True)
 
     st.metric(label="Precio Promedio del Sistema", value=f"{precio_promedio_sistema:.2f} USD/MWh")
 
-with tab2:
+else:
     st.header("Análisis Comparativo")
     st.subheader("Comparación de Empresas")
 
-    df_empresas_prom_tab2 = df_filtered.groupby(['FECHA', 'TECNOLOGIA'])['Peaje generación USD/MWh'].mean().reset_index()
-    fig_comparacion = px.line(
-        df_empresas_prom_tab2,
-        x='FECHA',
-        y='Peaje generación USD/MWh',
-        color='TECNOLOGIA',
-        line_dash='TECNOLOGIA',
-        symbol='TECNOLOGIA',
-        title="Comparación de Precios Promedio por Empresa"
-    )
-    fig_comparacion.update_layout(
-        yaxis_title="Peaje generación Promedio (USD/MWh)",
-        xaxis_title="Fecha",
-        legend_title="Tecnologias",
+    fig_comparacion = cached_figure(
+        DATASET, (PAGE, 'comparacion', selected_range),
+        lambda: plot_comparacion(df_filtered)
     )
     st.plotly_chart(fig_comparacion, use_container_width=True)
 
@@ -224,9 +263,11 @@ with tab2:
 # Sidebar: información del sistema
 st.sidebar.markdown("---")
 st.sidebar.subheader("Información del Sistema")
-st.sidebar.write(f"Total de agentes: {df_filtered['CENTRAL'].nunique()}")
-st.sidebar.write(f"Total de empresas: {df_filtered['TECNOLOGIA'].nunique()}")
+st.sidebar.write(f"Total de agentes: {df_filtered['central_id'].nunique()}")
+st.sidebar.write(f"Total de empresas: {df_filtered['tecnologia_id'].nunique()}")
 if 'FECHA' in df_filtered.columns:
     min_date = df_filtered['FECHA'].min().strftime('%Y-%m-%d')
     max_date = df_filtered['FECHA'].max().strftime('%Y-%m-%d')
-    st.sidebar.write(f"Rango de fechas: {min_date} a {max_date}")
\ No newline at end of file
+    st.sidebar.write(f"Rango de fechas: {min_date} a {max_date}")
+
+render_panel()
@@ -0,0 +1 @@
+"""Etapas del pipeline CNDC (normalización y consolidación) y su ejecutor incremental."""
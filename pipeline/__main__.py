@@ -0,0 +1,52 @@
+"""Punto de entrada: `python -m pipeline [opciones]`."""
+import argparse
+import sys
+
+from pipeline.config import DATASETS
+from pipeline.runner import FALLIDA, construir_tareas, ejecutar, periodo_actual, periodos_entre, resumen
+from pipeline.streaming import CAPACIDAD_COLA, ETAPAS, ejecutar_streaming
+
+
+def workers_por_etapa(valor):
+    """Convierte 'etapa=N' en (etapa, N)."""
+    etapa, _, n = valor.partition("=")
+    if etapa not in ETAPAS or not n.isdigit() or int(n) < 1:
+        raise argparse.ArgumentTypeError(f"se esperaba etapa=N con etapa en {', '.join(ETAPAS)}")
+    return etapa, int(n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline",
+        description="Actualiza incrementalmente descargas, extracciones, pre_data y series de data/.",
+    )
+    parser.add_argument("--desde", default="0123", help="Primer periodo MMYY (por defecto 0123)")
+    parser.add_argument("--hasta", default=periodo_actual(), help="Último periodo MMYY (por defecto el mes actual)")
+    parser.add_argument("--datasets", nargs="+", choices=DATASETS, default=list(DATASETS))
+    parser.add_argument("--workers", type=int, default=4, help="Tareas en paralelo")
+    parser.add_argument("--forzar", action="store_true", help="Rehacer todo aunque esté al día")
+    parser.add_argument("--simular", action="store_true", help="Sólo listar lo que se rehará")
+    parser.add_argument("--publicar", action="store_true", help="Subir data/ a Hugging Face al final")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Procesar cada mes en flujo continuo con colas acotadas entre etapas")
+    parser.add_argument("--etapa-workers", nargs="+", type=workers_por_etapa, default=[], metavar="ETAPA=N",
+                        help="Hilos por etapa en modo streaming (p. ej. descargar=4 normalizar=2)")
+    parser.add_argument("--cola", type=int, default=CAPACIDAD_COLA,
+                        help="Meses en espera permitidos entre etapas en modo streaming")
+    args = parser.parse_args(argv)
+
+    periodos = periodos_entre(args.desde, args.hasta)
+    if args.streaming and not args.simular:
+        estados = ejecutar_streaming(
+            periodos, args.datasets, workers=dict(args.etapa_workers), capacidad=args.cola,
+            forzar=args.forzar, con_publicacion=args.publicar,
+        )
+    else:
+        tareas = construir_tareas(periodos, args.datasets, con_publicacion=args.publicar)
+        estados = ejecutar(tareas, workers=args.workers, forzar=args.forzar, simular=args.simular)
+    print(f"Resumen: {resumen(estados)}")
+    return 1 if FALLIDA in estados.values() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
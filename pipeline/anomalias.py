@@ -0,0 +1,138 @@
+"""Detección de valores anómalos en todas las medidas y centrales a la vez.
+
+    python -m pipeline.anomalias               # escribe data/estrella/anomalias.parquet
+
+Cada medida de los hechos del esquema estrella (energía, potencia, precios,
+peaje e ingresos) se pasa a una matriz mes × central y se marcan, con NumPy
+sobre la matriz completa:
+
+- z: el valor se aleja de la mediana de los VENTANA meses anteriores en más de
+  UMBRAL_Z desvíos robustos (MAD escalado);
+- salto: el valor se multiplica o se divide por más de FACTOR_SALTO respecto
+  del mes anterior. Sólo se mide entre meses positivos: un 0 es una central
+  parada (mantenimiento, sin despacho), no un salto, y entrar o salir de 0 no
+  se marca por esta regla.
+
+La tabla sólo guarda los puntos marcados, con el motivo; las páginas los
+resaltan sobre la historia de cada central sin recalcular nada. Son avisos
+para revisar a mano, no filtros: el precio monómico publicado mantiene su
+propio filtro de atípicos (04_notebook_monomico).
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.claves import registro
+from pipeline.config import DATA_FOLDER
+from pipeline.estrella import carpeta_estrella, columnas_medida, construir as construir_estrella, escribir_parquet
+
+VENTANA = 12
+# Meses con datos que necesita la ventana para calcular el z
+MINIMO_MESES = 6
+UMBRAL_Z = 3.5
+FACTOR_SALTO = 3
+# Desvío mínimo, relativo a la mediana: una serie constante no marca cambios mínimos
+DESVIO_MINIMO = 0.05
+# MAD → desvío estándar para datos normales
+ESCALA_MAD = 1.4826
+
+
+def ruta(data=DATA_FOLDER):
+    return carpeta_estrella(data) / "anomalias.parquet"
+
+
+# === DETECCIÓN (matriz mes × central) ===
+
+def mediana(ventanas):
+    """Mediana del último eje ignorando NaN (ordena una vez: más rápido que np.nanmedian)."""
+    orden = np.sort(ventanas, axis=-1)  # los NaN quedan al final
+    n = (~np.isnan(orden)).sum(axis=-1, keepdims=True)
+    bajo = np.take_along_axis(orden, np.maximum(n - 1, 0) // 2, axis=-1)
+    alto = np.take_along_axis(orden, n // 2, axis=-1)
+    return np.where(n > 0, (bajo + alto) / 2, np.nan)[..., 0]
+
+
+def z_robusto(y, ventana=VENTANA):
+    """Z de cada valor respecto de la mediana y el MAD de los `ventana` meses anteriores."""
+    previos = np.vstack([np.full((ventana, y.shape[1]), np.nan), y[:-1]])
+    # ventanas[t] son los `ventana` meses anteriores a t, para todas las centrales
+    ventanas = np.lib.stride_tricks.sliding_window_view(previos, ventana, axis=0)[: len(y)]
+    centro = mediana(ventanas)
+    mad = mediana(np.abs(ventanas - centro[..., None]))
+    escala = np.maximum(ESCALA_MAD * mad, DESVIO_MINIMO * np.abs(centro))
+    suficientes = (~np.isnan(ventanas)).sum(axis=-1) >= MINIMO_MESES
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (y - centro) / escala
+    return np.where(suficientes & (escala > 0), z, np.nan)
+
+
+def salto(y):
+    """Cambio relativo respecto del mes anterior; NaN si alguno de los dos meses no es positivo."""
+    anterior = np.vstack([np.full((1, y.shape[1]), np.nan), y[:-1]])
+    positivos = (anterior > 0) & (y > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(positivos, (y - anterior) / anterior, np.nan)
+
+
+def marcas(y):
+    """(z, salto, motivo) como matrices; motivo vacío en los valores normales."""
+    z, s = z_robusto(y), salto(y)
+    por_z = np.abs(z) > UMBRAL_Z
+    por_salto = (s > FACTOR_SALTO - 1) | (s < 1 / FACTOR_SALTO - 1)
+    motivo = np.where(por_z & por_salto, "z+salto", np.where(por_z, "z", np.where(por_salto, "salto", "")))
+    return z, s, motivo
+
+
+# === TABLA ===
+
+def construir(data=DATA_FOLDER):
+    """Puntos marcados: MEDIDA, central_id, CENTRAL, FECHA, valor, z, salto y motivo."""
+    hechos = construir_estrella(data)["hechos"]
+    meses = pd.date_range(hechos["FECHA"].min(), hechos["FECHA"].max(), freq="MS")
+    partes = []
+    for medida in columnas_medida():
+        matriz = hechos.pivot(index="FECHA", columns="central_id", values=medida).reindex(meses)
+        y = matriz.to_numpy(dtype="float64")
+        z, s, motivo = marcas(y)
+        fila, columna = np.nonzero(motivo != "")
+        partes.append(pd.DataFrame({
+            "MEDIDA": medida,
+            "central_id": matriz.columns.to_numpy()[columna],
+            "FECHA": meses[fila],
+            "valor": y[fila, columna],
+            "z": z[fila, columna],
+            "salto": s[fila, columna],
+            "motivo": motivo[fila, columna],
+        }))
+    tabla = pd.concat(partes, ignore_index=True)
+    tabla["central_id"] = tabla["central_id"].astype("int32")
+    tabla.insert(2, "CENTRAL", registro(data).a_nombres("central", tabla["central_id"]))
+    tabla["FECHA"] = tabla["FECHA"].astype("datetime64[ns]")
+    return tabla.sort_values(["MEDIDA", "central_id", "FECHA"], ignore_index=True)
+
+
+def generar_anomalias(data=DATA_FOLDER):
+    """Escribe data/estrella/anomalias.parquet; devuelve la tabla. Requiere pyarrow."""
+    tabla = construir(data)
+    destino = ruta(data)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escribir_parquet(tabla, destino)
+    print(f"[anomalias] {destino.name}: {len(tabla)} puntos marcados")
+    for (medida, motivo), n in tabla.groupby(["MEDIDA", "motivo"]).size().items():
+        print(f"  {medida} ({motivo}): {n}")
+    return tabla
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.anomalias", description=__doc__.split("\n")[0])
+    parser.add_argument("--data", type=Path, default=DATA_FOLDER, help="Carpeta con las series (por defecto data/)")
+    args = parser.parse_args(argv)
+    generar_anomalias(args.data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
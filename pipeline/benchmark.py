@@ -0,0 +1,314 @@
+"""Benchmark de las etapas del pipeline sobre libros CNDC sintéticos.
+
+    python -m pipeline.benchmark                      # escalas 1× y 10×
+    python -m pipeline.benchmark --escalas 1 10 100 --meses 12
+    python -m pipeline.benchmark --comparar base.json nuevo.json
+    python -m pipeline.benchmark --sin-convertir      # sin pyexcel-xls/xlwt: no mide 02_convert
+
+La escala multiplica la cantidad de centrales (1× = 50, como el archivo real).
+Cada etapa se mide en un directorio temporal propio: tiempo de reloj y pico de
+memoria asignada (tracemalloc). El reporte JSON incluye el commit, así se
+pueden comparar corridas entre versiones.
+
+La etapa convertir necesita pyexcel-xls (y xlwt para generar los .xls de
+prueba); si faltan, el benchmark se detiene en vez de reportarla omitida,
+salvo que se pida --sin-convertir.
+"""
+import argparse
+import contextlib
+import functools
+import http.server
+import io
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.config import BASE_DIR, DATASETS
+from pipeline.runner import STATE_FOLDER, script
+from pipeline.sintetico import generar_historia
+
+PLANTAS_BASE = 50
+ESCALAS = (1, 10)
+MESES = 6
+REPORTS_FOLDER = STATE_FOLDER / "benchmarks"
+
+# Archivo de data/, medida, columnas de identificación y agrupador de cada página
+POR_GENERADOR = ["CENTRAL", "GENERADOR", "central_id", "generador_id"]
+POR_TECNOLOGIA = ["CENTRAL", "TECNOLOGIA", "central_id", "tecnologia_id"]
+PAGINAS = [
+    ("serie_energia", "Energía kWh", POR_GENERADOR, False, "generador_id"),
+    ("serie_energia", "Energía kWh", POR_TECNOLOGIA, False, "tecnologia_id"),
+    ("serie_potencia", "Potencia kW", POR_GENERADOR, False, "generador_id"),
+    ("serie_potencia", "Potencia kW", POR_TECNOLOGIA, False, "tecnologia_id"),
+    ("serie_precios_energia", "Precio Energía USD/MWh", POR_TECNOLOGIA, True, "tecnologia_id"),
+    ("serie_precios_potencia", "Precio Potencia USD/kW", POR_TECNOLOGIA, True, "tecnologia_id"),
+    ("serie_peaje", "Peaje generación USD/MWh", POR_TECNOLOGIA, True, "tecnologia_id"),
+    ("precios_monomico", "Precio Monómico USD/MWh", POR_TECNOLOGIA, True, "tecnologia_id"),
+]
+
+
+class EtapaOmitida(Exception):
+    """La etapa no puede medirse en este entorno (p. ej. falta una dependencia)."""
+
+
+class DependenciaFaltante(RuntimeError):
+    """Falta una dependencia para medir una etapa que no se pidió omitir."""
+
+
+def medir(funcion, memoria=True):
+    """Ejecuta funcion() y devuelve (resultado, segundos, pico en MB o None)."""
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion()
+    finally:
+        segundos = time.perf_counter() - inicio
+        pico = None
+        if memoria:
+            pico = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+    return resultado, segundos, pico
+
+
+# === ETAPAS ===
+
+def etapa_descargar(ws, periodos):
+    """Descarga los libros desde un servidor HTTP local con 01_import_cndc."""
+    try:
+        importador = script("01_import_cndc")
+    except ImportError as e:
+        raise EtapaOmitida(str(e))
+
+    handler = functools.partial(_HandlerSilencioso, directory=str(ws["origen"]))
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        base = f"http://127.0.0.1:{servidor.server_address[1]}"
+        for periodo in periodos:
+            filepath = importador.download_file(f"{base}/c_iny_{periodo}.xlsx", str(ws["downloads"]))
+            importador.process_file(filepath, str(ws["downloads"]))
+    finally:
+        servidor.shutdown()
+    return len(periodos)
+
+
+class _HandlerSilencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def etapa_convertir(ws, periodos):
+    """Convierte copias .xls de los libros con 02_convert (requiere pyexcel-xls)."""
+    try:
+        convertidor = script("02_convert")
+    except ImportError as e:
+        raise DependenciaFaltante(f"02_convert no se puede importar ({e}); instalar pyexcel y pyexcel-xls") from e
+    for periodo in periodos:
+        xls = ws["xls"] / f"c_iny_{periodo}.xls"
+        convertidor.convertir_archivo(str(xls), str(xls.with_suffix(".xlsx")))
+    return len(periodos)
+
+
+def etapa_extraer(ws, periodos):
+    for ds in DATASETS:
+        extractor = script(f"03_extract__{ds}_columns")
+        for periodo in periodos:
+            extractor.extract_file(
+                ws["downloads"] / f"c_iny_{periodo}.xlsx",
+                ws["downloads"] / f"extracted_{ds}_c_iny_{periodo}.xlsx",
+            )
+    return len(DATASETS) * len(periodos)
+
+
+def etapa_normalizar(ws, periodos):
+    from pipeline.claves import registro
+    from pipeline.normalizar import cargar_centrales, normalizar_archivo
+    from utils.spreadsheet import write_sheet
+
+    centrales = cargar_centrales(ws["origen"] / "empresas_generadoras.xlsx")
+    # Registro propio de la carpeta de trabajo: no toca data/claves.json
+    claves = registro(ws["data"])
+    for ds in DATASETS:
+        for periodo in periodos:
+            df = normalizar_archivo(ws["downloads"] / f"extracted_{ds}_c_iny_{periodo}.xlsx", ds, centrales, claves)
+            write_sheet(df, ws["pre_data"] / f"{ds}_centrales_{periodo}.xlsx")
+    claves.guardar()
+    return len(DATASETS) * len(periodos)
+
+
+def etapa_consolidar(ws, periodos):
+    from pipeline.consolidar import consolidar, generar_precios_monomico
+
+    for ds in DATASETS:
+        consolidar(ds, ws["pre_data"], ws["preprocess"], ws["data"])
+    generar_precios_monomico(ws["preprocess"], ws["data"])
+    return len(DATASETS) + 1
+
+
+def etapa_paginas(ws, periodos):
+    """Carga y agrega cada serie como lo hacen las páginas del dashboard (por ids, con nombres)."""
+    from utils.query import query_pandas
+    from utils.spreadsheet import read_sheet
+    from utils.transform import melt_measure, names_by_id
+
+    for archivo, medida, id_vars, dropna, agrupador in PAGINAS:
+        df = read_sheet(ws["data"] / f"{archivo}.xlsx")
+        largo = melt_measure(df, medida, id_vars=id_vars, dropna=dropna)
+        nombre = id_vars[1]
+        por_mes = query_pandas(largo, medida, by=[agrupador, "FECHA"])
+        por_mes[nombre] = por_mes[agrupador].map(names_by_id(largo, agrupador, nombre))
+        por_central = query_pandas(largo, medida, by=["central_id"], agg="mean", dropna=True)
+        por_central["CENTRAL"] = por_central["central_id"].map(names_by_id(largo, "central_id", "CENTRAL"))
+    return len(PAGINAS)
+
+
+ETAPAS = [
+    ("descargar", etapa_descargar),
+    ("convertir", etapa_convertir),
+    ("extraer", etapa_extraer),
+    ("normalizar", etapa_normalizar),
+    ("consolidar", etapa_consolidar),
+    ("paginas", etapa_paginas),
+]
+
+
+# === CORRIDA ===
+
+def preparar(raiz, plantas, meses, convertir=True):
+    ws = {nombre: raiz / nombre for nombre in ("origen", "xls", "downloads", "pre_data", "preprocess", "data")}
+    for carpeta in ws.values():
+        carpeta.mkdir(parents=True, exist_ok=True)
+    periodos, _ = generar_historia(ws["origen"], plantas, meses)
+    if convertir:
+        try:
+            generar_historia(ws["xls"], plantas, meses, formato="xls")
+        except Exception as e:
+            raise DependenciaFaltante(
+                f"no se pudieron generar los libros .xls de prueba ({type(e).__name__}: {e}); "
+                "instalar pyexcel-xls y xlwt, o correr con --sin-convertir"
+            ) from e
+    return ws, periodos
+
+
+def correr_escala(escala, meses, memoria=True, convertir=True):
+    plantas = PLANTAS_BASE * escala
+    raiz = Path(tempfile.mkdtemp(prefix=f"bench_{escala}x_"))
+    try:
+        ws, periodos = preparar(raiz, plantas, meses, convertir)
+        resultados = {}
+        for nombre, etapa in ETAPAS:
+            if nombre == "convertir" and not convertir:
+                resultados[nombre] = {"omitida": "--sin-convertir"}
+                print(f"  {nombre:<11} omitida (--sin-convertir)")
+                continue
+            if nombre == "extraer" and not any(ws["downloads"].glob("c_iny_*.xlsx")):
+                # Sin etapa de descarga, los libros se copian tal cual
+                for libro in ws["origen"].glob("c_iny_*.xlsx"):
+                    shutil.copy(libro, ws["downloads"])
+            try:
+                # Los mensajes de cada etapa se silencian para no mezclar el reporte
+                with contextlib.redirect_stdout(io.StringIO()):
+                    unidades, segundos, pico = medir(lambda: etapa(ws, periodos), memoria)
+            except EtapaOmitida as e:
+                resultados[nombre] = {"omitida": str(e)}
+                print(f"  {nombre:<11} omitida ({e})")
+                continue
+            resultados[nombre] = {"segundos": round(segundos, 4), "pico_mb": pico and round(pico, 2),
+                                  "unidades": unidades}
+            memoria_txt = f", pico {pico:.1f} MB" if pico is not None else ""
+            print(f"  {nombre:<11} {segundos:8.2f} s{memoria_txt} ({unidades} unidades)")
+        return {"escala": escala, "plantas": plantas, "meses": meses, "etapas": resultados}
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+
+
+def commit_actual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def correr(escalas=ESCALAS, meses=MESES, memoria=True, salida=None, convertir=True):
+    """Corre todas las escalas y guarda el reporte JSON; devuelve su ruta."""
+    reporte = {
+        "commit": commit_actual(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "memoria": memoria,
+        "convertir": convertir,
+        "escalas": [],
+    }
+    for escala in escalas:
+        print(f"Escala {escala}× ({PLANTAS_BASE * escala} centrales, {meses} meses)")
+        reporte["escalas"].append(correr_escala(escala, meses, memoria, convertir))
+
+    salida = Path(salida) if salida else REPORTS_FOLDER / f"bench_{reporte['commit']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(reporte, indent=1, ensure_ascii=False))
+    print(f"Reporte guardado en {salida}")
+    return salida
+
+
+def comparar(base, nuevo):
+    """Imprime, por escala y etapa, el tiempo y la memoria de `nuevo` relativos a `base`."""
+    a, b = (json.loads(Path(p).read_text()) for p in (base, nuevo))
+    print(f"{a['commit']} → {b['commit']}")
+    escalas_a = {e["escala"]: e for e in a["escalas"]}
+    for escala_b in b["escalas"]:
+        escala_a = escalas_a.get(escala_b["escala"])
+        if escala_a is None:
+            continue
+        print(f"Escala {escala_b['escala']}×")
+        for nombre, rb in escala_b["etapas"].items():
+            ra = escala_a["etapas"].get(nombre, {})
+            if "segundos" not in ra or "segundos" not in rb:
+                print(f"  {nombre:<11} sin datos comparables")
+                continue
+            linea = f"  {nombre:<11} {ra['segundos']:8.2f} s → {rb['segundos']:8.2f} s ({rb['segundos'] / max(ra['segundos'], 1e-9):.2f}×)"
+            if ra.get("pico_mb") and rb.get("pico_mb"):
+                linea += f"  memoria {ra['pico_mb']:.1f} → {rb['pico_mb']:.1f} MB"
+            print(linea)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.benchmark", description=__doc__.split("\n")[0])
+    parser.add_argument("--escalas", nargs="+", type=int, default=list(ESCALAS),
+                        help=f"Multiplicadores de centrales (1× = {PLANTAS_BASE})")
+    parser.add_argument("--meses", type=int, default=MESES, help="Meses de historia por escala")
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir memoria (tracemalloc agrega sobrecosto)")
+    parser.add_argument("--salida", help="Ruta del reporte JSON")
+    parser.add_argument("--sin-convertir", action="store_true",
+                        help="No medir la conversión .xls → .xlsx (sin pyexcel-xls/xlwt)")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"), help="Comparar dos reportes")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return 0
+    try:
+        correr(args.escalas, args.meses, memoria=not args.sin_memoria, salida=args.salida,
+               convertir=not args.sin_convertir)
+    except DependenciaFaltante as e:
+        print(f"[Error] {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
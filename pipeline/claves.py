@@ -0,0 +1,287 @@
+"""Registro de claves enteras de centrales, generadores y tecnologías.
+
+Cada nombre recibe una sola vez un id entero que no cambia: la normalización
+lo asigna al leer cada archivo del CNDC y lo guarda en pre_data junto al
+nombre; la consolidación lo lleva a las series de data/ (central_id,
+generador_id, tecnologia_id) y las páginas, las consultas y el esquema estrella
+agrupan y unen por id. Un cambio de nombre se registra como alias del
+mismo id, así el histórico sigue siendo una sola central:
+
+    python -m pipeline.claves                                        # lista las claves
+    python -m pipeline.claves renombrar central "Yunchara" "Yunchará"
+
+El registro vive en data/claves.json y es un archivo versionado, no una
+salida que se pueda regenerar: los ids ya publicados dependen de él. La
+primera vez se siembra con las centrales del archivo de centrales en orden
+alfabético (mismos ids en cualquier máquina) y después sólo crece: cada nombre
+nuevo recibe el siguiente id. Por dimensión guarda {id: [nombre a mostrar,
+alias...]} y los ids fusionados en otro (cuando un nombre nuevo resultó ser una
+central ya registrada). Una carpeta de series distinta de data/ (benchmark,
+pruebas) tiene su propio registro, sembrado al vuelo.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.config import DATA_FOLDER
+
+CLAVES_FILE = DATA_FOLDER / "claves.json"
+
+# Dimensión → columna de nombres y columna de ids en las tablas
+DIMENSIONES = {
+    "central": ("CENTRAL", "central_id"),
+    "generador": ("GENERADOR", "generador_id"),
+    "tecnologia": ("TECNOLOGIA", "tecnologia_id"),
+}
+ID_COLS = [columna_id for _, columna_id in DIMENSIONES.values()]
+
+
+def limpiar(nombre):
+    """Nombre tal como se registra; None si no hay nombre."""
+    if nombre is None or pd.isna(nombre):
+        return None
+    nombre = str(nombre).strip()
+    return nombre if nombre and nombre.lower() != "nan" else None
+
+
+class Claves:
+    """Ids enteros estables por dimensión, con alias y fusiones."""
+
+    def __init__(self, path=CLAVES_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.cambios = False
+        try:
+            datos = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            datos = {}
+        self.nombres = {}
+        self.fusionados = {}
+        self.ids = {}
+        for dim in DIMENSIONES:
+            d = datos.get(dim, {})
+            self.nombres[dim] = {int(i): list(n) for i, n in d.get("nombres", {}).items()}
+            self.fusionados[dim] = {int(i): int(a) for i, a in d.get("fusionados", {}).items()}
+            self.ids[dim] = {n: i for i, nombres in self.nombres[dim].items() for n in nombres}
+
+    def nuevo(self):
+        return not self.path.exists()
+
+    # === CONSULTA Y ASIGNACIÓN ===
+
+    def canonico(self, dim, id_):
+        while id_ in self.fusionados[dim]:
+            id_ = self.fusionados[dim][id_]
+        return id_
+
+    def id(self, dim, nombre, registrar=True):
+        """Id del nombre; si no está registrado se le asigna el siguiente (o None)."""
+        nombre = limpiar(nombre)
+        if nombre is None:
+            return None
+        with self._lock:
+            id_ = self.ids[dim].get(nombre)
+            if id_ is None and registrar:
+                usados = [*self.nombres[dim], *self.fusionados[dim]]
+                id_ = max(usados, default=0) + 1
+                self.nombres[dim][id_] = [nombre]
+                self.ids[dim][nombre] = id_
+                self.cambios = True
+        return id_
+
+    def asignar(self, dim, nombres, registrar=True):
+        """Ids (Int32, <NA> sin nombre) de una columna de nombres; resuelve cada nombre distinto una vez."""
+        nombres = pd.Series(nombres)
+        mapa = {n: self.id(dim, n, registrar) for n in nombres.dropna().unique()}
+        return pd.array(nombres.map(mapa), dtype="Int32")
+
+    def canonicos(self, dim, ids):
+        """Ids (Int32) con los fusionados reemplazados por el id en que se fusionaron."""
+        ids = pd.Series(ids)
+        mapa = {i: self.canonico(dim, int(i)) for i in ids.dropna().unique()}
+        return pd.array(ids.map(mapa), dtype="Int32")
+
+    def nombre(self, dim, id_):
+        """Nombre a mostrar del id (del id en que se fusionó, si corresponde)."""
+        if id_ is None or pd.isna(id_):
+            return None
+        nombres = self.nombres[dim].get(self.canonico(dim, int(id_)))
+        return nombres[0] if nombres else None
+
+    def a_nombres(self, dim, ids):
+        """Nombres a mostrar de una columna de ids, resolviendo cada id distinto una vez."""
+        ids = pd.Series(ids)
+        mapa = {i: self.nombre(dim, i) for i in ids.dropna().unique()}
+        return ids.map(mapa)
+
+    def tabla(self, dim, ids=None):
+        """Dimensión como DataFrame (id, nombre), de todos los ids o de los indicados."""
+        nombre_col, id_col = DIMENSIONES[dim]
+        ids = sorted(self.nombres[dim] if ids is None else {self.canonico(dim, int(i)) for i in ids})
+        return pd.DataFrame({
+            id_col: pd.array(ids, dtype="int32"),
+            nombre_col: [self.nombre(dim, i) for i in ids],
+        })
+
+    # === MANTENIMIENTO ===
+
+    def sembrar(self, dim, nombres):
+        """Registra los nombres que falten en orden alfabético (ids reproducibles)."""
+        for nombre in sorted({n for n in map(limpiar, nombres) if n is not None}):
+            self.id(dim, nombre)
+
+    def renombrar(self, dim, actual, nuevo):
+        """
+        Nuevo nombre a mostrar para el id de `actual`; el anterior queda como alias.
+        Si `nuevo` ya tenía su propio id, ese id se fusiona en el de `actual`.
+        """
+        actual, nuevo = limpiar(actual), limpiar(nuevo)
+        with self._lock:
+            if actual not in self.ids[dim]:
+                raise KeyError(f"'{actual}' no está registrado en {dim}")
+            id_ = self.canonico(dim, self.ids[dim][actual])
+            otro = self.ids[dim].get(nuevo)
+            if otro is not None and self.canonico(dim, otro) != id_:
+                otro = self.canonico(dim, otro)
+                for alias in self.nombres[dim].pop(otro):
+                    self.ids[dim][alias] = id_
+                    if alias != nuevo:
+                        self.nombres[dim][id_].append(alias)
+                self.fusionados[dim][otro] = id_
+            nombres = self.nombres[dim][id_]
+            if nuevo in nombres:
+                nombres.remove(nuevo)
+            nombres.insert(0, nuevo)
+            self.ids[dim][nuevo] = id_
+            self.cambios = True
+        return id_
+
+    def guardar(self):
+        """Escribe el registro si cambió (escritura atómica)."""
+        with self._lock:
+            if not self.cambios:
+                return
+            datos = {
+                dim: {
+                    "nombres": {str(i): n for i, n in sorted(self.nombres[dim].items())},
+                    "fusionados": {str(i): a for i, a in sorted(self.fusionados[dim].items())},
+                }
+                for dim in DIMENSIONES
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(datos, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+            os.replace(tmp, self.path)
+            self.cambios = False
+
+
+# === TABLAS ===
+
+def con_claves(df, claves):
+    """Agrega (o completa) las columnas de ids de las dimensiones que tiene df."""
+    df = df.copy()
+    for dim, (nombre_col, id_col) in DIMENSIONES.items():
+        if nombre_col not in df.columns:
+            continue
+        ids = pd.Series(claves.asignar(dim, df[nombre_col]), index=df.index)
+        if id_col in df.columns:
+            # Los ids del archivo mandan; los que falten se resuelven por nombre
+            ids = df[id_col].astype("Int32").fillna(ids)
+        df[id_col] = ids
+    return df
+
+
+def con_nombres(df, claves):
+    """
+    Pone el nombre a mostrar de los ids renombrados. Los demás nombres quedan
+    tal como se publicaron (con sus espacios).
+    """
+    df = df.copy()
+    for dim, (nombre_col, id_col) in DIMENSIONES.items():
+        if id_col not in df.columns:
+            continue
+        nombres = claves.a_nombres(dim, df[id_col])
+        if nombre_col in df.columns:
+            renombrado = nombres.notna() & (nombres != df[nombre_col].map(limpiar))
+            nombres = nombres.where(renombrado, df[nombre_col])
+        df[nombre_col] = nombres
+    return df
+
+
+def ids_canonicos(df, claves, origen="la serie"):
+    """
+    Columnas de ids de una serie de data/ con los fusionados resueltos; las
+    dimensiones que la serie no trae quedan en <NA>. ValueError si no tiene
+    central_id (serie escrita antes del registro).
+    """
+    if "central_id" not in df.columns:
+        raise ValueError(f"{origen} no tiene ids de pipeline.claves: regenerar las series con python -m pipeline")
+    df = df.copy()
+    for dim, (_, id_col) in DIMENSIONES.items():
+        ids = df[id_col] if id_col in df.columns else pd.Series(pd.NA, index=df.index)
+        df[id_col] = claves.canonicos(dim, ids)
+    return df
+
+
+def sembrar_centrales(claves):
+    """
+    Siembra el registro con el archivo de centrales: sólo las filas de centrales
+    (no los TOTAL de cada generador), con el nombre que les deja la normalización
+    (alias y variantes de Aguaí), así cada central tiene un solo id.
+    """
+    from pipeline.normalizar import CENTRAL, cargar_centrales, clasificar, normalizar_nombre
+
+    centrales = cargar_centrales()
+    # Las claves del mapeo de generadores incluyen las centrales de Aguaí
+    filas = [n for n in centrales["generadores"] if clasificar(n) == CENTRAL]
+    claves.sembrar("central", {normalizar_nombre(n, centrales["nombres"]) for n in filas})
+    claves.sembrar("generador", [centrales["generadores"][n] for n in filas])
+    claves.sembrar("tecnologia", [centrales["tecnologia"].get(n) for n in filas])
+
+
+_registros = {}
+_registros_lock = threading.Lock()
+
+
+def registro(data=DATA_FOLDER):
+    """Registro de la carpeta de series (uno por proceso); si no existe se siembra con el archivo de centrales."""
+    path = (Path(data) / CLAVES_FILE.name).resolve()
+    with _registros_lock:
+        if path not in _registros:
+            claves = Claves(path)
+            if claves.nuevo():
+                sembrar_centrales(claves)
+            _registros[path] = claves
+    return _registros[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.claves", description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="comando")
+    ren = sub.add_parser("renombrar", help="Nuevo nombre a mostrar; el anterior queda como alias")
+    ren.add_argument("dimension", choices=list(DIMENSIONES))
+    ren.add_argument("actual")
+    ren.add_argument("nuevo")
+    args = parser.parse_args(argv)
+
+    claves = registro()
+    if args.comando == "renombrar":
+        id_ = claves.renombrar(args.dimension, args.actual, args.nuevo)
+        print(f"{args.dimension} {id_}: {args.nuevo} (alias: {', '.join(claves.nombres[args.dimension][id_][1:])})")
+    else:
+        for dim in DIMENSIONES:
+            print(f"== {dim} ==")
+            for id_, nombres in sorted(claves.nombres[dim].items()):
+                alias = f" (alias: {', '.join(nombres[1:])})" if len(nombres) > 1 else ""
+                print(f"{id_:>4}  {nombres[0]}{alias}")
+    claves.guardar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Comparador de salidas de data/ contra una instantánea de referencia.
+
+    python -m pipeline.comparar git:HEAD data/        # contra lo publicado en el último commit
+    python -m pipeline.comparar /tmp/golden data/ --rtol 1e-9 --atol 1e-6
+    python -m pipeline.comparar viejo.xlsx nuevo.xlsx --salida diferencias.csv
+
+Cada tabla ancha se pasa a formato largo (CENTRAL × medida × periodo) y se
+alinea con un solo merge, así el costo crece con el número de celdas y no con
+el de filas × columnas comparadas una a una. Las diferencias se informan por
+celda: valor distinto (fuera de tolerancia), celda sólo en la referencia o
+sólo en la salida nueva.
+
+Las filas se alinean por CENTRAL, GENERADOR y TECNOLOGIA sin espacios en los
+extremos (las que tengan las dos tablas); OCURRENCIA sólo desempata las filas
+repetidas con la misma clave, así un cambio de orden no mueve valores de una
+fila a otra. Las filas que quedan sin pareja se alinean por CENTRAL sola (un
+generador renombrado sigue siendo la misma fila). Los textos de CENTRAL,
+GENERADOR y TECNOLOGIA y sus ids enteros (central_id, generador_id,
+tecnologia_id) se comparan tal cual, y un cambio (aunque sea un espacio) se
+informa como id_distinto, con la columna en MEDIDA. Una columna de ids que
+sólo tiene una de las dos tablas no se compara.
+"""
+import argparse
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.claves import ID_COLS as CLAVES
+from pipeline.config import BASE_DIR
+from utils.spreadsheet import read_sheet
+from utils.transform import to_numeric_clean
+
+NOMBRES = ["CENTRAL", "GENERADOR", "TECNOLOGIA"]
+ID_COLS = [*NOMBRES, *CLAVES]
+PATRON_ARCHIVOS = "*serie*.xlsx"
+ARCHIVOS_EXTRA = ["precios_monomico.xlsx"]
+
+RTOL = 1e-9
+ATOL = 1e-6
+
+# Tipos de diferencia por celda
+DISTINTO = "distinto"
+SOLO_REFERENCIA = "solo_referencia"
+SOLO_NUEVO = "solo_nuevo"
+ID_DISTINTO = "id_distinto"
+
+COLUMNAS = ["TIPO", "CENTRAL", "OCURRENCIA", "MEDIDA", "PERIODO", "VALOR_REF", "VALOR_NUEVO", "DIFERENCIA"]
+
+
+def a_formato_largo(df, ids=ID_COLS, ocurrencia_por=None):
+    """
+    Tabla ancha '<medida> MMYYYY' → columnas id (textos sin tocar), OCURRENCIA,
+    MEDIDA, PERIODO, VALOR. OCURRENCIA numera las filas repetidas con los mismos
+    ids (o con las mismas columnas ocurrencia_por).
+    """
+    ids = [c for c in ids if c in df.columns]
+    valores = [c for c in df.columns if c not in ids]
+    df = textos_de_ids(df, ids)
+    por = ocurrencia_por or ids
+    df["OCURRENCIA"] = df.groupby(por, sort=False).cumcount() if por else np.arange(len(df))
+
+    largo = df.melt(id_vars=ids + ["OCURRENCIA"], value_vars=valores, var_name="COLUMNA", value_name="VALOR")
+    partes = largo["COLUMNA"].astype(str).str.rsplit(" ", n=1, expand=True)
+    if partes.shape[1] == 1:
+        partes[1] = ""
+    es_periodo = partes[1].str.fullmatch(r"\d{6}").fillna(False)
+    largo["MEDIDA"] = partes[0].where(es_periodo, largo["COLUMNA"])
+    largo["PERIODO"] = partes[1].where(es_periodo, "")
+    largo["VALOR"] = to_numeric_clean(largo["VALOR"])
+    return largo.drop(columns="COLUMNA")
+
+
+def textos_de_ids(df, ids):
+    """Columnas de ids como texto, sin tocar los espacios ('' si faltan)."""
+    df = df.copy()
+    for col in ids:
+        if col in CLAVES:
+            # Excel lee los ids como float si la columna tiene vacíos
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64").astype(object)
+        df[col] = df[col].fillna("").astype(str)
+    return df
+
+
+def claves_de_filas(df, nombres):
+    """Nombres sin espacios en los extremos y OCURRENCIA dentro de esa clave, una fila por fila de df."""
+    filas = pd.DataFrame({c: df[c].fillna("").astype(str).str.strip().to_numpy() for c in nombres})
+    filas["OCURRENCIA"] = filas.groupby(nombres, sort=False).cumcount() if nombres else np.arange(len(df))
+    filas["_FILA"] = np.arange(len(df))
+    return filas
+
+
+def emparejar(referencia, nuevo):
+    """
+    Pares de filas alineadas (_FILA_REF, _FILA_NUEVO; <NA> si la fila está en
+    un solo lado) con la CENTRAL y la OCURRENCIA con que se informan.
+    """
+    nombres = [c for c in NOMBRES if c in referencia.columns and c in nuevo.columns]
+    a, b = claves_de_filas(referencia, nombres), claves_de_filas(nuevo, nombres)
+    pares = a.merge(b, on=nombres + ["OCURRENCIA"], suffixes=("_REF", "_NUEVO"))
+
+    # Sin pareja por la clave completa: la misma CENTRAL, en orden
+    if "CENTRAL" in nombres and len(nombres) > 1:
+        sueltas_a = a.loc[~a["_FILA"].isin(pares["_FILA_REF"]), ["CENTRAL", "_FILA", "OCURRENCIA"]]
+        sueltas_b = b.loc[~b["_FILA"].isin(pares["_FILA_NUEVO"]), ["CENTRAL", "_FILA"]]
+        sueltas_a = sueltas_a.assign(_ORDEN=sueltas_a.groupby("CENTRAL", sort=False).cumcount())
+        sueltas_b = sueltas_b.assign(_ORDEN=sueltas_b.groupby("CENTRAL", sort=False).cumcount())
+        por_central = sueltas_a.merge(sueltas_b, on=["CENTRAL", "_ORDEN"], suffixes=("_REF", "_NUEVO"))
+        pares = pd.concat([pares, por_central.drop(columns="_ORDEN")])
+
+    solo_a = a[~a["_FILA"].isin(pares["_FILA_REF"])].rename(columns={"_FILA": "_FILA_REF"})
+    solo_b = b[~b["_FILA"].isin(pares["_FILA_NUEVO"])].rename(columns={"_FILA": "_FILA_NUEVO"})
+    pares = pd.concat([pares, solo_a, solo_b], ignore_index=True)
+    if "CENTRAL" not in pares.columns:
+        pares["CENTRAL"] = ""
+    pares = pares[["_FILA_REF", "_FILA_NUEVO", "CENTRAL", "OCURRENCIA"]].astype(
+        {"_FILA_REF": "Int64", "_FILA_NUEVO": "Int64"}
+    )
+    return pares.sort_values(["_FILA_REF", "_FILA_NUEVO"], ignore_index=True)
+
+
+def comparar_ids(referencia, nuevo, pares):
+    """Filas id_distinto por cada nombre o id que cambió en una fila alineada."""
+    pares = pares.dropna(subset=["_FILA_REF", "_FILA_NUEVO"])
+    a = textos_de_ids(referencia, [c for c in ID_COLS if c in referencia.columns])
+    b = textos_de_ids(nuevo, [c for c in ID_COLS if c in nuevo.columns])
+    filas_a, filas_b = pares["_FILA_REF"].to_numpy(int), pares["_FILA_NUEVO"].to_numpy(int)
+    partes = []
+    for col in ID_COLS:
+        if col not in a.columns or col not in b.columns:
+            continue
+        ref, nue = a[col].to_numpy()[filas_a], b[col].to_numpy()[filas_b]
+        cambiadas = ref != nue
+        partes.append(pd.DataFrame({
+            "TIPO": ID_DISTINTO,
+            "CENTRAL": pares["CENTRAL"].to_numpy()[cambiadas],
+            "OCURRENCIA": pares["OCURRENCIA"].to_numpy()[cambiadas],
+            "MEDIDA": col,
+            "PERIODO": "",
+            "VALOR_REF": ref[cambiadas].astype(object),
+            "VALOR_NUEVO": nue[cambiadas].astype(object),
+            "DIFERENCIA": np.nan,
+        }))
+    partes = [p for p in partes if not p.empty]
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUMNAS)
+
+
+def comparar_tablas(referencia, nuevo, rtol=RTOL, atol=ATOL):
+    """DataFrame con una fila por celda distinta y por texto de id cambiado entre dos tablas anchas."""
+    referencia, nuevo = referencia.reset_index(drop=True), nuevo.reset_index(drop=True)
+    pares = emparejar(referencia, nuevo)
+    ids = comparar_ids(referencia, nuevo, pares)
+
+    # Cada par de filas alineadas comparte un _PAR (su índice en pares); las de un solo lado tienen el suyo
+    claves = ["_PAR", "MEDIDA", "PERIODO"]
+    partes = []
+    for df, fila in ((referencia, "_FILA_REF"), (nuevo, "_FILA_NUEVO")):
+        con_fila = pares.dropna(subset=[fila])
+        par = pd.Series(con_fila.index, index=con_fila[fila].astype(int))
+        filas = pd.concat([df, pd.DataFrame({"_FILA": np.arange(len(df))})], axis=1)
+        largo = a_formato_largo(filas, ID_COLS + ["_FILA"])
+        largo["_PAR"] = largo["_FILA"].astype(int).map(par)
+        partes.append(largo[claves + ["VALOR"]])
+    unido = partes[0].merge(partes[1], on=claves, how="outer", suffixes=("_REF", "_NUEVO"), indicator=True)
+    unido = unido.join(pares[["CENTRAL", "OCURRENCIA"]], on="_PAR")
+
+    ref, nue = unido["VALOR_REF"].to_numpy(float), unido["VALOR_NUEVO"].to_numpy(float)
+    iguales = np.isclose(ref, nue, rtol=rtol, atol=atol, equal_nan=True)
+
+    tipo = np.select(
+        [unido["_merge"] == "left_only", unido["_merge"] == "right_only", ~iguales],
+        [SOLO_REFERENCIA, SOLO_NUEVO, DISTINTO],
+        default="",
+    )
+    difs = unido.assign(TIPO=tipo)
+    difs = difs[difs["TIPO"] != ""].drop(columns="_merge")
+    difs["DIFERENCIA"] = difs["VALOR_NUEVO"] - difs["VALOR_REF"]
+    if ids.empty:
+        return difs[COLUMNAS].reset_index(drop=True)
+    return pd.concat([ids, difs[COLUMNAS].astype({"VALOR_REF": object, "VALOR_NUEVO": object})], ignore_index=True)
+
+
+# === LECTURA ===
+
+def leer(origen, nombre=None):
+    """Lee un .xlsx de una ruta o de `git:<rev>` (ruta relativa al repo en `nombre`)."""
+    if str(origen).startswith("git:"):
+        rev = str(origen)[4:] or "HEAD"
+        contenido = subprocess.run(
+            ["git", "show", f"{rev}:data/{nombre}"], cwd=BASE_DIR, capture_output=True, check=True
+        ).stdout
+        return read_sheet(io.BytesIO(contenido))
+    ruta = Path(origen)
+    return read_sheet(ruta / nombre if ruta.is_dir() else ruta)
+
+
+def listar(origen):
+    """Nombres de archivos de salida disponibles en una carpeta o revisión."""
+    if str(origen).startswith("git:"):
+        rev = str(origen)[4:] or "HEAD"
+        salida = subprocess.run(
+            ["git", "ls-tree", "--name-only", rev, "data/"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        nombres = [Path(linea).name for linea in salida.splitlines()]
+    else:
+        nombres = [p.name for p in Path(origen).glob("*.xlsx")]
+    return sorted(n for n in nombres if Path(n).match(PATRON_ARCHIVOS) or n in ARCHIVOS_EXTRA)
+
+
+def comparar(referencia, nuevo, rtol=RTOL, atol=ATOL):
+    """Compara archivos o carpetas/revisiones; devuelve {archivo: DataFrame de diferencias}."""
+    es_archivo = not str(referencia).startswith("git:") and Path(referencia).is_file()
+    if es_archivo:
+        return {Path(nuevo).name: comparar_tablas(leer(referencia), leer(nuevo), rtol, atol)}
+
+    nombres_ref, nombres_nuevo = set(listar(referencia)), set(listar(nuevo))
+    resultados = {}
+    for nombre in sorted(nombres_ref | nombres_nuevo):
+        if nombre not in nombres_nuevo or nombre not in nombres_ref:
+            lado = SOLO_REFERENCIA if nombre in nombres_ref else SOLO_NUEVO
+            resultados[nombre] = pd.DataFrame({"TIPO": [lado], "MEDIDA": ["<archivo>"]})
+            continue
+        resultados[nombre] = comparar_tablas(leer(referencia, nombre), leer(nuevo, nombre), rtol, atol)
+    return resultados
+
+
+def informar(resultados, max_filas=20):
+    """Imprime un resumen por archivo y las primeras celdas distintas; devuelve el total."""
+    total = 0
+    for nombre, difs in resultados.items():
+        total += len(difs)
+        if difs.empty:
+            print(f"[OK] {nombre}")
+            continue
+        conteo = ", ".join(f"{n} {tipo}" for tipo, n in difs["TIPO"].value_counts().items())
+        print(f"[Diferente] {nombre}: {conteo}")
+        if max_filas:
+            muestra = difs.head(max_filas).copy()
+            # repr deja ver espacios y mayúsculas en los textos de id
+            es_id = muestra["TIPO"] == ID_DISTINTO
+            for col in ("VALOR_REF", "VALOR_NUEVO"):
+                if col in muestra.columns:
+                    muestra[col] = muestra[col].astype(object)
+                    muestra.loc[es_id, col] = muestra.loc[es_id, col].map(repr)
+            with pd.option_context("display.width", 200, "display.max_columns", 20):
+                print(muestra.to_string(index=False))
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.comparar", description=__doc__.split("\n")[0])
+    parser.add_argument("referencia", help="Archivo, carpeta o git:<rev> con las salidas de referencia")
+    parser.add_argument("nuevo", help="Archivo o carpeta con las salidas nuevas")
+    parser.add_argument("--rtol", type=float, default=RTOL, help="Tolerancia relativa")
+    parser.add_argument("--atol", type=float, default=ATOL, help="Tolerancia absoluta")
+    parser.add_argument("--max-filas", type=int, default=20, help="Celdas distintas a mostrar por archivo")
+    parser.add_argument("--salida", help="CSV con todas las diferencias")
+    args = parser.parse_args(argv)
+
+    resultados = comparar(args.referencia, args.nuevo, args.rtol, args.atol)
+    total = informar(resultados, args.max_filas)
+    if args.salida:
+        pd.concat(
+            [d.assign(ARCHIVO=n) for n, d in resultados.items() if not d.empty] or [pd.DataFrame()],
+            ignore_index=True,
+        ).to_csv(args.salida, index=False)
+    print(f"{total} diferencias en {sum(not d.empty for d in resultados.values())} archivo(s)")
+    return 1 if total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
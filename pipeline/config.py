@@ -0,0 +1,41 @@
+"""Rutas y constantes compartidas por las etapas del pipeline."""
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+DOWNLOAD_FOLDER = BASE_DIR / "downloads"
+PRE_DATA_FOLDER = BASE_DIR / "pre_data"
+PREPROCESS_FOLDER = BASE_DIR / "preprocess"
+DATA_FOLDER = BASE_DIR / "data"
+ERRORS_FOLDER = BASE_DIR / "errors"
+
+CENTRALES_FILE = DATA_FOLDER / "empresas_generadoras.xlsx"
+
+# Conjuntos de datos extraídos de cada archivo c_iny_MMYY
+DATASETS = ("energia", "ingresos", "peaje", "precios")
+
+
+def periodo_de_archivo(nombre):
+    """Código MMYY al final del nombre de un archivo (p. ej. 'c_iny_0125.xlsx' -> '0125')."""
+    return Path(nombre).stem.split("_")[-1]
+
+
+def clave_periodo(periodo):
+    """Clave de orden cronológico (año, mes) para un código MMYY."""
+    return (int(periodo[2:]), int(periodo[:2]))
+
+
+def raw_file(periodo):
+    return DOWNLOAD_FOLDER / f"c_iny_{periodo}.xlsx"
+
+
+def legacy_file(periodo):
+    return DOWNLOAD_FOLDER / f"c_iny_{periodo}.xls"
+
+
+def extracted_file(dataset, periodo):
+    return DOWNLOAD_FOLDER / f"extracted_{dataset}_c_iny_{periodo}.xlsx"
+
+
+def pre_data_file(dataset, periodo):
+    return PRE_DATA_FOLDER / f"{dataset}_centrales_{periodo}.xlsx"
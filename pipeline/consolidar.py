@@ -0,0 +1,349 @@
+"""Consolidación de pre_data/*_centrales_MMYY en las series de data/.
+
+Consolidación, pivoteo y salida final de las series; los notebooks 04 la
+llaman en lugar de sus celdas anteriores. Los intermedios de preprocess/ se
+siguen escribiendo. Las series llevan, después de CENTRAL/GENERADOR/TECNOLOGIA,
+sus ids enteros de pipeline.claves (central_id, generador_id, tecnologia_id).
+"""
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.claves import ID_COLS, con_claves, con_nombres, registro
+from pipeline.config import DATA_FOLDER, PRE_DATA_FOLDER, PREPROCESS_FOLDER, periodo_de_archivo
+from pipeline.normalizar import CENTRAL, clasificar_columna
+from utils.instrumentation import count_rows, instrument
+from utils.spreadsheet import read_sheet, write_sheet
+
+FIXED_COLS = ['CENTRAL', 'GENERADOR', 'TECNOLOGIA']
+
+# Id de los nombres vacíos en los índices de los pivoteos (pivot_table descarta
+# las claves nulas); el registro numera desde 1
+SIN_ID = 0
+
+# Intermedio en formato largo de cada conjunto
+LARGO_FILES = {
+    "energia": "serie_temporal_larga.xlsx",
+    "ingresos": "serie_temporal_ingresos.xlsx",
+    "peaje": "serie_peaje_filiales.xlsx",
+    "precios": "serie_temporal_precios.xlsx",
+}
+
+# Salidas finales de data/ de cada conjunto
+OUTPUTS = {
+    "energia": ["serie_energia.xlsx", "serie_potencia.xlsx"],
+    "ingresos": ["serie_ingresos.xlsx"],
+    "peaje": ["serie_peaje.xlsx"],
+    "precios": ["serie_precios_energia.xlsx", "serie_precios_potencia.xlsx"],
+    "monomico": ["precios_monomico.xlsx"],
+}
+
+VARIABLES_INGRESOS = [
+    "Energía KWh",
+    'Ingresos Energía USD',
+    'Ingresos Renovables USD',
+    'Ingresos Potencia USD'
+]
+
+VARIABLES_PRECIOS = ['Precio Energía USD/MWh', 'Precio Potencia USD/kW']
+
+
+def fecha_de_periodo(periodo):
+    """Primer día del mes de un código MMYY."""
+    return datetime(2000 + int(periodo[2:]), int(periodo[:2]), 1)
+
+
+def extraer_anio_mes(col_name):
+    """Clave (año, mes) a partir del sufijo MMYYYY de un nombre de columna."""
+    try:
+        fecha = col_name.split()[-1]
+        return (int(fecha[2:]), int(fecha[:2]))
+    except (IndexError, ValueError):
+        return (0, 0)
+
+
+def output_paths(dataset, data=DATA_FOLDER):
+    return [Path(data) / nombre for nombre in OUTPUTS[dataset]]
+
+
+# === FORMATO LARGO ===
+
+@instrument()
+def consolidar_en_formato_largo(dataset, pre_data=PRE_DATA_FOLDER, preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    """Une todos los pre_data/{dataset}_centrales_MMYY en una tabla larga (ids del registro de data)."""
+    archivos = sorted(Path(pre_data).glob(f"{dataset}_centrales_*.xlsx"))
+    if not archivos:
+        print("No se encontraron archivos.")
+        return None
+
+    registros = []
+    claves = registro(data)
+
+    for archivo in archivos:
+        try:
+            fecha = fecha_de_periodo(periodo_de_archivo(archivo))
+            df = read_sheet(archivo)
+            count_rows(rows_in=len(df))
+
+            # Verificar columnas esenciales
+            if 'CENTRAL' not in df.columns:
+                print(f"Omitido: {archivo} no tiene columna CENTRAL.")
+                continue
+
+            columnas_datos = [col for col in df.columns if col not in FIXED_COLS + ID_COLS]
+
+            # Si no hay columnas de datos, omitir
+            if not columnas_datos:
+                print(f"Omitido: {archivo} no tiene columnas de datos.")
+                continue
+
+            # Si no existe columna TECNOLOGIA, crear una con NaN
+            if 'TECNOLOGIA' not in df.columns:
+                df['TECNOLOGIA'] = None
+            # Los pre_data anteriores al registro de claves sólo traen nombres
+            df = con_claves(df, claves)
+
+            temp = pd.melt(
+                df,
+                id_vars=FIXED_COLS + ID_COLS,
+                value_vars=columnas_datos,
+                var_name='VARIABLE',
+                value_name='VALOR'
+            )
+            temp['FECHA'] = fecha
+            registros.append(temp)
+
+        except Exception as e:
+            print(f"Error procesando {archivo}: {e}")
+            continue
+
+    if not registros:
+        print("No se pudo consolidar ningún archivo válido.")
+        return None
+
+    # Un renombre registrado vale para todo el histórico; el resto de los nombres no se toca
+    df_largo = con_nombres(pd.concat(registros, ignore_index=True), claves)
+    claves.guardar()
+    df_largo = df_largo[['FECHA', *FIXED_COLS, *ID_COLS, 'VARIABLE', 'VALOR']]
+
+    Path(preprocess).mkdir(exist_ok=True)
+    write_sheet(df_largo, Path(preprocess) / LARGO_FILES[dataset])
+    print(f"Consolidación de {dataset} completada en formato largo. Filas totales: {len(df_largo)}")
+    return df_largo
+
+
+# === PIVOTEO ===
+
+def ids_para_indice(df, columnas):
+    """Ids como Int32 con SIN_ID en lugar de <NA>, para usarlos como índice de un pivoteo."""
+    for col in columnas:
+        if col in ID_COLS:
+            df[col] = df[col].astype('Int32').fillna(SIN_ID)
+    return df
+
+
+def ids_desde_indice(df):
+    """Vuelve a <NA> los SIN_ID de las columnas de ids."""
+    for col in ID_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('Int32').mask(df[col] == SIN_ID)
+    return df
+
+
+def pivotear_por_variable(df):
+    """Pivotea la tabla larga a una fila por central, con columnas por variable y fecha."""
+    df = ids_para_indice(df.copy(), ID_COLS)
+    df['FECHA'] = pd.to_datetime(df['FECHA'])
+    df['COLUMNA'] = df['VARIABLE'] + ' ' + df['FECHA'].dt.strftime("%m%Y")
+
+    index = FIXED_COLS + ID_COLS
+    tabla_pivot = df.pivot_table(
+        index=index,
+        columns='COLUMNA',
+        values='VALOR',
+        aggfunc='sum'  # En caso de duplicados, los suma
+    ).reset_index()
+    tabla_pivot.columns.name = None
+
+    # Ordenar por tipo de variable y luego cronológicamente
+    other_cols = [c for c in tabla_pivot.columns if c not in index]
+    other_cols = sorted(other_cols, key=lambda c: (c.split()[0], extraer_anio_mes(c)))
+    return ids_desde_indice(tabla_pivot[index + other_cols])
+
+
+def pivotear_por_mes(df, variables, index, relleno):
+    """
+    Pivotea sólo las variables indicadas, ordenadas por variable y cronológicamente.
+    Los ids de las columnas de relleno se completan junto con sus nombres.
+    """
+    df = df.copy()
+    df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
+    df = df.dropna(subset=['FECHA'])
+
+    # Limpiar espacios en columnas clave (los faltantes quedan como 'nan', igual que en los notebooks)
+    for col in [c for c in index if c not in ID_COLS] + ['VARIABLE']:
+        df[col] = df[col].fillna('nan').astype(str).str.strip()
+
+    df = df[df['VARIABLE'].isin(variables)]
+    df['VALOR'] = pd.to_numeric(df['VALOR'], errors='coerce')
+    df = df.dropna(subset=['VALOR'])
+
+    # Reemplazar valores faltantes con forward fill
+    for col in relleno:
+        df[col] = df[col].replace('nan', pd.NA).ffill() if col not in ID_COLS else df[col].ffill()
+    df = ids_para_indice(df, index)
+
+    df['COLUMNA'] = df['VARIABLE'] + ' ' + df['FECHA'].dt.strftime('%m%Y')
+    df_pivot = df.pivot_table(index=index, columns='COLUMNA', values='VALOR', aggfunc='first')
+
+    cols = df_pivot.columns.tolist()
+    cols_ordenadas = []
+    for variable in variables:
+        cols_ordenadas += sorted([c for c in cols if c.startswith(variable)], key=extraer_anio_mes)
+
+    df_final = df_pivot[cols_ordenadas].reset_index()
+    df_final.columns.name = None
+    return ids_desde_indice(df_final)
+
+
+def columnas_de(df, fijas, prefijo):
+    """Columnas fijas más las que empiezan con prefijo, en orden cronológico."""
+    cols = sorted([c for c in df.columns if c.startswith(prefijo)], key=extraer_anio_mes)
+    return df[fijas + cols]
+
+
+# === SALIDAS POR CONJUNTO ===
+
+def generar_energia(df_largo, preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    tabla_pivot = pivotear_por_variable(df_largo)
+    write_sheet(tabla_pivot, Path(preprocess) / "serie_temporal_pivotada.xlsx")
+
+    serie_energia, serie_potencia = output_paths("energia", data)
+    write_sheet(columnas_de(tabla_pivot, FIXED_COLS + ID_COLS, 'Energía kWh'), serie_energia)
+    write_sheet(columnas_de(tabla_pivot, FIXED_COLS + ID_COLS, 'Potencia kW'), serie_potencia)
+
+
+def generar_ingresos(df_largo, preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    df = pivotear_por_mes(
+        df_largo, VARIABLES_INGRESOS, index=FIXED_COLS + ID_COLS,
+        relleno=['CENTRAL', 'GENERADOR', 'central_id', 'generador_id']
+    )
+    write_sheet(df, Path(preprocess) / "serie_ingresos_cronologica.xlsx")
+
+    # Totales de agentes y notas que no deben llegar a las series finales
+    df = df[clasificar_columna(df["CENTRAL"]) == CENTRAL].copy()
+
+    # Convertir todas las columnas numéricas (remover comas y convertir a float)
+    for col in df.columns.drop(FIXED_COLS + ID_COLS):
+        if df[col].dtype == object:
+            df[col] = df[col].str.replace(',', '', regex=False)
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Calcular precio monómico para cada periodo
+    precios = {}
+    periods = [col.split(' ')[-1] for col in df.columns if col.startswith('Energía KWh')]
+    for period in periods:
+        energia_col = f'Energía KWh {period}'
+        ingresos_cols = [f'{variable} {period}' for variable in VARIABLES_INGRESOS[1:]]
+
+        if all(col in df.columns for col in ingresos_cols):
+            total_ingresos = df[ingresos_cols].sum(axis=1, min_count=len(ingresos_cols))
+            precios[f'Precio Monómico USD/MWh {period}'] = np.where(
+                df[energia_col] > 0,
+                (total_ingresos / df[energia_col]) * 1000,  # USD/MWh
+                np.nan
+            )
+        else:
+            print(f"Advertencia: Columnas incompletas para el período {period}")
+
+    df = pd.concat([df, pd.DataFrame(precios, index=df.index)], axis=1)
+    write_sheet(df, output_paths("ingresos", data)[0])
+
+
+def generar_peaje(df_largo, preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    df = pivotear_por_variable(df_largo)
+    write_sheet(df, Path(preprocess) / "serie_peaje_filiales_2.xlsx")
+
+    # Identificar columnas de peaje por mes
+    peaje_cols = [col for col in df.columns if 'Peaje' in col and any(x in col for x in ['ENDE Trans.', 'ENDE USD', 'ISA', 'TESA', 'filiales'])]
+    fechas = sorted(set(col.split()[-1] for col in peaje_cols), key=lambda f: (f[2:], f[:2]))
+
+    peaje_generacion = pd.DataFrame(df[FIXED_COLS + ID_COLS])
+    for fecha in fechas:
+        columnas_mes = [col for col in peaje_cols if col.endswith(fecha)]
+        peaje_generacion[f'Peaje generación USD/MWh {fecha}'] = df[columnas_mes].sum(axis=1)
+
+    write_sheet(peaje_generacion, output_paths("peaje", data)[0])
+
+
+def generar_precios(df_largo, preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    index = ['CENTRAL', 'TECNOLOGIA', 'central_id', 'tecnologia_id']
+    df = pivotear_por_mes(df_largo, VARIABLES_PRECIOS, index=index, relleno=index)
+    write_sheet(df, Path(preprocess) / "serie_precios_cronologica.xlsx")
+
+    df = df[clasificar_columna(df["CENTRAL"]) == CENTRAL]
+    for variable, output in zip(VARIABLES_PRECIOS, output_paths("precios", data)):
+        write_sheet(columnas_de(df, index, variable), output)
+
+
+GENERADORES = {
+    "energia": generar_energia,
+    "ingresos": generar_ingresos,
+    "peaje": generar_peaje,
+    "precios": generar_precios,
+}
+
+
+def consolidar(dataset, pre_data=PRE_DATA_FOLDER, preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    """Formato largo, pivoteo y series finales de data/ para un conjunto."""
+    df_largo = consolidar_en_formato_largo(dataset, pre_data, preprocess, data)
+    if df_largo is None:
+        raise RuntimeError(f"No hay pre_data para consolidar en {dataset}")
+    GENERADORES[dataset](df_largo, preprocess, data)
+    print(f"✅ Series de {dataset} guardadas en {data}")
+
+
+# === PRECIO MONÓMICO ===
+
+def generar_precios_monomico(preprocess=PREPROCESS_FOLDER, data=DATA_FOLDER):
+    """Serie de precio monómico sin outliers (IQR) a partir de data/serie_ingresos.xlsx."""
+    df = read_sheet(Path(data) / "serie_ingresos.xlsx")
+    precio_cols = [col for col in df.columns if col.startswith("Precio Monómico")]
+    index = ["CENTRAL", "TECNOLOGIA", "central_id", "tecnologia_id"]
+
+    df_long = df.melt(
+        id_vars=index,
+        value_vars=precio_cols,
+        var_name="MES",
+        value_name="PRECIO_MONOMICO"
+    )
+    df_long["MES"] = df_long["MES"].str.extract(r"(\d{6})", expand=False)
+    df_long["FECHA"] = pd.to_datetime(df_long["MES"], format="%m%Y", errors="coerce")
+    df_long = df_long.dropna(subset=["FECHA", "PRECIO_MONOMICO"])
+
+    # Detección de outliers con el método IQR
+    Q1 = df_long["PRECIO_MONOMICO"].quantile(0.25)
+    Q3 = df_long["PRECIO_MONOMICO"].quantile(0.75)
+    IQR = Q3 - Q1
+    lower_bound = Q1 - 1.5 * IQR
+    upper_bound = Q3 + 1.5 * IQR
+
+    df_comp = df_long[
+        (df_long["PRECIO_MONOMICO"] >= lower_bound) &
+        (df_long["PRECIO_MONOMICO"] <= upper_bound)
+    ][["CENTRAL", "FECHA", "TECNOLOGIA", "central_id", "tecnologia_id", "PRECIO_MONOMICO"]]
+    write_sheet(df_comp, Path(preprocess) / "comparacion_precios_monomico.xlsx")
+
+    df_comp = df_comp.assign(col_name="Precio Monómico USD/MWh " + df_comp["FECHA"].dt.strftime("%m%Y"))
+    df_pivot = ids_para_indice(df_comp, index).pivot_table(
+        index=index,
+        columns="col_name",
+        values="PRECIO_MONOMICO"
+    ).reset_index()
+    df_pivot.columns.name = None
+
+    write_sheet(
+        ids_desde_indice(columnas_de(df_pivot, index, "Precio Monómico")), output_paths("monomico", data)[0]
+    )
@@ -0,0 +1,215 @@
+"""Esquema estrella de las series: una tabla de hechos por central × mes.
+
+    python -m pipeline.estrella                 # escribe data/estrella/
+    python -m pipeline.estrella --data /tmp/x   # desde otra carpeta de series
+
+hechos.parquet tiene una fila por (central_id, FECHA) con todas las medidas de
+energía, potencia, precios, peaje e ingresos como columnas, cada una de una
+sola serie (ver FUENTES); centrales.parquet,
+generadores.parquet y tecnologias.parquet son sus dimensiones. Las filas se
+unen por los ids de pipeline.claves que traen las series, no por nombre. Los hechos se guardan ordenados por (central_id, FECHA), así
+un filtro por centrales o por rango de fechas sólo lee los grupos de filas que
+lo cumplen según sus estadísticas. Una vista que cruza medidas (p. ej. ingresos sobre energía) es
+una selección de columnas y no un merge de series:
+
+    vista(['Ingresos Energía USD', 'Energía ingresos kWh'], fechas=('2024-01-01', '2024-12-31'))
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.claves import ids_canonicos, registro
+from pipeline.config import DATA_FOLDER
+from pipeline.publicar import a_formato_largo
+from utils.spreadsheet import read_sheet
+
+ESTRELLA_FOLDER = "estrella"
+TABLAS = ("hechos", "centrales", "generadores", "tecnologias")
+
+# (serie, medida en la serie, columna en hechos). Cada columna sale de una sola
+# serie, sin mezclar fuentes: la energía que informa serie_ingresos tiene su
+# propia columna aunque suele coincidir con la de serie_energia, así un cociente
+# como ingresos / energía usa la energía de la misma tabla del CNDC.
+FUENTES = [
+    ("serie_energia", "Energía kWh", "Energía kWh"),
+    ("serie_potencia", "Potencia kW", "Potencia kW"),
+    ("serie_precios_energia", "Precio Energía USD/MWh", "Precio Energía USD/MWh"),
+    ("serie_precios_potencia", "Precio Potencia USD/kW", "Precio Potencia USD/kW"),
+    ("serie_peaje", "Peaje generación USD/MWh", "Peaje generación USD/MWh"),
+    ("serie_ingresos", "Energía KWh", "Energía ingresos kWh"),
+    ("serie_ingresos", "Ingresos Energía USD", "Ingresos Energía USD"),
+    ("serie_ingresos", "Ingresos Potencia USD", "Ingresos Potencia USD"),
+    ("serie_ingresos", "Ingresos Renovables USD", "Ingresos Renovables USD"),
+    # Sin el filtro de atípicos de precios_monomico
+    ("serie_ingresos", "Precio Monómico USD/MWh", "Precio Monómico bruto USD/MWh"),
+    ("precios_monomico", "Precio Monómico USD/MWh", "Precio Monómico USD/MWh"),
+]
+
+# Filas por grupo de hechos.parquet: ~2 años de todas las centrales actuales
+FILAS_POR_GRUPO = 1024
+
+
+def carpeta_estrella(data=DATA_FOLDER):
+    return Path(data) / ESTRELLA_FOLDER
+
+
+def rutas(data=DATA_FOLDER):
+    carpeta = carpeta_estrella(data)
+    return [carpeta / f"{tabla}.parquet" for tabla in TABLAS]
+
+
+def columnas_medida():
+    """Columnas de medida de hechos, en el orden de FUENTES."""
+    return list(dict.fromkeys(columna for _, _, columna in FUENTES))
+
+
+# === CONSTRUCCIÓN ===
+
+def leer_fuentes(data=DATA_FOLDER, claves=None):
+    """Formato largo de todas las fuentes con la columna de hechos y su prioridad (orden en FUENTES)."""
+    claves = claves or registro(data)
+    partes = []
+    cache = {}
+    for prioridad, (serie, medida, columna) in enumerate(FUENTES):
+        path = Path(data) / f"{serie}.xlsx"
+        if not path.exists():
+            continue
+        if serie not in cache:
+            cache[serie] = ids_canonicos(a_formato_largo(read_sheet(path)), claves, path.name)
+        largo = cache[serie]
+        parte = largo[largo["MEDIDA"] == medida].drop(columns="MEDIDA")
+        partes.append(parte.assign(COLUMNA=columna, PRIORIDAD=prioridad))
+    if not partes:
+        raise FileNotFoundError(f"No hay series en {data}")
+    # Las series sin GENERADOR (precios) dejan su id vacío para sus centrales
+    return pd.concat(partes, ignore_index=True).dropna(subset=["central_id"])
+
+
+def _primer_id(largo, columna):
+    """Primer id no vacío de columna por central, según la prioridad de las fuentes."""
+    con_id = largo.dropna(subset=[columna]).sort_values("PRIORIDAD", kind="stable")
+    return con_id.drop_duplicates("central_id").set_index("central_id")[columna]
+
+
+def dimensiones(largo, claves):
+    """(centrales, generadores, tecnologias) con el nombre a mostrar de cada id."""
+    centrales = claves.tabla("central", largo["central_id"].unique())
+    for col in ("generador_id", "tecnologia_id"):
+        centrales[col] = pd.array(centrales["central_id"].map(_primer_id(largo, col)), dtype="Int32")
+    return (
+        centrales,
+        claves.tabla("generador", centrales["generador_id"].dropna()),
+        claves.tabla("tecnologia", centrales["tecnologia_id"].dropna()),
+    )
+
+
+def hechos(largo):
+    """Una fila por (central_id, FECHA) con una columna por medida."""
+    filas = largo[["central_id", "FECHA"]].drop_duplicates()
+    # Una central repetida en su serie deja su primera fila con valor
+    valores = (
+        largo.dropna(subset=["VALOR"])
+        .sort_values("PRIORIDAD", kind="stable")
+        .drop_duplicates(["central_id", "FECHA", "COLUMNA"])
+        .pivot(index=["central_id", "FECHA"], columns="COLUMNA", values="VALOR")
+    )
+    tabla = (
+        filas.merge(valores.reset_index(), on=["central_id", "FECHA"], how="left")
+        .reindex(columns=["central_id", "FECHA", *columnas_medida()])
+        .sort_values(["central_id", "FECHA"], ignore_index=True)
+    )
+    tabla["central_id"] = tabla["central_id"].astype("int32")
+    tabla["FECHA"] = tabla["FECHA"].astype("datetime64[ns]")
+    tabla.columns.name = None
+    return tabla.astype({m: "float64" for m in columnas_medida()})
+
+
+def construir(data=DATA_FOLDER):
+    """{tabla: DataFrame} del esquema estrella a partir de las series de data/."""
+    claves = registro(data)
+    largo = leer_fuentes(data, claves)
+    centrales, generadores, tecnologias = dimensiones(largo, claves)
+    return {
+        "hechos": hechos(largo),
+        "centrales": centrales,
+        "generadores": generadores,
+        "tecnologias": tecnologias,
+    }
+
+
+def escribir_parquet(df, destino, orden=None):
+    """Parquet zstd con estadísticas por grupo de filas; orden queda como metadato."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    opciones = {"compression": "zstd", "row_group_size": FILAS_POR_GRUPO}
+    if orden:
+        opciones["sorting_columns"] = [pq.SortingColumn(tabla.schema.get_field_index(c)) for c in orden]
+    # Escritura atómica: el dashboard puede estar leyendo la versión anterior
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    pq.write_table(tabla, tmp, **opciones)
+    os.replace(tmp, destino)
+
+
+def generar_estrella(data=DATA_FOLDER):
+    """Escribe data/estrella/<tabla>.parquet; devuelve las tablas escritas. Requiere pyarrow."""
+    tablas = construir(data)
+    carpeta = carpeta_estrella(data)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    for nombre, df in tablas.items():
+        orden = ["central_id", "FECHA"] if nombre == "hechos" else None
+        escribir_parquet(df, carpeta / f"{nombre}.parquet", orden)
+        print(f"[estrella] {nombre}.parquet: {len(df)} filas")
+    return tablas
+
+
+# === LECTURA ===
+
+def leer(tabla, data=DATA_FOLDER, columnas=None, filtros=None):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(carpeta_estrella(data) / f"{tabla}.parquet", columns=columnas, filters=filtros).to_pandas()
+
+
+def vista(medidas=None, fechas=None, centrales=None, data=DATA_FOLDER):
+    """
+    Hechos con CENTRAL/GENERADOR/TECNOLOGIA, FECHA y las medidas pedidas (todas
+    por defecto), dentro de fechas=(inicio, fin) y de la lista de centrales.
+
+    El filtro de fechas y centrales baja al lector Parquet; los nombres se
+    agregan recién al final, sobre las filas que quedaron.
+    """
+    dim = leer("centrales", data)
+    filtros = []
+    if fechas is not None:
+        filtros += [("FECHA", ">=", pd.Timestamp(fechas[0])), ("FECHA", "<=", pd.Timestamp(fechas[1]))]
+    if centrales is not None:
+        ids = dim.loc[dim["CENTRAL"].isin(list(centrales)), "central_id"].tolist()
+        filtros.append(("central_id", "in", ids))
+    columnas = ["central_id", "FECHA", *(columnas_medida() if medidas is None else medidas)]
+    df = leer("hechos", data, columnas, filtros or None)
+
+    dim = (
+        dim.merge(leer("generadores", data), on="generador_id", how="left")
+        .merge(leer("tecnologias", data), on="tecnologia_id", how="left")
+        .set_index("central_id")
+    )
+    for col in ("CENTRAL", "GENERADOR", "TECNOLOGIA"):
+        df.insert(df.columns.get_loc("FECHA"), col, df["central_id"].map(dim[col]))
+    return df.drop(columns="central_id")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.estrella", description=__doc__.split("\n")[0])
+    parser.add_argument("--data", type=Path, default=DATA_FOLDER, help="Carpeta con las series (por defecto data/)")
+    args = parser.parse_args(argv)
+    generar_estrella(args.data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""Normalización de los archivos extraídos (extracted_* → pre_data/*_centrales_MMYY).
+
+`procesar_archivos` común a los cuatro conjuntos de datos (la llaman también
+los notebooks 04); sólo cambia el renombrado final de columnas.
+"""
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.config import (
+    CENTRALES_FILE,
+    DOWNLOAD_FOLDER,
+    ERRORS_FOLDER,
+    periodo_de_archivo,
+    pre_data_file,
+)
+from pipeline.claves import ID_COLS, con_claves, registro
+from utils.instrumentation import count_classes, count_rows, instrument
+from utils.spreadsheet import iter_rows, read_sheet, rows_to_frame, write_sheet
+
+# === MAPA DE ALIAS DE CENTRALES ===
+ALIAS = {
+    "Kanata en Arocagua": "Kanata ARO",
+    "Kanata en Valle Hermoso": "Kanata VHE",
+    "Misicuni en Arocagua": "Misicuni ARO",
+    "Misicuni en Valle Hermoso": "Misicuni VHE",
+    "Yunchara": "Yunchara",
+    "Aguaí Energía": "Aguaí Energia",
+    "AGUAÍ ENERGÍA S.A.": "Aguaí Energia",
+    "Santa Cruz (Aguaí)": "Santa Cruz (Aguaí)",
+    "RÍO ELÉCTRICO S.A.": "RIO ELECTRICO S.A.",
+    "CHACO ENERGÍAS S.A.": "CHACO ENERGIAS S.A.",
+    "RIOELEC S.A.": "RIO ELECTRICO S.A.",
+}
+
+# === RENOMBRADO DE COLUMNAS POR CONJUNTO ===
+RENAME_COLUMNS = {
+    "energia": {
+        'Energía': 'Energía kWh',
+        'Potencia Firme Remunerada': 'Potencia kW'
+    },
+    "ingresos": {},
+    "peaje": {
+        'Energía': 'Energía kWh',
+        'Potencia Firme Remunerada': 'Potencia kW'
+    },
+    "precios": {
+        'Unnamed: 1': 'Precio Energía USD/MWh',
+        'Unnamed: 2': 'Precio Potencia USD/kW',
+        'Energía': 'Precio Energía USD/MWh',
+        'Potencia Firme Remunerada': 'Precio Potencia USD/kW'
+    },
+}
+
+FIXED_COLS = ['CENTRAL', 'GENERADOR', 'TECNOLOGIA']
+
+AGUAI_CENTRALES = ["Aguaí Energia", "Aguai (Autoproductor)"]
+AGUAI_GENERADOR = "AGUAÍ ENERGÍA S.A."
+AGUAI_TECNOLOGIA = "Biomasa"
+
+# === CLASIFICACIÓN DE FILAS ===
+
+# Clase de cada fila según el valor de su columna de centrales
+CENTRAL = "central"
+SUBTOTAL = "subtotal"      # TOTAL, TOTALES, TOTAL - AGUAI...
+NOTA = "nota"              # notas al pie, tipo de cambio, títulos de sección
+ENCABEZADO = "encabezado"  # filas de unidades (CENTRAL ENERGIA, POTENCIA)
+FECHA = "fecha"
+VACIA = "vacia"            # vacías o 'nan'
+PREVIA = "previa"          # antes de la primera central conocida del archivo
+
+# Un solo patrón con un grupo por clase: la clase es el grupo que coincide primero
+PATRON_CLASES = (
+    r"(?P<fecha>^\d{4}-\d{2}-\d{2})"
+    r"|(?P<subtotal>TOTAL)"
+    r"|(?P<nota>Nota|Tipo de cambio|CARGOS POR INYECCIONES)"
+    r"|(?P<encabezado>CENTRAL\s*ENERGIA|POTENCIA)"
+    r"|(?P<vacia>nan)"
+)
+_CLASES = re.compile(PATRON_CLASES, re.IGNORECASE)
+
+
+# === FUNCIONES AUXILIARES ===
+
+def clasificar(valor):
+    """Clase de una fila según el valor de su columna de centrales."""
+    x = str(valor).strip()
+    if not x:
+        return VACIA
+    m = _CLASES.search(x)
+    return m.lastgroup if m else CENTRAL
+
+
+def clasificar_columna(valores):
+    """clasificar() de una columna entera, en una pasada vectorizada del mismo patrón."""
+    x = valores.astype(str).str.strip()
+    grupos = x.str.extract(PATRON_CLASES, flags=re.IGNORECASE).fillna("").ne("")
+    clases = grupos.idxmax(axis=1).where(grupos.any(axis=1), CENTRAL)
+    # astype(str) deja los faltantes como NaN con el tipo str de pandas
+    return clases.mask(x.isna() | (x == ""), VACIA)
+
+
+def es_encabezado(fila):
+    return any(str(cell).strip().upper() == "CENTRAL" for cell in fila)
+
+
+def extraer_columnas(filepath, columnas):
+    """
+    Columnas (por índice) de un c_iny crudo, leídas por filas y sin las filas
+    basura según la primera columna pedida. La primera fila, el encabezado del
+    archivo, siempre se conserva. Devuelve el DataFrame y el conteo de filas
+    leídas por clase.
+    """
+    filas = iter_rows(filepath, columns=columnas)
+    encabezado = next(filas, None)
+    if encabezado is None:
+        raise ValueError(f"{filepath} está vacío")
+    datos, conteo = [], Counter()
+    for fila in filas:
+        clase = clasificar(fila[0])
+        conteo[clase] += 1
+        if clase == CENTRAL:
+            datos.append(fila)
+    return rows_to_frame(encabezado, datos), conteo
+
+
+def leer_extraido(input_file):
+    """
+    Lee un archivo extraído por filas, desde la fila de encabezado (la que tiene
+    'CENTRAL'; si no hay, la primera) y saltando las filas basura a medida que
+    se leen. Devuelve el DataFrame y el conteo de filas de datos por clase.
+    """
+    filas = iter_rows(input_file)
+    previas = []
+    for fila in filas:
+        if es_encabezado(fila):
+            encabezado = fila
+            break
+        previas.append(fila)
+    else:
+        if not previas:
+            raise ValueError(f"{input_file} está vacío")
+        encabezado, filas = previas[0], iter(previas[1:])
+
+    # Columna de centrales: la primera cuyo nombre menciona central o agente
+    columna = next((i for i, c in enumerate(encabezado)
+                    if 'central' in str(c).strip().lower() or 'agente' in str(c).strip().lower()), None)
+    datos, conteo = [], Counter()
+    for fila in filas:
+        clase = CENTRAL if columna is None else clasificar(fila[columna] if columna < len(fila) else "")
+        conteo[clase] += 1
+        if clase == CENTRAL:
+            datos.append(fila)
+    return rows_to_frame(encabezado, datos), conteo
+
+
+def normalizar_nombre(nombre, nombres_centrales, alias=ALIAS):
+    x = str(nombre).strip()
+    if x in alias:
+        return alias[x]
+
+    # Limpieza más profunda para coincidencias flexibles
+    x_clean = re.sub(r'\W+', '', x).upper()
+
+    for k in nombres_centrales:
+        k_clean = re.sub(r'\W+', '', k).upper()
+        if k_clean == x_clean:
+            return k
+
+    # Casos especiales para Aguaí
+    if "AGUAI" in x_clean or "AGUAÍ" in x_clean:
+        if "AUTOPRODUCTOR" in x_clean:
+            return "Aguai (Autoproductor)"
+        return "Aguaí Energia"
+
+    return x
+
+
+def cargar_centrales(path=CENTRALES_FILE):
+    """Mapeos CENTRAL → GENERADOR / TECNOLOGIA y nombres válidos del archivo de centrales."""
+    df_centrales = read_sheet(path)
+    if not {'CENTRAL', 'GENERADOR', 'TECNOLOGIA'}.issubset(df_centrales.columns):
+        raise ValueError("El archivo debe contener columnas 'CENTRAL', 'GENERADOR' y 'TECNOLOGIA'")
+    df_centrales['CENTRAL'] = df_centrales['CENTRAL'].astype(str).str.strip()
+
+    mapeo_generadores = dict(zip(df_centrales['CENTRAL'], df_centrales['GENERADOR']))
+    mapeo_tecnologia = dict(zip(df_centrales['CENTRAL'], df_centrales['TECNOLOGIA']))
+    nombres_centrales = set(df_centrales['CENTRAL'])
+
+    # Asegurar centrales de Aguaí en el mapeo
+    for central_aguai in AGUAI_CENTRALES:
+        if central_aguai not in mapeo_generadores:
+            mapeo_generadores[central_aguai] = AGUAI_GENERADOR
+            mapeo_tecnologia[central_aguai] = AGUAI_TECNOLOGIA
+
+    return {
+        'generadores': mapeo_generadores,
+        'tecnologia': mapeo_tecnologia,
+        'nombres': nombres_centrales,
+    }
+
+
+# === PROCESAMIENTO DE ARCHIVOS ===
+
+def normalizar_archivo(input_file, dataset, centrales, claves=None):
+    """
+    Normaliza un archivo extraído y devuelve el DataFrame de pre_data (con los
+    ids de pipeline.claves). Las filas por clase quedan en la etapa en curso.
+    """
+    df, conteo = leer_extraido(input_file)
+    count_rows(rows_in=sum(conteo.values()))
+    df.columns = [str(col).strip() for col in df.columns]
+
+    central_col = next((c for c in df.columns if 'central' in c.lower() or 'agente' in c.lower()), None)
+    if central_col and central_col != 'CENTRAL':
+        df = df.rename(columns={central_col: 'CENTRAL'})
+    if 'CENTRAL' not in df.columns:
+        raise ValueError(f"No se encontró columna 'CENTRAL' en {input_file}")
+
+    df['CENTRAL'] = df['CENTRAL'].astype(str).str.strip()
+
+    # Una sola pasada del clasificador y un solo filtro. La mayoría de la basura
+    # ya se saltó al leer; quedan las filas que pandas convierte a NaN al armar
+    # el DataFrame y las anteriores a la primera central conocida
+    nombres_centrales = centrales['nombres']
+    centrales_validas = set(x.upper() for x in nombres_centrales)
+    clases = clasificar_columna(df['CENTRAL'])
+    conocidas = ((clases == CENTRAL) & df['CENTRAL'].str.upper().isin(centrales_validas)).to_numpy()
+    if not conocidas.any():
+        raise ValueError(f"No se encontraron centrales válidas en {input_file}")
+    clases = clases.mask((clases == CENTRAL) & (np.arange(len(df)) < conocidas.argmax()), PREVIA)
+    conteo.subtract({CENTRAL: len(df)})
+    conteo.update(clases.value_counts().to_dict())
+    count_classes(conteo)
+    df = df[(clases == CENTRAL).to_numpy()].copy()
+
+    # Normalización y mapeo: cada nombre distinto se resuelve una sola vez
+    normalizados = {x: normalizar_nombre(x, nombres_centrales) for x in df['CENTRAL'].unique()}
+    df['CENTRAL_NORMALIZADA'] = df['CENTRAL'].map(normalizados)
+    df['GENERADOR'] = df['CENTRAL_NORMALIZADA'].map(centrales['generadores'])
+    df['TECNOLOGIA'] = df['CENTRAL_NORMALIZADA'].map(centrales['tecnologia'])
+
+    # Forzar presencia de ambas centrales Aguaí
+    for central in AGUAI_CENTRALES:
+        if central not in df['CENTRAL_NORMALIZADA'].values:
+            nueva_fila = {
+                'CENTRAL': central,
+                'CENTRAL_NORMALIZADA': central,
+                'GENERADOR': AGUAI_GENERADOR,
+                'TECNOLOGIA': AGUAI_TECNOLOGIA
+            }
+            for col in df.columns:
+                if 'kW' in col or 'kWh' in col:
+                    nueva_fila[col] = 0.0
+            df = pd.concat([df, pd.DataFrame([nueva_fila])], ignore_index=True)
+
+    # Procesamiento numérico
+    for col in df.columns:
+        if 'kW' in col or 'kWh' in col:
+            df[col] = (
+                df[col]
+                .astype(str)
+                .str.replace(',', '')
+                .str.replace(' ', '')
+                .replace('nan', None)
+                .astype(float)
+            )
+
+    columnas_finales = ['CENTRAL_NORMALIZADA', 'GENERADOR', 'TECNOLOGIA'] + [
+        c for c in df.columns if c not in ['CENTRAL', 'CENTRAL_NORMALIZADA', 'GENERADOR', 'TECNOLOGIA']
+    ]
+    df_final = df[columnas_finales].rename(columns={'CENTRAL_NORMALIZADA': 'CENTRAL'})
+
+    # Ids enteros del registro de claves; las etapas siguientes resuelven el nombre desde ellos
+    df_final = con_claves(df_final.reset_index(drop=True), claves or registro())
+    df_final = df_final[FIXED_COLS + ID_COLS + [c for c in df_final.columns if c not in FIXED_COLS + ID_COLS]]
+    return df_final.rename(columns=RENAME_COLUMNS[dataset])
+
+
+@instrument()
+def normalizar_periodo(input_file, output_file, dataset, centrales=None):
+    """Normaliza un archivo extraído, lo guarda en output_file y avisa de centrales sin mapeo."""
+    if centrales is None:
+        centrales = cargar_centrales()
+    df_final = normalizar_archivo(input_file, dataset, centrales)
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    count_rows(rows_out=len(df_final))
+    write_sheet(df_final, output_file)
+    registro().guardar()
+    print(f"[OK] {input_file} → {output_file}")
+
+    # Detectar centrales sin mapeo
+    faltantes = df_final[df_final['GENERADOR'].isna()]['CENTRAL'].unique()
+    if len(faltantes) > 0:
+        print(f"  ⚠️ {len(faltantes)} centrales sin GENERADOR: {list(faltantes[:3])}{'...' if len(faltantes) > 3 else ''}")
+    return df_final
+
+
+@instrument()
+def procesar_archivos(dataset, folder=DOWNLOAD_FOLDER):
+    """Normaliza todos los extracted_{dataset}_c_iny_*.xlsx que aún no tienen pre_data."""
+    try:
+        centrales = cargar_centrales()
+    except Exception as e:
+        print(f"Error al cargar archivo de mapeo {CENTRALES_FILE}: {str(e)}")
+        return
+
+    for input_file in sorted(Path(folder).glob(f"extracted_{dataset}_c_iny_*.xlsx")):
+        file_number = periodo_de_archivo(input_file)
+        output_file = pre_data_file(dataset, file_number)
+
+        if output_file.exists():
+            print(f"[Omitido] {output_file} ya existe.")
+            continue
+
+        try:
+            normalizar_periodo(input_file, output_file, dataset, centrales)
+        except Exception as e:
+            print(f"[Error] {input_file}: {str(e)}")
+            try:
+                ERRORS_FOLDER.mkdir(exist_ok=True)
+                write_sheet(read_sheet(input_file), ERRORS_FOLDER / f"ERROR_{file_number}.xlsx")
+            except Exception as inner_e:
+                print(f"Error al guardar archivo de error: {inner_e}")
@@ -0,0 +1,201 @@
+"""Pronósticos de corto plazo por central de energía, potencia y precio monómico.
+
+    python -m pipeline.pronostico              # escribe data/estrella/pronosticos.parquet
+
+Cada medida se pasa a una matriz mes × central y los tres modelos se ajustan
+sobre la matriz completa con NumPy, sin un bucle por central:
+
+- suavizado: suavizado exponencial simple, con el alfa de menor error de un
+  paso de cada central;
+- estacional: el mismo mes del año anterior (estacional ingenuo);
+- tendencia: recta de mínimos cuadrados sobre los últimos VENTANA_TENDENCIA meses.
+
+Cada modelo se ajusta además sin los últimos HORIZONTE meses y se compara con
+lo observado; el de menor error absoluto medio queda como elegido de la
+central. Las páginas sólo leen esta tabla.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.claves import ids_canonicos, registro
+from pipeline.config import DATA_FOLDER
+from pipeline.estrella import carpeta_estrella, escribir_parquet
+from pipeline.publicar import a_formato_largo
+from utils.spreadsheet import read_sheet
+
+# (serie, medida, agregación de filas repetidas de una central en un mes)
+MEDIDAS = [
+    ("serie_energia", "Energía kWh", "sum"),
+    ("serie_potencia", "Potencia kW", "sum"),
+    ("precios_monomico", "Precio Monómico USD/MWh", "mean"),
+]
+
+HORIZONTE = 6
+TEMPORADA = 12
+VENTANA_TENDENCIA = 24
+ALFAS = np.linspace(0.1, 0.9, 9)
+# Meses con datos que necesita una central para pronosticarse
+MINIMO_MESES = 6
+
+
+def ruta(data=DATA_FOLDER):
+    return carpeta_estrella(data) / "pronosticos.parquet"
+
+
+# === MODELOS (matriz mes × central → matriz horizonte × central) ===
+
+def suavizado(y, horizonte=HORIZONTE, alfas=ALFAS):
+    """Último nivel del suavizado exponencial, con el mejor alfa de cada central."""
+    alfas = np.asarray(alfas)[:, None]
+    nivel = np.full((len(alfas), y.shape[1]), np.nan)
+    error = np.zeros_like(nivel)
+    # Una pasada por mes, con todas las centrales y todos los alfas a la vez
+    for fila in y:
+        valido = ~np.isnan(fila)
+        desvio = fila - nivel
+        con_nivel = valido & ~np.isnan(nivel)
+        error += np.where(con_nivel, desvio ** 2, 0)
+        nivel = np.where(con_nivel, nivel + alfas * desvio, nivel)
+        nivel = np.where(valido & np.isnan(nivel), fila, nivel)
+    mejor = np.argmin(error, axis=0)
+    return np.repeat(nivel[mejor, np.arange(y.shape[1])][None, :], horizonte, axis=0)
+
+
+def estacional(y, horizonte=HORIZONTE):
+    """Valor del mismo mes del año anterior."""
+    if len(y) < TEMPORADA:
+        return np.full((horizonte, y.shape[1]), np.nan)
+    return y[len(y) - TEMPORADA + np.arange(horizonte) % TEMPORADA]
+
+
+def tendencia(y, horizonte=HORIZONTE, ventana=VENTANA_TENDENCIA):
+    """Recta de mínimos cuadrados de cada central, con los meses sin dato fuera del ajuste."""
+    y = y[-ventana:]
+    valido = ~np.isnan(y)
+    t = np.where(valido, np.arange(len(y))[:, None], 0)
+    v = np.where(valido, y, 0)
+    n = valido.sum(axis=0)
+    st, sv = t.sum(axis=0), v.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pendiente = (n * (t * v).sum(axis=0) - st * sv) / (n * (t * t).sum(axis=0) - st ** 2)
+        origen = (sv - pendiente * st) / n
+    pendiente = np.where(n >= 2, pendiente, np.nan)
+    return origen + pendiente * (len(y) + np.arange(horizonte))[:, None]
+
+
+# En caso de empate (o sin evaluación posible) gana el primero
+MODELOS = {"suavizado": suavizado, "estacional": estacional, "tendencia": tendencia}
+
+
+def pronosticar(y, horizonte=HORIZONTE):
+    """{modelo: matriz horizonte × central}; NaN en las centrales con pocos meses."""
+    pocos = (~np.isnan(y)).sum(axis=0) < MINIMO_MESES
+    resultado = {}
+    for modelo, ajustar in MODELOS.items():
+        p = ajustar(y, horizonte)
+        # Energía, potencia y precios no son negativos
+        resultado[modelo] = np.where(pocos, np.nan, np.maximum(p, 0))
+    return resultado
+
+
+def evaluar(y, horizonte=HORIZONTE):
+    """{modelo: error absoluto medio por central} ajustando sin los últimos `horizonte` meses."""
+    real = y[-horizonte:]
+    resultado = {}
+    for modelo, p in pronosticar(y[:-horizonte], horizonte).items():
+        error = np.abs(p - real)
+        n = (~np.isnan(error)).sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resultado[modelo] = np.where(n > 0, np.nansum(error, axis=0) / n, np.nan)
+    return resultado
+
+
+# === TABLA ===
+
+def matriz(largo, agregacion):
+    """(meses, central_id, matriz mes × central) con los meses sin dato en NaN."""
+    por_mes = largo.groupby(["FECHA", "central_id"])["VALOR"]
+    tabla = (por_mes.sum(min_count=1) if agregacion == "sum" else por_mes.mean()).unstack("central_id")
+    meses = pd.date_range(tabla.index.min(), tabla.index.max(), freq="MS")
+    tabla = tabla.reindex(meses)
+    return meses, tabla.columns.to_numpy(), tabla.to_numpy(dtype="float64")
+
+
+def tabla_medida(largo, agregacion, horizonte=HORIZONTE):
+    """Filas central_id, FECHA, modelo, valor, mae y elegido de una medida."""
+    meses, ids, y = matriz(largo, agregacion)
+    pronosticos = pronosticar(y, horizonte)
+    errores = evaluar(y, horizonte)
+    # Modelo elegido por central: el de menor error; sin evaluación, el primero
+    error = np.stack([errores[m] for m in MODELOS])
+    elegido = np.argmin(np.where(np.isnan(error), np.inf, error), axis=0)
+
+    fechas = pd.date_range(meses[-1], periods=horizonte + 1, freq="MS")[1:]
+    partes = []
+    for i, modelo in enumerate(MODELOS):
+        partes.append(pd.DataFrame({
+            "central_id": np.tile(ids, horizonte),
+            "FECHA": np.repeat(fechas, len(ids)),
+            "modelo": modelo,
+            "valor": pronosticos[modelo].ravel(),
+            "mae": np.tile(errores[modelo], horizonte),
+            "elegido": np.tile(elegido == i, horizonte),
+        }))
+    return pd.concat(partes, ignore_index=True).dropna(subset=["valor"])
+
+
+def construir(data=DATA_FOLDER, horizonte=HORIZONTE):
+    """Tabla larga serie, MEDIDA, central_id, CENTRAL, FECHA, modelo, valor, mae y elegido."""
+    claves = registro(data)
+    partes = []
+    ajuste = 0.0
+    for serie, medida, agregacion in MEDIDAS:
+        path = Path(data) / f"{serie}.xlsx"
+        if not path.exists():
+            continue
+        largo = ids_canonicos(a_formato_largo(read_sheet(path)), claves, path.name)
+        largo = largo[largo["MEDIDA"] == medida]
+        if largo.empty:
+            continue
+        inicio = time.perf_counter()
+        tabla = tabla_medida(largo, agregacion, horizonte)
+        ajuste += time.perf_counter() - inicio
+        partes.append(tabla.assign(serie=serie, MEDIDA=medida))
+    if not partes:
+        raise FileNotFoundError(f"No hay series en {data}")
+    tabla = pd.concat(partes, ignore_index=True)
+    tabla["central_id"] = tabla["central_id"].astype("int32")
+    tabla["CENTRAL"] = claves.a_nombres("central", tabla["central_id"])
+    tabla["FECHA"] = tabla["FECHA"].astype("datetime64[ns]")
+    print(f"[pronostico] ajuste de {tabla['central_id'].nunique()} centrales en {ajuste * 1e3:,.0f} ms")
+    return tabla[["serie", "MEDIDA", "central_id", "CENTRAL", "FECHA", "modelo", "valor", "mae", "elegido"]].sort_values(
+        ["serie", "MEDIDA", "central_id", "modelo", "FECHA"], ignore_index=True
+    )
+
+
+def generar_pronosticos(data=DATA_FOLDER, horizonte=HORIZONTE):
+    """Escribe data/estrella/pronosticos.parquet; devuelve la tabla. Requiere pyarrow."""
+    tabla = construir(data, horizonte)
+    destino = ruta(data)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escribir_parquet(tabla, destino)
+    print(f"[pronostico] {destino.name}: {len(tabla)} filas")
+    return tabla
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.pronostico", description=__doc__.split("\n")[0])
+    parser.add_argument("--data", type=Path, default=DATA_FOLDER, help="Carpeta con las series (por defecto data/)")
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE, help=f"Meses a pronosticar (por defecto {HORIZONTE})")
+    args = parser.parse_args(argv)
+    generar_pronosticos(args.data, args.horizonte)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
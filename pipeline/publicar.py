@@ -0,0 +1,252 @@
+"""Publicación incremental de data/ en el repositorio de Hugging Face.
+
+    python -m pipeline.publicar                      # sube sólo lo que cambió
+    python -m pipeline.publicar --simular            # lista lo que se subiría
+    python -m pipeline.publicar --hub-local /tmp/hub # contra una carpeta que imita el hub
+
+Cada archivo se identifica por el sha256 de su contenido. El manifiesto
+(manifest.json en la raíz del repo, con copia en .pipeline/hf_manifest.json)
+guarda la huella de cada ruta publicada; sólo se suben las rutas cuya huella
+cambió, en paralelo, y el manifiesto va en el mismo commit.
+
+Junto a los .xlsx se publican shards Parquet en formato largo, uno por serie y
+año (parquet/<serie>/<año>.parquet). Un mes nuevo sólo cambia el shard del año
+en curso, así quien lee Parquet descarga kilobytes y no la serie completa.
+"""
+import argparse
+import hashlib
+import json
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.claves import ID_COLS as CLAVES
+from pipeline.comparar import a_formato_largo as largo_por_celda
+from pipeline.config import DATA_FOLDER
+from pipeline.runner import HF_REPO_ID, STATE_FOLDER, TOKEN_FILE
+from utils.instrumentation import instrument
+from utils.spreadsheet import read_sheet
+from utils.transform import parse_periods
+
+MANIFEST = "manifest.json"
+MANIFEST_CACHE = STATE_FOLDER / "hf_manifest.json"
+PARQUET_FOLDER = "parquet"
+PATRON_SERIES = "*serie*.xlsx"
+SERIES_EXTRA = ["precios_monomico.xlsx"]
+WORKERS = 4
+
+
+# === SHARDS PARQUET ===
+
+def a_formato_largo(df):
+    """Serie ancha '<medida> MMYYYY' → nombres e ids de CENTRAL/GENERADOR/TECNOLOGIA, MEDIDA, FECHA, VALOR."""
+    largo = largo_por_celda(df)
+    largo = largo[largo["PERIODO"] != ""].drop(columns="OCURRENCIA")
+    largo["FECHA"] = parse_periods(largo["PERIODO"]).to_numpy()
+    largo = largo.dropna(subset=["FECHA"]).drop(columns="PERIODO")
+    ids = [c for c in largo.columns if c not in ("MEDIDA", "FECHA", "VALOR")]
+    # Los shards guardan los nombres sin espacios en los extremos (utils.query filtra así) y los ids como enteros
+    for col in ids:
+        largo[col] = pd.to_numeric(largo[col], errors="coerce").astype("Int32") if col in CLAVES else largo[col].str.strip()
+    return largo[ids + ["MEDIDA", "FECHA", "VALOR"]].sort_values(["FECHA", "MEDIDA"] + ids, kind="stable")
+
+
+def series(data=DATA_FOLDER):
+    data = Path(data)
+    return sorted(p for p in data.glob("*.xlsx") if p.match(PATRON_SERIES) or p.name in SERIES_EXTRA)
+
+
+def escribir_shards_serie(serie):
+    """
+    Escribe parquet/<serie>/<año>.parquet junto al .xlsx de una serie; devuelve
+    las rutas escritas.
+
+    Un shard sólo se reescribe si su contenido cambió, así conserva sus bytes (y
+    su huella) entre corridas; los de años que la serie ya no tiene se borran.
+    Requiere pyarrow.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    serie = Path(serie)
+    largo = a_formato_largo(read_sheet(serie))
+    carpeta = serie.parent / PARQUET_FOLDER / serie.stem
+    carpeta.mkdir(parents=True, exist_ok=True)
+    escritos, vigentes = [], set()
+    for anio, grupo in largo.groupby(largo["FECHA"].dt.year):
+        tabla = pa.Table.from_pandas(grupo.reset_index(drop=True), preserve_index=False)
+        destino = carpeta / f"{anio}.parquet"
+        vigentes.add(destino.name)
+        if destino.exists() and pq.read_table(destino).equals(tabla):
+            continue
+        pq.write_table(tabla, destino, compression="zstd")
+        escritos.append(destino)
+    # Ni se publican ni los lee utils.query (que toma todo <serie>/*.parquet)
+    for viejo in carpeta.glob("*.parquet"):
+        if viejo.name not in vigentes:
+            viejo.unlink()
+    return escritos
+
+
+def escribir_shards(data=DATA_FOLDER):
+    """escribir_shards_serie() de todas las series de data/; devuelve las rutas escritas."""
+    return [ruta for serie in series(data) for ruta in escribir_shards_serie(serie)]
+
+
+# === MANIFIESTO ===
+
+def sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def archivos_publicables(data=DATA_FOLDER):
+    """{ruta en el repo: ruta local} de los .xlsx de data/ y sus shards."""
+    data = Path(data)
+    rutas = [p for p in data.glob("*.xlsx") if not p.name.startswith("~$")]
+    rutas += data.glob(f"{PARQUET_FOLDER}/*/*.parquet")
+    return {p.relative_to(data).as_posix(): p for p in sorted(rutas)}
+
+
+def manifiesto_local(archivos):
+    return {ruta: {"sha256": sha256(p), "bytes": p.stat().st_size} for ruta, p in archivos.items()}
+
+
+def leer_manifiesto(hub):
+    """Manifiesto remoto ({} si aún no hay); si el hub no responde, la copia en caché."""
+    try:
+        contenido = hub.leer(MANIFEST)
+    except Exception as e:
+        print(f"[Aviso] No se pudo leer {MANIFEST} del hub ({e}); se usa la copia local")
+        return json.loads(MANIFEST_CACHE.read_text()) if MANIFEST_CACHE.exists() else {}
+    return json.loads(contenido) if contenido is not None else {}
+
+
+# === HUBS ===
+
+class HubLocal:
+    """Carpeta que imita el repo del hub: para pruebas y para medir sin red."""
+
+    def __init__(self, carpeta):
+        self.carpeta = Path(carpeta)
+
+    def leer(self, ruta):
+        path = self.carpeta / ruta
+        return path.read_bytes() if path.exists() else None
+
+    def subir(self, archivos, mensaje, workers=WORKERS):
+        def copiar(item):
+            ruta, origen = item
+            destino = self.carpeta / ruta
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            tmp = destino.with_name(destino.name + ".tmp")
+            shutil.copyfile(origen, tmp)
+            tmp.replace(destino)
+
+        # El manifiesto se escribe al final, cuando los archivos ya están
+        datos = {r: p for r, p in archivos.items() if r != MANIFEST}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(copiar, datos.items()))
+        if MANIFEST in archivos:
+            copiar((MANIFEST, archivos[MANIFEST]))
+
+
+class HubHF:
+    """Repo de datasets de Hugging Face (respeta HF_ENDPOINT para apuntar a otro servidor)."""
+
+    def __init__(self, repo_id=HF_REPO_ID, token=None):
+        from huggingface_hub import HfApi
+
+        if token is None and TOKEN_FILE.exists():
+            token = TOKEN_FILE.read_text().strip()
+        self.repo_id = repo_id
+        self.api = HfApi(token=token)
+
+    def leer(self, ruta):
+        from huggingface_hub.utils import EntryNotFoundError
+
+        try:
+            path = self.api.hf_hub_download(self.repo_id, ruta, repo_type="dataset")
+        except EntryNotFoundError:
+            return None
+        return Path(path).read_bytes()
+
+    def subir(self, archivos, mensaje, workers=WORKERS):
+        from huggingface_hub import CommitOperationAdd
+
+        # Un solo commit; los blobs grandes se suben en paralelo con num_threads
+        self.api.create_commit(
+            repo_id=self.repo_id,
+            repo_type="dataset",
+            operations=[CommitOperationAdd(path_in_repo=r, path_or_fileobj=str(p)) for r, p in archivos.items()],
+            commit_message=mensaje,
+            num_threads=workers,
+        )
+
+
+# === PUBLICACIÓN ===
+
+@instrument()
+def publicar_cambios(hub=None, data=DATA_FOLDER, workers=WORKERS, simular=False, forzar=False, con_parquet=True):
+    """
+    Sube los archivos de data/ cuya huella difiere del manifiesto; devuelve las rutas subidas.
+
+    simular=True no escribe nada: lista los cambios con los shards que ya hay en data/.
+    """
+    if con_parquet and not simular:
+        try:
+            escritos = escribir_shards(data)
+            print(f"Shards Parquet actualizados: {len(escritos)}")
+        except ImportError:
+            print("[Aviso] pyarrow no está instalado; se publican sólo los .xlsx")
+
+    hub = hub or HubHF()
+    archivos = archivos_publicables(data)
+    local = manifiesto_local(archivos)
+    remoto = leer_manifiesto(hub)
+    cambios = {r: archivos[r] for r in archivos if forzar or remoto.get(r, {}).get("sha256") != local[r]["sha256"]}
+
+    total = sum(local[r]["bytes"] for r in cambios)
+    for ruta in cambios:
+        print(f"  {'[Simulado] ' if simular else ''}{ruta} ({local[ruta]['bytes'] / 1e3:,.1f} kB)")
+    print(f"{len(cambios)} de {len(archivos)} archivos cambiaron ({total / 1e3:,.1f} kB)")
+    if simular or not cambios:
+        return list(cambios)
+
+    # Las rutas que ya no existen localmente se conservan: no se borra nada del hub
+    manifiesto = {**remoto, **local}
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_manifiesto = Path(tmp) / MANIFEST
+        ruta_manifiesto.write_text(json.dumps(manifiesto, indent=1, sort_keys=True))
+        hub.subir({**cambios, MANIFEST: ruta_manifiesto}, f"Actualiza {len(cambios)} archivo(s) de data/", workers)
+
+    MANIFEST_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_CACHE.write_text(json.dumps(manifiesto, indent=1, sort_keys=True))
+    return list(cambios)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.publicar", description=__doc__.split("\n")[0])
+    parser.add_argument("--hub-local", help="Carpeta que hace de hub (en lugar de Hugging Face)")
+    parser.add_argument("--repo", default=HF_REPO_ID, help="Repo de datasets en Hugging Face")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Subidas en paralelo")
+    parser.add_argument("--simular", action="store_true", help="Sólo listar lo que se subiría")
+    parser.add_argument("--forzar", action="store_true", help="Subir todo aunque no haya cambiado")
+    parser.add_argument("--sin-parquet", action="store_true", help="No generar los shards Parquet")
+    args = parser.parse_args(argv)
+
+    hub = HubLocal(args.hub_local) if args.hub_local else HubHF(args.repo)
+    publicar_cambios(hub, workers=args.workers, simular=args.simular, forzar=args.forzar,
+                     con_parquet=not args.sin_parquet)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
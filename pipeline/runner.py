@@ -0,0 +1,436 @@
+"""Ejecutor incremental del pipeline CNDC (01 → 05).
+
+Cada etapa se modela como una tarea por periodo (MMYY) con sus archivos de
+entrada y salida:
+
+    descargar:MMYY → convertir:MMYY → extraer:{ds}:MMYY → normalizar:{ds}:MMYY
+        → consolidar:{ds} → monomico → estrella, pronostico, anomalias, publicar
+                          → tendencias
+
+Una tarea se rehace sólo si falta alguna salida o si el contenido de alguna
+entrada cambió desde la última vez que se construyó (las huellas quedan en
+.pipeline/estado.json). Una tarea sin registro cuyas salidas ya existen se
+adopta como al día, así un clon nuevo no reprocesa todo el histórico. Las
+ramas independientes (meses y conjuntos de datos) se ejecutan en paralelo.
+"""
+import hashlib
+import importlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable
+
+from pipeline import config
+from pipeline.config import BASE_DIR, DATASETS
+
+STATE_FOLDER = BASE_DIR / ".pipeline"
+STATE_FILE = STATE_FOLDER / "estado.json"
+TOKEN_FILE = BASE_DIR / "token_generacion"
+HF_REPO_ID = "danacio/ende_generacion"
+PIPELINE_DIR = Path(__file__).resolve().parent
+
+# Estados finales de una tarea
+HECHA = "hecha"
+AL_DIA = "al día"
+OMITIDA = "omitida"
+FALLIDA = "fallida"
+
+
+class NoDisponible(Exception):
+    """El insumo de la tarea todavía no existe (p. ej. el CNDC no publicó el mes)."""
+
+
+@dataclass
+class Tarea:
+    nombre: str
+    accion: Callable[[], None]
+    inputs: object = ()
+    outputs: object = ()
+    deps: list = field(default_factory=list)
+    # Si es True, se ejecuta aunque algunas dependencias se hayan omitido
+    parcial: bool = False
+    # Si es True, la tarea está al día cuando existe cualquiera de sus salidas
+    alguna_salida: bool = False
+
+    def rutas(self, valor):
+        return [Path(p) for p in (valor() if callable(valor) else valor)]
+
+    def faltan_salidas(self):
+        outputs = self.rutas(self.outputs)
+        if not outputs:
+            return True
+        existentes = [p.exists() for p in outputs]
+        return not any(existentes) if self.alguna_salida else not all(existentes)
+
+    def firma(self):
+        """Huella del contenido de las entradas existentes."""
+        return {str(p.relative_to(BASE_DIR)): huella(p) for p in self.rutas(self.inputs) if p.exists()}
+
+
+def huella(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+class Registro:
+    """Firmas de entrada con las que se construyó cada tarea por última vez."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            self.firmas = json.loads(self.path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.firmas = {}
+
+    def al_dia(self, tarea):
+        if tarea.faltan_salidas():
+            return False
+        firma = tarea.firma()
+        with self._lock:
+            anterior = self.firmas.get(tarea.nombre)
+            if anterior is None:
+                # Salidas existentes sin registro: se adoptan tal como están
+                self.firmas[tarea.nombre] = firma
+                return True
+        return anterior == firma
+
+    def registrar(self, tarea):
+        firma = tarea.firma()
+        with self._lock:
+            self.firmas[tarea.nombre] = firma
+
+    def guardar(self):
+        self.path.parent.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._lock:
+            tmp.write_text(json.dumps(self.firmas, indent=1, sort_keys=True))
+        tmp.replace(self.path)
+
+
+# === PERIODOS ===
+
+def periodos_entre(desde, hasta):
+    """Códigos MMYY desde `desde` hasta `hasta` inclusive."""
+    anio, mes = 2000 + int(desde[2:]), int(desde[:2])
+    fin = (2000 + int(hasta[2:]), int(hasta[:2]))
+    periodos = []
+    while (anio, mes) <= fin:
+        periodos.append(f"{mes:02d}{anio % 100:02d}")
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return periodos
+
+
+def periodo_actual():
+    return date.today().strftime("%m%y")
+
+
+# === ACCIONES ===
+
+_import_lock = threading.Lock()
+
+
+def script(nombre):
+    """Importa uno de los scripts numerados de la raíz (p. ej. '01_import_cndc')."""
+    with _import_lock:
+        if str(BASE_DIR) not in sys.path:
+            sys.path.insert(0, str(BASE_DIR))
+        return importlib.import_module(nombre)
+
+
+def descargar(periodo):
+    importador = script("01_import_cndc")
+    inicio = datetime(2000 + int(periodo[2:]), int(periodo[:2]), 1)
+    for url in importador.generate_urls(inicio, inicio):
+        filepath = importador.download_file(url)
+        if filepath:
+            importador.process_file(filepath)
+            return
+    raise NoDisponible(f"c_iny_{periodo} no está publicado en el CNDC")
+
+
+def convertir(periodo):
+    ruta_xls = config.legacy_file(periodo)
+    if ruta_xls.exists():
+        script("02_convert").convertir_archivo(str(ruta_xls), str(config.raw_file(periodo)))
+
+
+def extraer(dataset, periodo):
+    extractor = script(f"03_extract__{dataset}_columns")
+    extractor.extract_file(config.raw_file(periodo), config.extracted_file(dataset, periodo))
+
+
+def normalizar(dataset, periodo):
+    from pipeline.normalizar import normalizar_periodo
+
+    normalizar_periodo(
+        config.extracted_file(dataset, periodo), config.pre_data_file(dataset, periodo), dataset
+    )
+
+
+def consolidar(dataset):
+    from pipeline.consolidar import consolidar
+
+    consolidar(dataset)
+
+
+def monomico():
+    from pipeline.consolidar import generar_precios_monomico
+
+    generar_precios_monomico()
+
+
+def estrella():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise NoDisponible("el esquema estrella requiere pyarrow")
+    from pipeline.estrella import generar_estrella
+
+    generar_estrella()
+
+
+def tendencias():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise NoDisponible("las tendencias requieren pyarrow")
+    from pipeline.tendencias import generar_tendencias
+
+    generar_tendencias()
+
+
+def pronostico():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise NoDisponible("los pronósticos requieren pyarrow")
+    from pipeline.pronostico import generar_pronosticos
+
+    generar_pronosticos()
+
+
+def anomalias():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise NoDisponible("las anomalías requieren pyarrow")
+    from pipeline.anomalias import generar_anomalias
+
+    generar_anomalias()
+
+
+def publicar(stamp):
+    from pipeline.publicar import publicar_cambios
+
+    publicar_cambios()
+    stamp.parent.mkdir(exist_ok=True)
+    stamp.touch()
+
+
+# === GRAFO DE TAREAS ===
+
+def construir_tareas(periodos, datasets=DATASETS, con_publicacion=False):
+    """Grafo de tareas (nombre → Tarea) para los periodos y conjuntos indicados."""
+    from pipeline.anomalias import ruta as ruta_anomalias
+    from pipeline.claves import CLAVES_FILE
+    from pipeline.consolidar import output_paths
+    from pipeline.estrella import rutas as rutas_estrella
+    from pipeline.pronostico import ruta as ruta_pronosticos
+    from pipeline.publicar import series as publicables_series
+    from pipeline.tendencias import ruta as ruta_tendencias
+
+    tareas = {}
+
+    def agregar(tarea):
+        tareas[tarea.nombre] = tarea
+
+    for p in periodos:
+        agregar(Tarea(
+            f"descargar:{p}", lambda p=p: descargar(p),
+            outputs=[config.legacy_file(p), config.raw_file(p)],
+            alguna_salida=True,
+        ))
+        agregar(Tarea(
+            f"convertir:{p}", lambda p=p: convertir(p),
+            inputs=[config.legacy_file(p)], outputs=[config.raw_file(p)],
+            deps=[f"descargar:{p}"],
+        ))
+        for ds in datasets:
+            agregar(Tarea(
+                f"extraer:{ds}:{p}", lambda ds=ds, p=p: extraer(ds, p),
+                inputs=[config.raw_file(p), BASE_DIR / f"03_extract__{ds}_columns.py"],
+                outputs=[config.extracted_file(ds, p)],
+                deps=[f"convertir:{p}"],
+            ))
+            agregar(Tarea(
+                f"normalizar:{ds}:{p}", lambda ds=ds, p=p: normalizar(ds, p),
+                inputs=[config.extracted_file(ds, p), config.CENTRALES_FILE, PIPELINE_DIR / "normalizar.py"],
+                outputs=[config.pre_data_file(ds, p)],
+                deps=[f"extraer:{ds}:{p}"],
+            ))
+
+    for ds in datasets:
+        agregar(Tarea(
+            f"consolidar:{ds}", lambda ds=ds: consolidar(ds),
+            inputs=lambda ds=ds: [
+                *sorted(config.PRE_DATA_FOLDER.glob(f"{ds}_centrales_*.xlsx")),
+                CLAVES_FILE,
+                PIPELINE_DIR / "consolidar.py",
+            ],
+            outputs=output_paths(ds),
+            deps=[f"normalizar:{ds}:{p}" for p in periodos],
+            parcial=True,
+        ))
+
+    if "ingresos" in datasets:
+        agregar(Tarea(
+            "monomico", monomico,
+            inputs=output_paths("ingresos"), outputs=output_paths("monomico"),
+            deps=["consolidar:ingresos"],
+        ))
+
+    agregar(Tarea(
+        "estrella", estrella,
+        inputs=lambda: [*publicables_series(), CLAVES_FILE, PIPELINE_DIR / "estrella.py"],
+        outputs=rutas_estrella(),
+        deps=[n for n in tareas if n.startswith("consolidar:") or n == "monomico"],
+        parcial=True,
+    ))
+
+    agregar(Tarea(
+        "tendencias", tendencias,
+        inputs=lambda: [*publicables_series(), CLAVES_FILE, PIPELINE_DIR / "tendencias.py"],
+        outputs=[ruta_tendencias()],
+        deps=[n for n in tareas if n.startswith("consolidar:")],
+        parcial=True,
+    ))
+
+    agregar(Tarea(
+        "pronostico", pronostico,
+        inputs=lambda: [*publicables_series(), CLAVES_FILE, PIPELINE_DIR / "pronostico.py"],
+        outputs=[ruta_pronosticos()],
+        deps=[n for n in tareas if n.startswith("consolidar:") or n == "monomico"],
+        parcial=True,
+    ))
+
+    agregar(Tarea(
+        "anomalias", anomalias,
+        inputs=lambda: [*publicables_series(), CLAVES_FILE, PIPELINE_DIR / "anomalias.py"],
+        outputs=[ruta_anomalias()],
+        deps=[n for n in tareas if n.startswith("consolidar:") or n == "monomico"],
+        parcial=True,
+    ))
+
+    if con_publicacion:
+        stamp = STATE_FOLDER / "publicado.stamp"
+        agregar(Tarea(
+            "publicar", lambda: publicar(stamp),
+            inputs=lambda: sorted(config.DATA_FOLDER.glob("*.xlsx")),
+            outputs=[stamp],
+            deps=[n for n in tareas if n.startswith("consolidar:") or n == "monomico"],
+        ))
+
+    return tareas
+
+
+# === EJECUCIÓN ===
+
+def resolver(tarea, estados, registro, forzar=False, simular=False):
+    """Estado final de la tarea sin ejecutarla, o None si debe correr."""
+    deps = [estados[d] for d in tarea.deps if d in estados]
+    if FALLIDA in deps:
+        return FALLIDA
+    if OMITIDA in deps and not tarea.parcial:
+        return OMITIDA
+    if forzar or (simular and HECHA in deps) or not registro.al_dia(tarea):
+        return None
+    return AL_DIA
+
+
+def informar(nombre, estado, duracion=None, detalle=None):
+    if estado == HECHA:
+        print(f"[OK] {nombre} ({duracion:.1f} s)")
+    elif estado == OMITIDA:
+        print(f"[Omitida] {nombre}: {detalle}")
+    elif estado == FALLIDA:
+        print(f"[Error] {nombre}: {detalle}" if detalle else f"[Bloqueada] {nombre}")
+
+
+def ejecutar_tarea(tarea):
+    inicio = time.perf_counter()
+    try:
+        tarea.accion()
+    except NoDisponible as e:
+        return OMITIDA, time.perf_counter() - inicio, str(e)
+    except Exception as e:
+        return FALLIDA, time.perf_counter() - inicio, f"{type(e).__name__}: {e}"
+    return HECHA, time.perf_counter() - inicio, None
+
+
+def ejecutar(tareas, workers=4, forzar=False, simular=False, registro=None, estados=None):
+    """
+    Ejecuta el grafo respetando dependencias; devuelve {nombre: estado}.
+
+    estados trae los estados de tareas ya resueltas fuera de `tareas` (p. ej. los
+    meses del flujo continuo): una dependencia fallida u omitida se propaga igual.
+    """
+    registro = registro or Registro()
+    estados = dict(estados or {})
+    pendientes = dict(tareas)
+    en_curso = {}
+
+    def lista(tarea):
+        return all(dep in estados or dep not in tareas for dep in tarea.deps)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pendientes or en_curso:
+                for nombre, tarea in list(pendientes.items()):
+                    if not lista(tarea):
+                        continue
+                    del pendientes[nombre]
+                    estado = resolver(tarea, estados, registro, forzar, simular)
+                    if estado is not None:
+                        estados[nombre] = estado
+                        if estado == FALLIDA:
+                            informar(nombre, estado)
+                    elif simular:
+                        estados[nombre] = HECHA
+                        print(f"[Pendiente] {nombre}")
+                    else:
+                        en_curso[pool.submit(ejecutar_tarea, tarea)] = nombre
+
+                if not en_curso:
+                    if pendientes and not any(lista(t) for t in pendientes.values()):
+                        raise RuntimeError(f"Dependencias sin resolver: {sorted(pendientes)}")
+                    continue
+
+                terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    nombre = en_curso.pop(futuro)
+                    estado, duracion, detalle = futuro.result()
+                    estados[nombre] = estado
+                    if estado == HECHA:
+                        registro.registrar(tareas[nombre])
+                    informar(nombre, estado, duracion, detalle)
+    finally:
+        if not simular:
+            registro.guardar()
+
+    return estados
+
+
+def resumen(estados):
+    conteo = {}
+    for estado in estados.values():
+        conteo[estado] = conteo.get(estado, 0) + 1
+    return ", ".join(f"{n} {estado}" for estado, n in sorted(conteo.items()))
@@ -0,0 +1,115 @@
+"""Generador de libros c_iny_MMYY sintéticos con la estructura del CNDC.
+
+Reproduce lo que los extractores y la normalización esperan de un archivo
+real: seis filas de título antes del encabezado, fila de unidades, centrales
+agrupadas por generador con su fila "TOTAL - <generador>", fila TOTALES, nota
+y tipo de cambio al pie, y las 22 columnas en las posiciones que usan los
+scripts 03_extract__*.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pipeline.runner import periodos_entre
+
+MESES = [
+    "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+    "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+]
+
+TECNOLOGIAS = ["Hidroeléctrica", "Termoeléctrica", "Solar", "Eólica", "Biomasa"]
+
+ENCABEZADO = [
+    "Central", "Energía", None, None, "Energías", "Potencia Firme Remunerada", None, None,
+    "R. F. / P. D. / C. U.", "PPG y R.C.L.", "Peaje ENDE Trans.", None, "Peaje ISA", None,
+    "Peaje ENDE", None, "Peaje TESA", None, "Peaje filiales ENDE", None, None, None,
+]
+
+UNIDADES = [
+    None, "kWh", "US$/MWh", "US$", "Renovables", "kW", "US$/kW", "US$", "US$", "US$",
+    "US$/MWh", "US$", "US$/MWh", "US$", "US$/MWh", "US$", "US$/MWh", "US$", "US$/MWh", "US$",
+    None, None,
+]
+
+PLANTAS_POR_GENERADOR = 5
+
+
+def generar_centrales(plantas):
+    """Tabla CENTRAL/GENERADOR/TECNOLOGIA con `plantas` centrales sintéticas."""
+    return pd.DataFrame({
+        "CENTRAL": [f"Central {i:05d}" for i in range(plantas)],
+        "GENERADOR": [f"GENERADORA {i // PLANTAS_POR_GENERADOR:04d} S.A." for i in range(plantas)],
+        "TECNOLOGIA": [TECNOLOGIAS[i % len(TECNOLOGIAS)] for i in range(plantas)],
+    })
+
+
+def filas_libro(periodo, centrales, rng):
+    """Filas (listas de 22 celdas) de un libro c_iny del periodo."""
+    n = len(centrales)
+    energia = rng.integers(0, 60_000_000, n).astype(float)
+    precio_energia = rng.uniform(14, 18, n)
+    renovables = np.where(centrales["TECNOLOGIA"].isin(["Solar", "Eólica"]), rng.uniform(0, 5e5, n), 0.0)
+    potencia = rng.uniform(0, 120_000, n)
+    precio_potencia = rng.uniform(9, 10.5, n)
+    peajes = rng.uniform(0, 5, (n, 5))
+
+    mes, anio = int(periodo[:2]), 2000 + int(periodo[2:])
+    filas = [
+        ["Comité Nacional de Despacho de Carga"], [], [],
+        ["CARGOS POR INYECCIONES EN EL MEM (sin IVA)"],
+        [f"{MESES[mes - 1]} de {anio}"], [],
+        list(ENCABEZADO), list(UNIDADES),
+    ]
+
+    def fila(nombre, i):
+        valores = [
+            energia[i], precio_energia[i], energia[i] * precio_energia[i] / 1000, renovables[i],
+            potencia[i], precio_potencia[i], potencia[i] * precio_potencia[i], 0.0, 0.0,
+        ]
+        for p in peajes[i]:
+            valores += [p, energia[i] * p / 1000]
+        return [nombre] + valores + [None, None]
+
+    for generador, grupo in centrales.groupby("GENERADOR", sort=False):
+        indices = list(grupo.index)
+        filas += [fila(central, i) for central, i in zip(grupo["CENTRAL"], indices)]
+        total = fila(f"TOTAL - {generador}", indices[0])
+        total[1] = float(energia[indices].sum())
+        filas.append(total)
+
+    filas.append(["TOTALES", float(energia.sum())] + [None] * 20)
+    filas.append(["Nota.- La Potencia Firme Remunerada corresponde a la Potencia Firme afectada "
+                  "por los descuentos por indisponibilidad de unidades de generación."])
+    filas.append([])
+    filas.append(["Tipo de cambio", 6.96, "Bs/US$"])
+    return [f + [None] * (22 - len(f)) for f in filas]
+
+
+def generar_libro(path, periodo, centrales, seed=0):
+    """Escribe un c_iny_MMYY sintético (.xlsx, o .xls si pyexcel está instalado)."""
+    rng = np.random.default_rng([seed, int(periodo)])
+    filas = filas_libro(periodo, centrales, rng)
+    path = Path(path)
+    if path.suffix == ".xls":
+        import pyexcel as pe
+
+        pe.save_as(array=[["" if c is None else c for c in f] for f in filas], dest_file_name=str(path))
+    else:
+        pd.DataFrame(filas).to_excel(path, index=False, header=False)
+    return path
+
+
+def generar_historia(folder, plantas, meses, desde="0123", seed=0, formato="xlsx"):
+    """Genera `meses` libros c_iny consecutivos y el archivo de centrales; devuelve (periodos, centrales)."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    centrales = generar_centrales(plantas)
+    centrales.to_excel(folder / "empresas_generadoras.xlsx", index=False)
+
+    anio, mes = 2000 + int(desde[2:]), int(desde[:2]) - 1 + meses - 1
+    hasta = f"{mes % 12 + 1:02d}{(anio + mes // 12) % 100:02d}"
+    periodos = periodos_entre(desde, hasta)
+    for periodo in periodos:
+        generar_libro(folder / f"c_iny_{periodo}.{formato}", periodo, centrales, seed)
+    return periodos, centrales
@@ -0,0 +1,149 @@
+"""Pipeline por mes en flujo continuo (productor/consumidor).
+
+Cada etapa (descargar → convertir → extraer → normalizar) tiene su propio
+grupo de hilos y una cola acotada de entrada: un mes pasa a la siguiente
+etapa apenas termina la anterior, así 0125 puede estar normalizándose
+mientras 0225 se convierte y 0325 se descarga. Cuando una cola está llena
+la etapa anterior se bloquea (contrapresión), de modo que una etapa lenta no
+acumula meses pendientes en memoria. Al final se consolidan las series con
+el ejecutor de `pipeline.runner`.
+"""
+import queue
+import threading
+import time
+
+from pipeline.config import DATASETS
+from pipeline.runner import (
+    FALLIDA,
+    HECHA,
+    Registro,
+    construir_tareas,
+    ejecutar,
+    ejecutar_tarea,
+    informar,
+    resolver,
+)
+
+ETAPAS = ("descargar", "convertir", "extraer", "normalizar")
+
+# Hilos por etapa: la descarga espera red y la normalización es la más pesada
+WORKERS_POR_ETAPA = {"descargar": 2, "convertir": 1, "extraer": 2, "normalizar": 2}
+
+# Meses en espera permitidos entre dos etapas
+CAPACIDAD_COLA = 2
+
+_FIN = None
+
+
+class Etapa:
+    """Grupo de hilos que consume meses de una cola y los pasa a la siguiente."""
+
+    def __init__(self, nombre, tareas_de_mes, workers, capacidad, contexto):
+        self.nombre = nombre
+        self.tareas_de_mes = tareas_de_mes
+        self.entrada = queue.Queue(maxsize=capacidad)
+        self.salida = None
+        self.contexto = contexto
+        self.hilos = [
+            threading.Thread(target=self._trabajar, name=f"{nombre}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        self.ocupado = 0.0
+        self.meses = 0
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        for hilo in self.hilos:
+            hilo.start()
+
+    def cerrar(self):
+        """Envía el fin a cada hilo y espera a que vacíen la cola."""
+        for _ in self.hilos:
+            self.entrada.put(_FIN)
+        for hilo in self.hilos:
+            hilo.join()
+
+    def _trabajar(self):
+        while True:
+            periodo = self.entrada.get()
+            if periodo is _FIN:
+                return
+            inicio = time.perf_counter()
+            for tarea in self.tareas_de_mes(periodo):
+                self.contexto.procesar(tarea)
+            with self._lock:
+                self.ocupado += time.perf_counter() - inicio
+                self.meses += 1
+            if self.salida is not None:
+                # Bloquea si la etapa siguiente va atrasada
+                self.salida.put(periodo)
+
+
+class Contexto:
+    """Estados compartidos por las etapas, protegidos por un lock."""
+
+    def __init__(self, registro, forzar):
+        self.registro = registro
+        self.forzar = forzar
+        self.estados = {}
+        self._lock = threading.Lock()
+
+    def procesar(self, tarea):
+        with self._lock:
+            estados = dict(self.estados)
+        duracion = detalle = None
+        try:
+            estado = resolver(tarea, estados, self.registro, self.forzar)
+            if estado is None:
+                estado, duracion, detalle = ejecutar_tarea(tarea)
+                if estado == HECHA:
+                    self.registro.registrar(tarea)
+        except Exception as e:
+            # Un error aquí no debe dejar a las demás etapas esperando
+            estado, detalle = FALLIDA, f"{type(e).__name__}: {e}"
+        with self._lock:
+            self.estados[tarea.nombre] = estado
+        informar(tarea.nombre, estado, duracion, detalle)
+
+
+def ejecutar_streaming(periodos, datasets=DATASETS, workers=None, capacidad=CAPACIDAD_COLA,
+                       forzar=False, con_publicacion=False, registro=None):
+    """Procesa los meses en flujo continuo y luego consolida; devuelve {nombre: estado}."""
+    workers = {**WORKERS_POR_ETAPA, **(workers or {})}
+    registro = registro or Registro()
+    tareas = construir_tareas(periodos, datasets, con_publicacion=con_publicacion)
+    contexto = Contexto(registro, forzar)
+
+    def tareas_de(etapa):
+        def tareas_de_mes(periodo):
+            if etapa in ("descargar", "convertir"):
+                return [tareas[f"{etapa}:{periodo}"]]
+            return [tareas[f"{etapa}:{ds}:{periodo}"] for ds in datasets]
+        return tareas_de_mes
+
+    etapas = [Etapa(e, tareas_de(e), workers[e], capacidad, contexto) for e in ETAPAS]
+    for anterior, siguiente in zip(etapas, etapas[1:]):
+        anterior.salida = siguiente.entrada
+
+    inicio = time.perf_counter()
+    try:
+        for etapa in etapas:
+            etapa.iniciar()
+        for periodo in periodos:
+            etapas[0].entrada.put(periodo)
+        # Cerrar en orden: cada etapa termina antes de avisar el fin a la siguiente
+        for etapa in etapas:
+            etapa.cerrar()
+    finally:
+        registro.guardar()
+    total = time.perf_counter() - inicio
+
+    print(f"Meses procesados en {total:.1f} s")
+    for etapa in etapas:
+        print(f"  {etapa.nombre}: {etapa.meses} meses, {etapa.ocupado:.1f} s ocupados "
+              f"con {len(etapa.hilos)} hilo(s)")
+
+    # Consolidación y publicación: sus dependencias mensuales ya están resueltas y
+    # sus estados van al ejecutor, así un mes fallido bloquea a sus dependientes
+    finales = {n: t for n, t in tareas.items() if n not in contexto.estados}
+    return ejecutar(finales, workers=len(datasets), forzar=forzar, registro=registro, estados=contexto.estados)
@@ -0,0 +1,141 @@
+"""Estadísticas móviles, interanuales y acumuladas precalculadas para las páginas.
+
+    python -m pipeline.tendencias              # escribe data/estrella/tendencias.parquet
+
+Para cada medida sumable de las series (energía, potencia e ingresos) y para
+el sistema, cada generador y cada tecnología: el valor mensual, sumas y medias
+móviles de 3, 6 y 12 meses, la variación interanual (absoluta y en %), el
+acumulado y la participación en el sistema. Cada medida se pasa a una matriz
+mes × entidad y todas las ventanas se calculan sobre la matriz completa, así
+el costo no depende de cuántos generadores o tecnologías haya. Las páginas
+sólo filtran esta tabla.
+
+Se calcula desde las mismas series que leen las páginas, así la vista mensual
+coincide con la que ya muestran. Se agrupa por los ids de pipeline.claves que
+traen las series (generador_id, tecnologia_id); el nombre se agrega al leer.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.claves import DIMENSIONES, ids_canonicos, registro
+from pipeline.config import DATA_FOLDER
+from pipeline.estrella import carpeta_estrella, escribir_parquet
+from pipeline.publicar import a_formato_largo
+from utils.spreadsheet import read_sheet
+
+# (serie, medidas sumables de la serie)
+MEDIDAS = [
+    ("serie_energia", ["Energía kWh"]),
+    ("serie_potencia", ["Potencia kW"]),
+    ("serie_ingresos", ["Ingresos Energía USD", "Ingresos Potencia USD", "Ingresos Renovables USD"]),
+]
+
+# Niveles de agregación: nivel → dimensión de pipeline.claves (None: todo el sistema)
+NIVELES = {"sistema": None, "generador": "generador", "tecnologia": "tecnologia"}
+
+VENTANAS = (3, 6, 12)
+ESTADISTICAS = (
+    ["valor"]
+    + [f"{tipo}_{v}" for v in VENTANAS for tipo in ("suma", "media")]
+    + ["interanual", "interanual_pct", "acumulado", "participacion"]
+)
+
+
+def ruta(data=DATA_FOLDER):
+    return carpeta_estrella(data) / "tendencias.parquet"
+
+
+def estadisticas(matriz, sistema):
+    """{estadística: matriz mes × entidad} con todas las ventanas sobre la matriz completa."""
+    resultado = {"valor": matriz}
+    for v in VENTANAS:
+        ventana = matriz.rolling(v, min_periods=v)
+        resultado[f"suma_{v}"] = ventana.sum()
+        resultado[f"media_{v}"] = ventana.mean()
+    # El índice es mensual y sin huecos: 12 filas atrás es el mismo mes del año anterior
+    anterior = matriz.shift(12)
+    resultado["interanual"] = matriz - anterior
+    resultado["interanual_pct"] = (matriz - anterior) / anterior.abs().where(anterior != 0) * 100
+    resultado["acumulado"] = matriz.cumsum()
+    resultado["participacion"] = matriz.div(sistema.where(sistema != 0), axis=0) * 100
+    return resultado
+
+
+def matrices(largo):
+    """{nivel: matriz mes × id} de una medida, con los meses sin datos en NaN."""
+    meses = pd.date_range(largo["FECHA"].min(), largo["FECHA"].max(), freq="MS")
+    con_datos = meses.isin(largo["FECHA"].unique())
+    resultado = {}
+    for nivel, dim in NIVELES.items():
+        if dim is None:
+            ids = pd.Series(0, index=largo.index, dtype="Int32")
+        elif largo[DIMENSIONES[dim][1]].notna().any():
+            ids = largo[DIMENSIONES[dim][1]]
+        else:
+            continue
+        matriz = (
+            largo.groupby([largo["FECHA"], ids.rename("id")])["VALOR"].sum()
+            .unstack("id")
+            .reindex(meses)
+        )
+        # Una entidad sin filas en un mes con datos aportó 0 a ese mes
+        matriz.loc[con_datos] = matriz.loc[con_datos].fillna(0)
+        resultado[nivel] = matriz
+    return resultado
+
+
+def construir(data=DATA_FOLDER):
+    """Tabla larga serie, MEDIDA, nivel, id, FECHA y una columna por estadística."""
+    claves = registro(data)
+    partes = []
+    for serie, medidas in MEDIDAS:
+        path = Path(data) / f"{serie}.xlsx"
+        if not path.exists():
+            continue
+        largo_serie = ids_canonicos(a_formato_largo(read_sheet(path)), claves, path.name)
+        for medida in medidas:
+            largo = largo_serie[largo_serie["MEDIDA"] == medida]
+            if largo.empty:
+                continue
+            por_nivel = matrices(largo)
+            sistema = por_nivel["sistema"][0]
+            for nivel, matriz in por_nivel.items():
+                tabla = pd.concat(
+                    {nombre: m.stack() for nombre, m in estadisticas(matriz, sistema).items()}, axis=1
+                )
+                tabla.index.names = ["FECHA", "id"]
+                tabla = tabla.reset_index().dropna(subset=["valor"])
+                partes.append(tabla.assign(serie=serie, MEDIDA=medida, nivel=nivel))
+    if not partes:
+        raise FileNotFoundError(f"No hay series en {data}")
+    tabla = pd.concat(partes, ignore_index=True)
+    tabla["id"] = tabla["id"].astype("int32")
+    tabla["FECHA"] = tabla["FECHA"].astype("datetime64[ns]")
+    return tabla[["serie", "MEDIDA", "nivel", "id", "FECHA", *ESTADISTICAS]].sort_values(
+        ["serie", "MEDIDA", "nivel", "id", "FECHA"], ignore_index=True
+    )
+
+
+def generar_tendencias(data=DATA_FOLDER):
+    """Escribe data/estrella/tendencias.parquet; devuelve la tabla. Requiere pyarrow."""
+    tabla = construir(data)
+    destino = ruta(data)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    escribir_parquet(tabla, destino)
+    print(f"[tendencias] {destino.name}: {len(tabla)} filas")
+    return tabla
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.tendencias", description=__doc__.split("\n")[0])
+    parser.add_argument("--data", type=Path, default=DATA_FOLDER, help="Carpeta con las series (por defecto data/)")
+    args = parser.parse_args(argv)
+    generar_tendencias(args.data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
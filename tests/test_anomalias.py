@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from pipeline.anomalias import FACTOR_SALTO, MINIMO_MESES, UMBRAL_Z, marcas, mediana, salto, z_robusto
+
+
+def columna(*valores):
+    return np.array(valores, dtype="float64")[:, None]
+
+
+def test_mediana_ignora_nan():
+    ventanas = np.array([[1.0, 3.0, np.nan, 2.0], [4.0, np.nan, np.nan, 6.0], [np.nan] * 4])
+    resultado = mediana(ventanas)
+    assert resultado[:2].tolist() == [2.0, 5.0]
+    assert np.isnan(resultado[2])
+
+
+def test_mediana_coincide_con_numpy():
+    rng = np.random.default_rng(0)
+    ventanas = rng.normal(size=(50, 12))
+    ventanas[rng.random(ventanas.shape) < 0.3] = np.nan
+    ventanas[0] = np.nan
+    with np.errstate(all="ignore"), pytest.warns(RuntimeWarning):
+        esperado = np.nanmedian(ventanas, axis=-1)
+    np.testing.assert_allclose(mediana(ventanas), esperado, equal_nan=True)
+
+
+def test_salto_entre_meses_positivos():
+    s = salto(columna(100, 400, 100, 90))[:, 0]
+    assert np.isnan(s[0])
+    np.testing.assert_allclose(s[1:], [3.0, -0.75, -0.1])
+
+
+def test_salto_no_mide_meses_en_cero():
+    s = salto(columna(100, 0, 0, 100, np.nan, 50))[:, 0]
+    assert np.isnan(s).all()
+
+
+def test_caer_a_cero_no_se_marca_como_salto():
+    _, _, motivo = marcas(columna(100, 0, 0, 100))
+    assert (motivo == "").all()
+
+
+def test_salto_marcado_en_ambos_sentidos():
+    y = columna(100, 100 * (FACTOR_SALTO + 1), 100, 100 / (FACTOR_SALTO + 1), 90)
+    _, _, motivo = marcas(y)
+    assert motivo[:, 0].tolist() == ["", "salto", "salto", "salto", "salto"]
+
+
+def test_z_necesita_meses_previos():
+    y = columna(*[100.0] * MINIMO_MESES, 1000)
+    z = z_robusto(y)[:, 0]
+    assert np.isnan(z[:MINIMO_MESES]).all()
+    assert z[MINIMO_MESES] > UMBRAL_Z
+
+
+def test_serie_constante_no_marca_cambios_minimos():
+    y = columna(*[100.0] * 12, 101)
+    assert abs(z_robusto(y)[-1, 0]) < UMBRAL_Z
+    assert (marcas(y)[2] == "").all()
+
+
+def test_z_y_salto_juntos():
+    y = columna(*[100.0, 105.0, 95.0, 100.0, 102.0, 98.0, 100.0], 1000)
+    _, _, motivo = marcas(y)
+    assert motivo[-1, 0] == "z+salto"
+
+
+def test_centrales_independientes():
+    y = np.hstack([columna(*[100.0] * 8), columna(*[100.0] * 7, 1000)])
+    _, _, motivo = marcas(y)
+    assert (motivo[:, 0] == "").all()
+    assert motivo[-1, 1] == "z+salto"
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from utils import arrow_store  # noqa: E402
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    monkeypatch.setattr(arrow_store, "ARROW_DIR", tmp_path)
+    monkeypatch.setattr(arrow_store, "ENABLED", True)
+    return tmp_path
+
+
+def ejemplo():
+    return pd.DataFrame({
+        "CENTRAL": ["Cumbre", None, "Yunchara"],
+        "FECHA": pd.to_datetime(["2025-01-01", "2025-02-01", "2025-03-01"]).astype("datetime64[ns]"),
+        "Energía kWh": [1.5, np.nan, 3.0],
+        "n": np.array([1, 2, 3], dtype="int64"),
+    })
+
+
+def test_ida_y_vuelta(tmp_path):
+    df = ejemplo()
+    arrow_store.write_frame(df, tmp_path / "x.arrow", "v1")
+
+    leido = arrow_store.read_frame(tmp_path / "x.arrow", "v1")
+
+    pd.testing.assert_frame_equal(leido, df, check_dtype=False)
+    assert leido["Energía kWh"].dtype == "float64"
+    assert np.isnan(leido["Energía kWh"].iloc[1])
+    assert pd.isna(leido["CENTRAL"].iloc[1])
+
+
+def test_columnas_numericas_sin_copia(tmp_path):
+    arrow_store.write_frame(ejemplo(), tmp_path / "x.arrow", "v1")
+    leido = arrow_store.read_frame(tmp_path / "x.arrow")
+    # Vistas de sólo lectura sobre el mapa
+    assert not leido["n"].to_numpy().flags.writeable
+    assert not leido["Energía kWh"].to_numpy().flags.writeable
+
+
+def test_version_distinta(tmp_path):
+    arrow_store.write_frame(ejemplo(), tmp_path / "x.arrow", "v1")
+    assert arrow_store.read_frame(tmp_path / "x.arrow", "v2") is None
+
+
+def test_texto_sin_string_dtype(tmp_path, monkeypatch):
+    monkeypatch.setattr(arrow_store, "_string_dtype", lambda: None)
+    arrow_store.write_frame(ejemplo(), tmp_path / "x.arrow", "v1")
+
+    leido = arrow_store.read_frame(tmp_path / "x.arrow")
+
+    assert leido["CENTRAL"].iloc[0] == "Cumbre"
+    assert pd.isna(leido["CENTRAL"].iloc[1])
+
+
+def test_load_frame_carga_una_vez(carpeta):
+    llamadas = []
+
+    def cargar():
+        llamadas.append(1)
+        return ejemplo()
+
+    primero = arrow_store.load_frame("pagina", "v1", cargar)
+    segundo = arrow_store.load_frame("pagina", "v1", cargar)
+    tercero = arrow_store.load_frame("pagina", "v2", cargar)
+
+    assert len(llamadas) == 2
+    pd.testing.assert_frame_equal(primero, segundo)
+    pd.testing.assert_frame_equal(segundo, tercero)
+    assert (carpeta / "pagina.arrow").exists()
+
+
+def test_load_frame_archivo_corrupto(carpeta):
+    (carpeta / "pagina.arrow").write_bytes(b"no es arrow")
+
+    df = arrow_store.load_frame("pagina", "v1", ejemplo)
+
+    pd.testing.assert_frame_equal(df, ejemplo(), check_dtype=False)
+    assert arrow_store.read_frame(carpeta / "pagina.arrow", "v1") is not None
+
+
+def test_load_frame_valor_que_no_es_dataframe(carpeta):
+    assert arrow_store.load_frame("pagina", "v1", lambda: None) is None
+    assert not (carpeta / "pagina.arrow").exists()
+
+
+def test_load_frame_sin_version_o_desactivado(carpeta, monkeypatch):
+    assert arrow_store.load_frame("pagina", None, lambda: "valor") == "valor"
+    monkeypatch.setattr(arrow_store, "ENABLED", False)
+    arrow_store.load_frame("pagina", "v1", ejemplo)
+    assert not (carpeta / "pagina.arrow").exists()
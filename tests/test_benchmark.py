@@ -0,0 +1,34 @@
+import pytest
+
+from pipeline import benchmark
+from pipeline.benchmark import DependenciaFaltante, preparar
+
+
+def test_sin_xls_falla_en_vez_de_omitir(tmp_path, monkeypatch):
+    original = benchmark.generar_historia
+
+    def sin_pyexcel(folder, plantas, meses, formato="xlsx", **kwargs):
+        if formato == "xls":
+            raise ModuleNotFoundError("No module named 'pyexcel'")
+        return original(folder, plantas, meses, formato=formato, **kwargs)
+
+    monkeypatch.setattr(benchmark, "generar_historia", sin_pyexcel)
+    with pytest.raises(DependenciaFaltante, match="--sin-convertir"):
+        preparar(tmp_path, 3, 1)
+
+
+def test_sin_convertir_no_genera_xls(tmp_path):
+    ws, periodos = preparar(tmp_path, 3, 2, convertir=False)
+
+    assert periodos == ["0123", "0223"]
+    assert not any(ws["xls"].iterdir())
+    assert len(list(ws["origen"].glob("c_iny_*.xlsx"))) == 2
+
+
+def test_main_devuelve_error_si_falta_la_dependencia(monkeypatch, capsys):
+    def falla(*args, **kwargs):
+        raise DependenciaFaltante("falta pyexcel-xls")
+
+    monkeypatch.setattr(benchmark, "correr", falla)
+    assert benchmark.main(["--escalas", "1"]) == 2
+    assert "falta pyexcel-xls" in capsys.readouterr().err
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from utils.charts import downsample
+
+
+def serie(n, central="Cumbre"):
+    rng = np.random.default_rng(len(central))
+    return pd.DataFrame({
+        "FECHA": pd.date_range("2000-01-01", periods=n, freq="D"),
+        "CENTRAL": central,
+        "VALOR": rng.normal(size=n),
+    })
+
+
+def test_series_cortas_sin_cambios():
+    df = pd.concat([serie(10), serie(20, "Yunchara")], ignore_index=True)
+    assert downsample(df, "FECHA", "VALOR", by="CENTRAL", max_points=30) is df
+    # Más puntos en total que max_points, pero ninguna serie los supera
+    pd.testing.assert_frame_equal(downsample(df, "FECHA", "VALOR", by="CENTRAL", max_points=20), df)
+
+
+def test_conserva_minimo_y_maximo_de_cada_tramo():
+    df = serie(1000)
+    df.loc[123, "VALOR"], df.loc[877, "VALOR"] = 50.0, -50.0
+
+    reducida = downsample(df, "FECHA", "VALOR", max_points=100)
+
+    assert len(reducida) <= 100
+    assert {50.0, -50.0} <= set(reducida["VALOR"])
+    # Cada tramo de 20 puntos deja su mínimo y su máximo
+    tramos = np.arange(len(df)) * 50 // len(df)
+    esperado = df.groupby(tramos)["VALOR"].agg(["min", "max"])
+    assert set(esperado["min"]) | set(esperado["max"]) == set(reducida["VALOR"])
+    assert reducida["FECHA"].is_monotonic_increasing
+
+
+def test_solo_se_reducen_las_series_largas():
+    df = pd.concat([serie(1000), serie(30, "Yunchara")], ignore_index=True)
+
+    reducida = downsample(df, "FECHA", "VALOR", by="CENTRAL", max_points=100)
+
+    por_central = reducida["CENTRAL"].value_counts()
+    assert por_central["Yunchara"] == 30
+    assert por_central["Cumbre"] <= 100
+    assert df.loc[df["CENTRAL"] == "Cumbre", "VALOR"].max() in set(reducida["VALOR"])
@@ -0,0 +1,123 @@
+import json
+
+import pandas as pd
+import pytest
+
+from pipeline import claves as modulo
+from pipeline.claves import Claves, con_claves, con_nombres, ids_canonicos, registro
+
+
+@pytest.fixture
+def claves(tmp_path):
+    return Claves(tmp_path / "claves.json")
+
+
+def test_los_ids_no_cambian_al_recargar(claves):
+    ids = claves.asignar("central", ["Cumbre", "Yunchara", "Cumbre", None])
+    claves.guardar()
+
+    otra = Claves(claves.path)
+    assert list(otra.asignar("central", ["Yunchara", "Cumbre", "Kanata"])) == [ids[1], ids[0], 3]
+    assert ids[3] is pd.NA
+
+
+def test_espacios_en_los_extremos_no_crean_otro_id(claves):
+    assert claves.id("generador", "RIO ELECTRICO S.A. ") == claves.id("generador", "RIO ELECTRICO S.A.")
+    assert claves.id("generador", "  ") is None
+
+
+def test_sembrar_es_reproducible(tmp_path):
+    nombres = ["Santa Cruz", "Aranjuez", "Cumbre ", "Aranjuez"]
+    a, b = Claves(tmp_path / "a.json"), Claves(tmp_path / "b.json")
+    a.sembrar("central", nombres)
+    b.sembrar("central", reversed(nombres))
+    assert a.nombres == b.nombres
+    assert a.nombres["central"] == {1: ["Aranjuez"], 2: ["Cumbre"], 3: ["Santa Cruz"]}
+
+
+def test_renombrar_deja_alias_del_mismo_id(claves):
+    id_ = claves.id("central", "Yunchara")
+    assert claves.renombrar("central", "Yunchara", "Yunchará") == id_
+    assert claves.id("central", "Yunchara") == claves.id("central", "Yunchará") == id_
+    assert claves.nombre("central", id_) == "Yunchará"
+    assert claves.nombres["central"][id_] == ["Yunchará", "Yunchara"]
+
+
+def test_renombrar_a_un_nombre_registrado_fusiona_los_ids(claves):
+    viejo, nuevo = claves.id("central", "Kanata"), claves.id("central", "Kanata ARO")
+    claves.renombrar("central", "Kanata", "Kanata ARO")
+    assert claves.fusionados["central"] == {nuevo: viejo}
+    assert claves.nombre("central", nuevo) == "Kanata ARO"
+    # El id fusionado no se reutiliza
+    assert claves.id("central", "Otra") == 3
+    with pytest.raises(KeyError):
+        claves.renombrar("central", "No registrada", "X")
+
+
+def test_guardar_y_leer_conserva_alias_y_fusiones(claves):
+    claves.sembrar("tecnologia", ["Hidro", "Termo"])
+    claves.id("central", "Kanata")
+    claves.id("central", "Kanata ARO")
+    claves.renombrar("central", "Kanata", "Kanata ARO")
+    claves.guardar()
+    assert not claves.cambios
+
+    otra = Claves(claves.path)
+    assert (otra.nombres, otra.fusionados, otra.ids) == (claves.nombres, claves.fusionados, claves.ids)
+    datos = json.loads(claves.path.read_text(encoding="utf-8"))
+    assert datos["central"]["fusionados"] == {"2": 1}
+
+
+def test_guardar_sin_cambios_no_escribe(claves):
+    claves.guardar()
+    assert not claves.path.exists()
+
+
+def test_con_claves_respeta_los_ids_del_archivo(claves):
+    claves.sembrar("central", ["Cumbre", "Yunchara"])
+    df = pd.DataFrame({"CENTRAL": ["Cumbre", "Yunchara"], "central_id": [7, None]})
+    assert list(con_claves(df, claves)["central_id"]) == [7, 2]
+
+
+def test_con_nombres_mantiene_los_nombres_publicados(claves):
+    df = con_claves(pd.DataFrame({
+        "CENTRAL": ["Yunchara", "Yunchara ", "Cumbre"],
+        "GENERADOR": ["RIO ELECTRICO S.A. ", "RIO ELECTRICO S.A.", None],
+    }), claves)
+    claves.renombrar("central", "Cumbre", "Cumbre I")
+
+    df = con_nombres(df, claves)
+    assert list(df["CENTRAL"]) == ["Yunchara", "Yunchara ", "Cumbre I"]
+    assert df["GENERADOR"].tolist()[:2] == ["RIO ELECTRICO S.A. ", "RIO ELECTRICO S.A."]
+    assert pd.isna(df["GENERADOR"].iloc[2])
+
+
+def test_ids_canonicos_resuelve_fusiones_y_completa_dimensiones(claves):
+    viejo, nuevo = claves.id("central", "Kanata"), claves.id("central", "Kanata ARO")
+    claves.renombrar("central", "Kanata", "Kanata ARO")
+    df = pd.DataFrame({"CENTRAL": ["Kanata ARO", "Kanata"], "central_id": [nuevo, viejo]})
+
+    df = ids_canonicos(df, claves)
+    assert df["central_id"].tolist() == [viejo, viejo]
+    assert str(df["central_id"].dtype) == "Int32"
+    assert df["generador_id"].isna().all() and df["tecnologia_id"].isna().all()
+    with pytest.raises(ValueError, match="serie_x.xlsx no tiene ids"):
+        ids_canonicos(pd.DataFrame({"CENTRAL": ["Kanata"]}), claves, "serie_x.xlsx")
+
+
+def test_registro_por_carpeta_de_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "_registros", {})
+    monkeypatch.setattr("pipeline.normalizar.cargar_centrales", lambda: {
+        "generadores": {"Cumbre": "ENDE", "Aranjuez": "ENDE", "TOTAL - ENDE": "ENDE", "Aguaí Energía": "AGUAÍ",
+                        "Aguaí Energia": "AGUAÍ"},
+        "tecnologia": {"Cumbre": "Hidro", "Aranjuez": "Termo", "Aguaí Energía": "Biomasa", "Aguaí Energia": "Biomasa"},
+        "nombres": {"Cumbre", "Aranjuez", "TOTAL - ENDE", "Aguaí Energía"},
+    })
+    a = registro(tmp_path / "a")
+    assert registro(tmp_path / "a") is a
+    assert registro(tmp_path / "b") is not a
+    assert a.path == (tmp_path / "a" / "claves.json").resolve()
+    # Sin subtotales y con las variantes de un nombre en un solo id
+    assert a.nombres["central"] == {1: ["Aguaí Energia"], 2: ["Aranjuez"], 3: ["Cumbre"]}
+    assert a.nombres["generador"] == {1: ["AGUAÍ"], 2: ["ENDE"]}
+    assert a.nombres["tecnologia"] == {1: ["Biomasa"], 2: ["Hidro"], 3: ["Termo"]}
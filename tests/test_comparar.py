@@ -0,0 +1,134 @@
+import pandas as pd
+
+from pipeline.comparar import (
+    DISTINTO,
+    ID_DISTINTO,
+    SOLO_NUEVO,
+    SOLO_REFERENCIA,
+    a_formato_largo,
+    comparar,
+    comparar_tablas,
+    informar,
+)
+
+
+def serie(**columnas):
+    base = {"CENTRAL": ["Cumbre", "Yunchara"], "GENERADOR": ["ENDE", "RIO ELECTRICO S.A. "]}
+    return pd.DataFrame({**base, **columnas})
+
+
+def test_tablas_iguales_no_tienen_diferencias():
+    df = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    assert comparar_tablas(df, df.copy()).empty
+
+
+def test_valor_fuera_de_tolerancia():
+    ref = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    nuevo = serie(**{"Energía kWh 012025": [1.0 + 1e-12, 2.5]})
+
+    difs = comparar_tablas(ref, nuevo)
+
+    assert difs[["TIPO", "CENTRAL", "MEDIDA", "PERIODO"]].values.tolist() == [
+        [DISTINTO, "Yunchara", "Energía kWh", "012025"]
+    ]
+    assert difs["DIFERENCIA"].iloc[0] == 0.5
+
+
+def test_celdas_solo_en_un_lado():
+    ref = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    nuevo = serie(**{"Energía kWh 022025": [1.0, 2.0]})
+
+    tipos = comparar_tablas(ref, nuevo)["TIPO"].value_counts().to_dict()
+
+    assert tipos == {SOLO_REFERENCIA: 2, SOLO_NUEVO: 2}
+
+
+def test_espacio_en_un_id_se_informa_aparte():
+    ref = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    nuevo = ref.assign(GENERADOR=["ENDE", "RIO ELECTRICO S.A."])
+
+    difs = comparar_tablas(ref, nuevo)
+
+    assert len(difs) == 1
+    fila = difs.iloc[0]
+    assert (fila["TIPO"], fila["CENTRAL"], fila["MEDIDA"]) == (ID_DISTINTO, "Yunchara", "GENERADOR")
+    assert (fila["VALOR_REF"], fila["VALOR_NUEVO"]) == ("RIO ELECTRICO S.A. ", "RIO ELECTRICO S.A.")
+
+
+def test_ids_enteros_se_comparan_como_ids():
+    ref = serie(**{"generador_id": [1.0, None], "Energía kWh 012025": [1.0, 2.0]})
+    nuevo = serie(**{"generador_id": pd.array([1, 3], dtype="Int32"), "Energía kWh 012025": [1.0, 2.0]})
+
+    difs = comparar_tablas(ref, nuevo)
+
+    assert difs[["TIPO", "CENTRAL", "MEDIDA", "VALOR_REF", "VALOR_NUEVO"]].values.tolist() == [
+        [ID_DISTINTO, "Yunchara", "generador_id", "", "3"]
+    ]
+    # Una tabla sin ids (anterior al registro) no informa diferencias de ids
+    assert comparar_tablas(ref.drop(columns="generador_id"), nuevo).empty
+
+
+def test_cambio_de_nombre_de_generador_no_desalinea_los_valores():
+    ref = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    nuevo = ref.assign(GENERADOR=["ENDE Andina", "RIO ELECTRICO S.A. "])
+
+    difs = comparar_tablas(ref, nuevo)
+
+    assert difs["TIPO"].tolist() == [ID_DISTINTO]
+    assert difs["VALOR_NUEVO"].iloc[0] == "ENDE Andina"
+
+
+def test_espacio_en_la_central_se_informa_como_id():
+    ref = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    nuevo = ref.assign(CENTRAL=["Cumbre ", "Yunchara"])
+
+    difs = comparar_tablas(ref, nuevo)
+
+    assert difs[["TIPO", "CENTRAL", "MEDIDA"]].values.tolist() == [[ID_DISTINTO, "Cumbre", "CENTRAL"]]
+
+
+def test_filas_repetidas_se_alinean_por_ocurrencia():
+    ref = pd.DataFrame({"CENTRAL": ["A", "A"], "Energía kWh 012025": [1.0, 2.0]})
+    nuevo = pd.DataFrame({"CENTRAL": ["A", "A"], "Energía kWh 012025": [1.0, 3.0]})
+
+    difs = comparar_tablas(ref, nuevo)
+
+    assert difs[["TIPO", "OCURRENCIA"]].values.tolist() == [[DISTINTO, 1]]
+
+
+def test_filas_repetidas_reordenadas_se_alinean_por_generador():
+    ref = pd.DataFrame({
+        "CENTRAL": ["A", "A", "B"],
+        "GENERADOR": ["G1", "G2", "G1"],
+        "TECNOLOGIA": ["Hidro", "Hidro", "Termo"],
+        "Energía kWh 012025": [1.0, 2.0, 3.0],
+    })
+    nuevo = ref.iloc[[1, 2, 0]].reset_index(drop=True)
+    assert comparar_tablas(ref, nuevo).empty
+
+    nuevo.loc[2, "Energía kWh 012025"] = 5.0
+    difs = comparar_tablas(ref, nuevo)
+    assert difs[["TIPO", "CENTRAL", "OCURRENCIA", "VALOR_REF"]].values.tolist() == [[DISTINTO, "A", 0, 1.0]]
+
+
+def test_formato_largo_conserva_los_textos():
+    largo = a_formato_largo(serie(**{"Energía kWh 012025": [1.0, 2.0]}))
+    assert "RIO ELECTRICO S.A. " in set(largo["GENERADOR"])
+    assert set(largo["PERIODO"]) == {"012025"}
+
+
+def test_comparar_carpetas_y_archivo_faltante(tmp_path, capsys):
+    ref, nuevo = tmp_path / "ref", tmp_path / "nuevo"
+    ref.mkdir()
+    nuevo.mkdir()
+    df = serie(**{"Energía kWh 012025": [1.0, 2.0]})
+    df.to_excel(ref / "serie_energia.xlsx", index=False)
+    df.assign(GENERADOR=["ENDE", "RIO ELECTRICO S.A."]).to_excel(nuevo / "serie_energia.xlsx", index=False)
+    df.to_excel(ref / "serie_peaje.xlsx", index=False)
+
+    resultados = comparar(ref, nuevo)
+
+    assert resultados["serie_peaje.xlsx"]["TIPO"].tolist() == [SOLO_REFERENCIA]
+    assert resultados["serie_energia.xlsx"]["TIPO"].tolist() == [ID_DISTINTO]
+    assert informar(resultados) == 2
+    assert "'RIO ELECTRICO S.A. '" in capsys.readouterr().out
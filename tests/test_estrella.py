@@ -0,0 +1,116 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import estrella
+from pipeline.claves import Claves, con_claves
+from pipeline.estrella import FUENTES, columnas_medida
+from utils.spreadsheet import write_sheet
+
+
+def test_cada_columna_sale_de_una_sola_serie():
+    repetidas = [c for c, n in Counter(columna for _, _, columna in FUENTES).items() if n > 1]
+    assert repetidas == []
+    assert "Energía ingresos kWh" in columnas_medida()
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    claves = Claves(tmp_path / "claves.json")
+    monkeypatch.setattr(estrella, "registro", lambda data: claves)
+    escribir = lambda df, path: write_sheet(con_claves(df, claves), path)  # noqa: E731
+    escribir(pd.DataFrame({
+        "CENTRAL": ["Cumbre", "Yunchara"],
+        "GENERADOR": ["ENDE", "RIO ELECTRICO S.A."],
+        "TECNOLOGIA": ["Hidro", "Hidro"],
+        "Energía kWh 012025": [10.0, 20.0],
+        "Energía kWh 022025": [11.0, np.nan],
+    }), tmp_path / "serie_energia.xlsx")
+    escribir(pd.DataFrame({
+        "CENTRAL": ["Cumbre", "Yunchara", "Kanata"],
+        "TECNOLOGIA": ["Hidro", "Hidro", "Termo"],
+        "Energía KWh 012025": [10.5, 20.0, 5.0],
+        "Energía KWh 022025": [11.0, 21.0, 6.0],
+        "Ingresos Energía USD 012025": [100.0, 200.0, 50.0],
+    }), tmp_path / "serie_ingresos.xlsx")
+    return tmp_path
+
+
+def test_energia_de_ingresos_no_completa_la_de_serie_energia(data):
+    tablas = estrella.construir(data)
+    dim = tablas["centrales"].set_index("CENTRAL")["central_id"]
+    h = tablas["hechos"].set_index(["central_id", "FECHA"])
+
+    yunchara_feb = h.loc[(dim["Yunchara"], pd.Timestamp("2025-02-01"))]
+    assert np.isnan(yunchara_feb["Energía kWh"])
+    assert yunchara_feb["Energía ingresos kWh"] == 21.0
+
+    cumbre_ene = h.loc[(dim["Cumbre"], pd.Timestamp("2025-01-01"))]
+    assert (cumbre_ene["Energía kWh"], cumbre_ene["Energía ingresos kWh"]) == (10.0, 10.5)
+
+    kanata = h.loc[dim["Kanata"]]
+    assert kanata["Energía kWh"].isna().all()
+    assert kanata["Energía ingresos kWh"].tolist() == [5.0, 6.0]
+
+
+def test_hechos_tiene_una_fila_por_central_y_mes(data):
+    hechos = estrella.construir(data)["hechos"]
+    assert not hechos.duplicated(["central_id", "FECHA"]).any()
+    assert list(hechos.columns) == ["central_id", "FECHA", *columnas_medida()]
+    assert hechos["central_id"].is_monotonic_increasing
+
+
+def test_dimensiones_toman_el_primer_valor_por_prioridad(data):
+    tablas = estrella.construir(data)
+    centrales = (
+        tablas["centrales"]
+        .merge(tablas["generadores"], on="generador_id", how="left")
+        .merge(tablas["tecnologias"], on="tecnologia_id", how="left")
+        .set_index("CENTRAL")
+    )
+    assert centrales.loc["Yunchara", "GENERADOR"] == "RIO ELECTRICO S.A."
+    # Kanata sólo está en serie_ingresos, que no trae GENERADOR
+    assert pd.isna(centrales.loc["Kanata", "generador_id"])
+    assert centrales.loc["Kanata", "TECNOLOGIA"] == "Termo"
+
+
+def test_une_por_id_y_no_por_nombre(data):
+    # Mismo id que Yunchara aunque el nombre publicado cambie
+    serie = pd.DataFrame({
+        "CENTRAL": ["Yunchará "], "TECNOLOGIA": ["Hidro"], "central_id": [2], "tecnologia_id": [1],
+        "Precio Energía USD/MWh 012025": [30.0],
+    })
+    write_sheet(serie, data / "serie_precios_energia.xlsx")
+    tablas = estrella.construir(data)
+
+    assert tablas["centrales"]["CENTRAL"].tolist() == ["Cumbre", "Yunchara", "Kanata"]
+    fila = tablas["hechos"].set_index(["central_id", "FECHA"]).loc[(2, pd.Timestamp("2025-01-01"))]
+    assert (fila["Energía kWh"], fila["Precio Energía USD/MWh"]) == (20.0, 30.0)
+
+
+def test_series_sin_ids_fallan(tmp_path, monkeypatch):
+    monkeypatch.setattr(estrella, "registro", lambda data: Claves(tmp_path / "claves.json"))
+    write_sheet(pd.DataFrame({"CENTRAL": ["Cumbre"], "Energía kWh 012025": [1.0]}), tmp_path / "serie_energia.xlsx")
+    with pytest.raises(ValueError, match="python -m pipeline"):
+        estrella.construir(tmp_path)
+
+
+def test_sin_series(tmp_path, monkeypatch):
+    monkeypatch.setattr(estrella, "registro", lambda data: Claves(tmp_path / "claves.json"))
+    with pytest.raises(FileNotFoundError):
+        estrella.construir(tmp_path)
+
+
+def test_vista_cruza_medidas_de_la_misma_serie(data):
+    pytest.importorskip("pyarrow")
+    estrella.generar_estrella(data)
+
+    df = estrella.vista(["Ingresos Energía USD", "Energía ingresos kWh"], fechas=("2025-01-01", "2025-01-31"),
+                        centrales=["Cumbre", "Kanata"], data=data)
+
+    assert df[["CENTRAL", "GENERADOR", "Ingresos Energía USD", "Energía ingresos kWh"]].values.tolist() == [
+        ["Cumbre", "ENDE", 100.0, 10.5],
+        ["Kanata", np.nan, 50.0, 5.0],
+    ]
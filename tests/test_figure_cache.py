@@ -0,0 +1,62 @@
+import plotly.graph_objects as go
+
+from utils.figure_cache import FigureCache
+
+
+def figura(n):
+    return go.Figure(go.Scatter(x=[1, 2, 3], y=[n, n, n], name=f"traza {n}"))
+
+
+def bytes_de(n):
+    return len(figura(n).to_json().encode("utf-8"))
+
+
+def construir(cache, dataset, version, n, construidas):
+    def builder():
+        construidas.append(n)
+        return figura(n)
+    return cache.get_or_build(dataset, version, ("pagina", n), builder)
+
+
+def test_repetir_la_seleccion_no_reconstruye():
+    cache, construidas = FigureCache(), []
+    primera = construir(cache, "serie_energia", "v1", 1, construidas)
+    segunda = construir(cache, "serie_energia", "v1", 1, construidas)
+
+    assert construidas == [1]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert segunda.data[0].name == primera.data[0].name == "traza 1"
+
+
+def test_expulsa_la_menos_usada_al_pasar_el_tope():
+    # Entran dos figuras, no tres
+    cache, construidas = FigureCache(max_bytes=2 * bytes_de(1) + bytes_de(1) // 2), []
+    construir(cache, "serie_energia", "v1", 1, construidas)
+    construir(cache, "serie_energia", "v1", 2, construidas)
+    construir(cache, "serie_energia", "v1", 1, construidas)  # la 1 pasa a ser la más reciente
+    construir(cache, "serie_energia", "v1", 3, construidas)  # expulsa la 2
+
+    assert len(cache) == 2
+    assert cache.size <= cache.max_bytes
+    construir(cache, "serie_energia", "v1", 1, construidas)
+    construir(cache, "serie_energia", "v1", 2, construidas)
+    assert construidas == [1, 2, 3, 2]
+
+
+def test_figura_mayor_que_el_tope_no_se_guarda():
+    cache, construidas = FigureCache(max_bytes=10), []
+    assert construir(cache, "serie_energia", "v1", 1, construidas) is not None
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_nueva_version_del_dataset_descarta_sus_figuras():
+    cache, construidas = FigureCache(), []
+    construir(cache, "serie_energia", "v1", 1, construidas)
+    construir(cache, "serie_potencia", "v1", 1, construidas)
+
+    construir(cache, "serie_energia", "v2", 1, construidas)
+    construir(cache, "serie_potencia", "v1", 1, construidas)
+
+    assert construidas == [1, 1, 1]
+    assert cache.misses == 3 and cache.hits == 1
+    assert len(cache) == 2
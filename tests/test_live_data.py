@@ -0,0 +1,190 @@
+import os
+
+import pytest
+import streamlit
+
+from utils import arrow_store, live_data
+from utils.live_data import LiveStore, LoadError, live_dataset
+
+
+@pytest.fixture(autouse=True)
+def sin_arrow_ni_metricas(monkeypatch):
+    monkeypatch.setattr(arrow_store, "ENABLED", False)
+    errores = []
+    monkeypatch.setattr(live_data, "record_error", lambda etapa, e, **labels: errores.append((etapa, str(e))))
+    return errores
+
+
+@pytest.fixture
+def fuente(tmp_path):
+    path = tmp_path / "serie.xlsx"
+    path.write_text("v1")
+    return path
+
+
+class Cargador:
+    """Devuelve el contenido del archivo; falla con `error` si está puesto."""
+
+    def __init__(self, path):
+        self.path = path
+        self.llamadas = 0
+        self.error = None
+
+    def __call__(self):
+        self.llamadas += 1
+        if self.error:
+            raise self.error
+        return self.path.read_text()
+
+
+def cambiar(path, texto):
+    path.write_text(texto)
+
+
+def test_carga_una_vez_y_comparte_la_generacion(fuente):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    store.register("a", fuente, cargar)
+
+    assert store.get("a")[1] == "v1"
+    assert store.get("a")[1] == "v1"
+    assert cargar.llamadas == 1
+    assert store.generation.number == 1
+
+
+def test_recarga_cuando_el_archivo_queda_estable(fuente):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    otra = fuente.with_name("otra.xlsx")
+    otra.write_text("x")
+    store.register("a", fuente, cargar)
+    store.register("b", otra, lambda: "b")
+    store.get("a"), store.get("b")
+    anterior = store.generation
+
+    cambiar(fuente, "v2 nueva")
+    assert store.check() == []          # primera vuelta: se anota la versión
+    assert store.check() == ["a"]       # segunda: sigue igual, se recarga
+
+    assert store.generation.entries["a"][1] == "v2 nueva"
+    assert store.generation.number == anterior.number + 1
+    # La generación anterior no cambia: las sesiones que la tienen siguen leyéndola
+    assert anterior.entries["a"][1] == "v1"
+    # Las claves no recargadas pasan sin copiarse
+    assert store.generation.entries["b"] is anterior.entries["b"]
+    assert store.reloads == 1
+
+
+def test_no_recarga_mientras_se_escribe(fuente):
+    store = LiveStore(watch_interval=0)
+    store.register("a", fuente, Cargador(fuente))
+    store.get("a")
+
+    cambiar(fuente, "v2")
+    store.check()
+    cambiar(fuente, "v2 más larga")
+    assert store.check() == []
+    assert store.generation.entries["a"][1] == "v1"
+
+
+def test_recarga_fallida_mantiene_la_generacion(fuente, sin_arrow_ni_metricas):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    store.register("a", fuente, cargar)
+    store.get("a")
+    anterior = store.generation
+
+    cargar.error = LoadError("El archivo está vacío")
+    cambiar(fuente, "v2 rota")
+    store.check()
+    assert store.check() == []
+
+    assert store.generation is anterior
+    assert store.errors == {"a": "El archivo está vacío"}
+    assert sin_arrow_ni_metricas == [("live_data:recarga", "El archivo está vacío")]
+
+    # Se reintenta en la vuelta siguiente y el error se borra al recargar bien
+    cargar.error = None
+    assert store.check() == ["a"]
+    assert store.errors == {}
+
+
+def test_error_inesperado_lleva_el_prefijo(fuente):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    cargar.error = KeyError("CENTRAL")
+    store.register("a", fuente, cargar)
+
+    assert store.get("a") == (None, None)
+    assert store.errors["a"] == "Error al cargar datos: 'CENTRAL'"
+    assert store.generation.number == 0
+
+    # Sin datos no hay nada que cachear: el próximo rerun reintenta
+    cargar.error = None
+    assert store.get("a")[1] == "v1"
+    assert store.errors == {}
+
+
+def test_error_de_un_oyente_no_frena_el_cambio(fuente, sin_arrow_ni_metricas):
+    store = LiveStore(watch_interval=0)
+    store.register("a", fuente, Cargador(fuente))
+    store.get("a")
+    recibidos = []
+
+    def roto(fuentes):
+        raise RuntimeError("sin shards")
+
+    store.add_listener(roto)
+    store.add_listener(recibidos.append)
+    cambiar(fuente, "v2 nueva")
+    store.check()
+
+    assert store.check() == ["a"]
+    assert store.generation.entries["a"][1] == "v2 nueva"
+    assert recibidos == [[fuente]]
+    assert sin_arrow_ni_metricas == [("live_data:oyente", "sin shards")]
+    assert store.errors == {}
+
+
+@pytest.fixture
+def pagina(monkeypatch):
+    mensajes = []
+    monkeypatch.setattr(streamlit, "error", lambda m: mensajes.append(("error", m)))
+    monkeypatch.setattr(streamlit, "warning", lambda m: mensajes.append(("warning", m)))
+    return mensajes
+
+
+def test_live_dataset_muestra_el_error_sin_datos(fuente, pagina):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    cargar.error = LoadError("Archivo no encontrado")
+
+    assert live_dataset("a", "serie", cargar, store=store, source=fuente) is None
+    assert pagina == [("error", "Archivo no encontrado")]
+
+
+def test_live_dataset_avisa_que_fallo_la_recarga(fuente, pagina):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    assert live_dataset("a", "serie", cargar, store=store, source=fuente) == "v1"
+    assert pagina == []
+
+    cargar.error = LoadError("El archivo está vacío")
+    cambiar(fuente, "v2 rota")
+    store.check(), store.check()
+
+    assert live_dataset("a", "serie", cargar, store=store, source=fuente) == "v1"
+    assert pagina == [("warning", "El archivo está vacío. Se muestran los datos anteriores.")]
+
+
+def test_error_se_borra_si_el_archivo_vuelve_a_la_version_en_uso(fuente):
+    store, cargar = LiveStore(watch_interval=0), Cargador(fuente)
+    store.register("a", fuente, cargar)
+    store.get("a")
+    version = store.generation.entries["a"][0]
+    mtime = fuente.stat().st_mtime_ns
+
+    cargar.error = LoadError("El archivo está vacío")
+    cambiar(fuente, "v2 rota")
+    store.check(), store.check()
+    assert "a" in store.errors
+
+    cambiar(fuente, "v1")
+    os.utime(fuente, ns=(mtime, mtime))
+    assert live_data.dataset_version(fuente) == version
+    store.check()
+    assert store.errors == {}
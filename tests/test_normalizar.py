@@ -0,0 +1,84 @@
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.normalizar import CENTRAL, ENCABEZADO, FECHA, NOTA, SUBTOTAL, VACIA, clasificar, clasificar_columna
+from utils.spreadsheet import iter_rows
+
+DOWNLOADS = Path(__file__).resolve().parent.parent / "downloads"
+
+# Reglas anteriores a PATRON_CLASES: es_basura() de normalizar y la lista de consolidar
+PATTERN_BASURA = r"TOTAL|TOTALES|Nota|Tipo de cambio|nan|CARGOS POR INYECCIONES|TOTAL\s*-\s*AGUAI"
+AGENTES_A_ELIMINAR = [
+    "TOTAL - CESSA", "TOTAL - CRE R.L.", "TOTAL CRE", "TOTAL - DELAPAZ",
+    "TOTAL - ELFEC", "TOTAL - ENDE", "TOTAL ENDE DELBENI S.A.M.",
+    "TOTAL - ENDE DEORURO S.A.", "TOTALES", "Tipo de cambio",
+    "TOTAL - SEPSA", "TOTAL - SETAR",
+]
+
+
+def es_basura(valor):
+    x = "nan" if valor == "" else str(valor).strip()
+    return x == "" or bool(
+        re.search(PATTERN_BASURA, x, re.IGNORECASE)
+        or re.match(r"^\d{4}-\d{2}-\d{2}", x)
+        or re.search(r"CENTRAL\s*ENERGIA|POTENCIA", x.upper())
+    )
+
+
+CASOS = {
+    "Cumbre": CENTRAL,
+    "  Yunchara ": CENTRAL,
+    "Aguai (Autoproductor)": CENTRAL,
+    "TOTAL - ENDE": SUBTOTAL,
+    "TOTALES": SUBTOTAL,
+    "Total - Aguai": SUBTOTAL,
+    "Nota: valores provisorios": NOTA,
+    "Tipo de cambio": NOTA,
+    "CARGOS POR INYECCIONES": NOTA,
+    "CENTRAL ENERGIA": ENCABEZADO,
+    "central  energia": ENCABEZADO,
+    "POTENCIA": ENCABEZADO,
+    "2025-01-01 00:00:00": FECHA,
+    "nan": VACIA,
+    "": VACIA,
+    "   ": VACIA,
+}
+
+
+@pytest.mark.parametrize("valor, clase", CASOS.items())
+def test_clasificar(valor, clase):
+    assert clasificar(valor) == clase
+
+
+def test_columna_igual_que_por_celda():
+    valores = pd.Series(list(CASOS) + [np.nan, None], dtype=object)
+    esperado = [clasificar(v) for v in list(CASOS)] + [VACIA, VACIA]
+    assert clasificar_columna(valores).tolist() == esperado
+
+
+def columna_de_centrales():
+    valores = set(CASOS) | set(AGENTES_A_ELIMINAR)
+    for path in sorted(DOWNLOADS.glob("*.xlsx")):
+        valores.update(fila[0] for fila in iter_rows(path, columns=[0]))
+    return sorted(valores, key=str)
+
+
+def test_misma_basura_que_las_reglas_anteriores():
+    valores = columna_de_centrales()
+    assert len(valores) > len(CASOS) + len(AGENTES_A_ELIMINAR)
+    distintos = [v for v in valores if (clasificar(v) != CENTRAL) != es_basura(v)]
+    assert distintos == []
+
+
+def test_subtotales_de_consolidar_no_son_centrales():
+    clases = clasificar_columna(pd.Series(AGENTES_A_ELIMINAR))
+    assert (clases != CENTRAL).all()
+
+
+def test_columna_sobre_los_archivos_descargados():
+    valores = pd.Series(columna_de_centrales(), dtype=object)
+    assert clasificar_columna(valores).tolist() == [clasificar(v) for v in valores]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from pipeline.pronostico import HORIZONTE, TEMPORADA, estacional, evaluar, suavizado, tabla_medida, tendencia
+
+
+def columnas(*series):
+    return np.array(series, dtype="float64").T
+
+
+def largo(series):
+    """Filas FECHA, central_id, VALOR desde {central_id: valores mensuales desde 2020-01}."""
+    partes = [
+        pd.DataFrame({
+            "FECHA": pd.date_range("2020-01-01", periods=len(valores), freq="MS"),
+            "central_id": central,
+            "VALOR": valores,
+        })
+        for central, valores in series.items()
+    ]
+    return pd.concat(partes, ignore_index=True)
+
+
+def elegidos(tabla):
+    return tabla[tabla["elegido"]].groupby("central_id")["modelo"].unique().map(list).to_dict()
+
+
+def test_estacional_repite_el_ultimo_anio_si_el_horizonte_lo_supera():
+    y = columnas(np.arange(1, 25))
+    p = estacional(y, horizonte=15)[:, 0]
+    assert p.tolist() == [*range(13, 25), 13, 14, 15]
+    assert np.isnan(estacional(y[:TEMPORADA - 1], horizonte=3)).all()
+
+
+def test_suavizado_constante_y_con_huecos():
+    y = columnas([5.0, 5.0, np.nan, 5.0], [np.nan, 2.0, 4.0, np.nan])
+    p = suavizado(y, horizonte=2)
+    assert p.shape == (2, 2)
+    assert p[:, 0].tolist() == [5.0, 5.0]
+    assert 2.0 < p[0, 1] < 4.0
+
+
+def test_tendencia_sigue_la_recta_sin_los_meses_vacios():
+    y = columnas([1.0, 2.0, np.nan, 4.0, 5.0], [np.nan, np.nan, np.nan, 3.0, np.nan])
+    p = tendencia(y, horizonte=3)
+    np.testing.assert_allclose(p[:, 0], [6.0, 7.0, 8.0])
+    # Con un solo mes no hay recta
+    assert np.isnan(p[:, 1]).all()
+
+
+def test_evaluar_sin_meses_suficientes_da_nan():
+    y = columnas(np.arange(1.0, 9.0))
+    errores = evaluar(y, horizonte=HORIZONTE)
+    assert all(np.isnan(e).all() for e in errores.values())
+
+
+def test_empate_o_sin_evaluacion_elige_el_primer_modelo():
+    # 1: constante, todos los modelos aciertan; 2: 8 meses, ninguno se puede evaluar
+    tabla = tabla_medida(largo({1: [7.0] * 30, 2: np.arange(1.0, 9.0)}), "sum")
+
+    assert elegidos(tabla) == {1: ["suavizado"], 2: ["suavizado"]}
+    errores = tabla[tabla["central_id"] == 1].groupby("modelo")["mae"].first()
+    assert (errores == 0).all()
+    assert tabla.loc[tabla["central_id"] == 2, "mae"].isna().all()
+
+
+def test_modelo_sin_evaluacion_no_gana_a_uno_evaluado():
+    # 16 meses: sin el horizonte quedan 10, pocos para el estacional (NaN); la recta acierta
+    tabla = tabla_medida(largo({1: np.arange(1.0, 17.0)}), "sum")
+
+    assert elegidos(tabla) == {1: ["tendencia"]}
+    mae = tabla.groupby("modelo")["mae"].first()
+    assert np.isnan(mae["estacional"]) and mae["tendencia"] < mae["suavizado"]
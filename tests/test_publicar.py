@@ -0,0 +1,110 @@
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from pipeline import publicar as modulo  # noqa: E402
+from pipeline.publicar import MANIFEST, PARQUET_FOLDER, HubLocal, escribir_shards, publicar_cambios  # noqa: E402
+from utils.spreadsheet import write_sheet  # noqa: E402
+
+
+def serie(**columnas):
+    return pd.DataFrame({
+        "CENTRAL": ["Cumbre", "Yunchara"],
+        "GENERADOR": ["ENDE", "RIO ELECTRICO S.A. "],
+        "TECNOLOGIA": ["Hidro", "Solar"],
+        "central_id": [1, 2],
+        "generador_id": [1, 2],
+        "tecnologia_id": [1, 2],
+        **columnas,
+    })
+
+
+class HubRegistrado(HubLocal):
+    """HubLocal que anota las rutas de cada subida."""
+
+    def __init__(self, carpeta):
+        super().__init__(carpeta)
+        self.subidas = []
+
+    def subir(self, archivos, mensaje, workers=1):
+        self.subidas.append(sorted(archivos))
+        super().subir(archivos, mensaje, workers)
+
+
+@pytest.fixture
+def publicacion(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "MANIFEST_CACHE", tmp_path / "estado" / "hf_manifest.json")
+    data = tmp_path / "data"
+    data.mkdir()
+    write_sheet(serie(**{"Energía kWh 122024": [1.0, 2.0], "Energía kWh 012025": [3.0, 4.0]}),
+                data / "serie_energia.xlsx")
+    write_sheet(serie(**{"Potencia kW 122024": [5.0, 6.0], "Potencia kW 012025": [7.0, 8.0]}),
+                data / "serie_potencia.xlsx")
+    return data, HubRegistrado(tmp_path / "hub")
+
+
+def shards(data, nombre="serie_energia"):
+    return sorted(p.name for p in (data / PARQUET_FOLDER / nombre).glob("*.parquet"))
+
+
+def test_shards_por_anio_y_sin_reescribir_los_iguales(tmp_path):
+    write_sheet(serie(**{"Energía kWh 122024": [1.0, 2.0], "Energía kWh 012025": [3.0, 4.0]}),
+                tmp_path / "serie_energia.xlsx")
+    assert [p.name for p in escribir_shards(tmp_path)] == ["2024.parquet", "2025.parquet"]
+    assert escribir_shards(tmp_path) == []
+
+    largo = pd.read_parquet(tmp_path / PARQUET_FOLDER / "serie_energia" / "2025.parquet")
+    assert largo["GENERADOR"].tolist() == ["ENDE", "RIO ELECTRICO S.A."]
+    assert str(largo["generador_id"].dtype) == "Int32"
+
+
+def test_shards_de_anios_que_ya_no_estan_se_borran(tmp_path):
+    write_sheet(serie(**{"Energía kWh 122024": [1.0, 2.0], "Energía kWh 012025": [3.0, 4.0]}),
+                tmp_path / "serie_energia.xlsx")
+    escribir_shards(tmp_path)
+
+    write_sheet(serie(**{"Energía kWh 012025": [3.0, 4.0]}), tmp_path / "serie_energia.xlsx")
+    assert escribir_shards(tmp_path) == []
+    assert shards(tmp_path) == ["2025.parquet"]
+
+
+def test_simular_no_escribe_nada(tmp_path):
+    data, hub = tmp_path / "data", tmp_path / "hub"
+    data.mkdir()
+    write_sheet(serie(**{"Energía kWh 012025": [3.0, 4.0]}), data / "serie_energia.xlsx")
+
+    assert publicar_cambios(HubLocal(hub), data, simular=True) == ["serie_energia.xlsx"]
+    assert not (data / PARQUET_FOLDER).exists()
+    assert not hub.exists()
+
+
+def test_publicar_sube_solo_lo_que_cambio(publicacion):
+    data, hub = publicacion
+    primera = publicar_cambios(hub, data)
+    assert len(primera) == 6
+    assert json.loads(hub.leer(MANIFEST)).keys() == set(primera)
+
+    # Sin cambios no hay subida
+    assert publicar_cambios(hub, data) == []
+    assert len(hub.subidas) == 1
+
+    # Un mes nuevo de una serie: su .xlsx, el shard de ese año y el manifiesto
+    write_sheet(serie(**{"Energía kWh 122024": [1.0, 2.0], "Energía kWh 012025": [3.0, 4.0],
+                         "Energía kWh 022025": [5.0, 6.0]}), data / "serie_energia.xlsx")
+    assert publicar_cambios(hub, data) == ["parquet/serie_energia/2025.parquet", "serie_energia.xlsx"]
+    assert hub.subidas[-1] == [MANIFEST, "parquet/serie_energia/2025.parquet", "serie_energia.xlsx"]
+    assert (hub.carpeta / "serie_energia.xlsx").read_bytes() == (data / "serie_energia.xlsx").read_bytes()
+
+
+def test_simular_no_sube_nada(publicacion):
+    data, hub = publicacion
+    publicar_cambios(hub, data)
+    write_sheet(serie(**{"Energía kWh 012025": [9.0, 9.0]}), data / "serie_energia.xlsx")
+    manifiesto = hub.leer(MANIFEST)
+
+    assert "serie_energia.xlsx" in publicar_cambios(hub, data, simular=True)
+    assert len(hub.subidas) == 1
+    assert hub.leer(MANIFEST) == manifiesto
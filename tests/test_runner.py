@@ -0,0 +1,110 @@
+import pytest
+
+from pipeline import runner
+from pipeline.runner import AL_DIA, FALLIDA, HECHA, OMITIDA, NoDisponible, Registro, Tarea, ejecutar
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    # Las firmas se guardan relativas a BASE_DIR
+    monkeypatch.setattr(runner, "BASE_DIR", tmp_path)
+    return tmp_path
+
+
+def escribir(path, texto):
+    path.write_text(texto)
+    return path
+
+
+def tarea_copia(nombre, origen, destino, llamadas, deps=()):
+    def accion():
+        llamadas.append(nombre)
+        destino.write_text(origen.read_text())
+    return Tarea(nombre, accion, inputs=[origen], outputs=[destino], deps=list(deps))
+
+
+def test_firma_rehace_solo_si_cambia_una_entrada(base):
+    origen = escribir(base / "a.txt", "uno")
+    llamadas = []
+    tareas = {"copiar": tarea_copia("copiar", origen, base / "b.txt", llamadas)}
+    registro = Registro(base / "estado.json")
+
+    assert ejecutar(tareas, registro=registro) == {"copiar": HECHA}
+    assert ejecutar(tareas, registro=registro) == {"copiar": AL_DIA}
+    assert llamadas == ["copiar"]
+
+    escribir(origen, "dos")
+    assert ejecutar(tareas, registro=registro) == {"copiar": HECHA}
+    assert (base / "b.txt").read_text() == "dos"
+
+
+def test_registro_persiste_entre_corridas(base):
+    origen = escribir(base / "a.txt", "uno")
+    llamadas = []
+    tareas = {"copiar": tarea_copia("copiar", origen, base / "b.txt", llamadas)}
+    ejecutar(tareas, registro=Registro(base / "estado.json"))
+
+    assert ejecutar(tareas, registro=Registro(base / "estado.json")) == {"copiar": AL_DIA}
+    assert llamadas == ["copiar"]
+
+
+def test_salida_faltante_rehace_la_tarea(base):
+    origen = escribir(base / "a.txt", "uno")
+    llamadas = []
+    tareas = {"copiar": tarea_copia("copiar", origen, base / "b.txt", llamadas)}
+    registro = Registro(base / "estado.json")
+    ejecutar(tareas, registro=registro)
+
+    (base / "b.txt").unlink()
+    assert ejecutar(tareas, registro=registro) == {"copiar": HECHA}
+    assert llamadas == ["copiar", "copiar"]
+
+
+def test_salidas_existentes_sin_registro_se_adoptan(base):
+    origen = escribir(base / "a.txt", "uno")
+    escribir(base / "b.txt", "uno")
+    llamadas = []
+    tareas = {"copiar": tarea_copia("copiar", origen, base / "b.txt", llamadas)}
+
+    assert ejecutar(tareas, registro=Registro(base / "estado.json")) == {"copiar": AL_DIA}
+    assert llamadas == []
+
+
+def test_fallida_bloquea_a_sus_dependientes(base):
+    llamadas = []
+
+    def falla():
+        raise ValueError("archivo corrupto")
+
+    tareas = {
+        "mes": Tarea("mes", falla, outputs=[base / "mes.txt"]),
+        "serie": Tarea("serie", lambda: llamadas.append("serie"), outputs=[base / "serie.txt"], deps=["mes"]),
+        "parcial": Tarea("parcial", lambda: llamadas.append("parcial"), outputs=[base / "p.txt"],
+                         deps=["serie"], parcial=True),
+    }
+    estados = ejecutar(tareas, registro=Registro(base / "estado.json"))
+
+    assert estados == {"mes": FALLIDA, "serie": FALLIDA, "parcial": FALLIDA}
+    assert llamadas == []
+
+
+def test_omitida_solo_bloquea_tareas_no_parciales(base):
+    llamadas = []
+
+    def no_publicado():
+        raise NoDisponible("el CNDC no publicó el mes")
+
+    tareas = {
+        "mes": Tarea("mes", no_publicado, outputs=[base / "mes.txt"]),
+        "estricta": Tarea("estricta", lambda: llamadas.append("estricta"), outputs=[base / "e.txt"], deps=["mes"]),
+        "parcial": Tarea("parcial", lambda: llamadas.append("parcial"), outputs=[base / "p.txt"],
+                         deps=["mes"], parcial=True),
+    }
+    estados = ejecutar(tareas, registro=Registro(base / "estado.json"))
+
+    assert estados == {"mes": OMITIDA, "estricta": OMITIDA, "parcial": HECHA}
+    assert llamadas == ["parcial"]
+
+
+def test_periodos_entre_cruza_el_anio():
+    assert runner.periodos_entre("1124", "0225") == ["1124", "1224", "0125", "0225"]
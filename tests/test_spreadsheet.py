@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import spreadsheet
+from utils.spreadsheet import engine_for, iter_rows, read_sheet, rows_to_frame, write_sheet
+
+
+def con_motores(monkeypatch, *motores):
+    monkeypatch.setattr(spreadsheet, "FORCED_ENGINE", None)
+    monkeypatch.setattr(spreadsheet, "installed", lambda engine: engine in motores)
+
+
+@pytest.mark.parametrize("motores, xlsx, xls", [
+    (("calamine", "openpyxl", "xlrd"), "calamine", "calamine"),
+    (("openpyxl", "xlrd"), "openpyxl", "xlrd"),
+    (("openpyxl",), "openpyxl", None),
+    ((), None, None),
+])
+def test_motor_por_formato(monkeypatch, motores, xlsx, xls):
+    con_motores(monkeypatch, *motores)
+    assert engine_for("a/b.XLSX") == xlsx
+    assert engine_for("a/b.xls") == xls
+
+
+def test_motor_forzado_y_fuentes_sin_extension(monkeypatch):
+    con_motores(monkeypatch, "openpyxl")
+    assert engine_for(b"bytes") == "openpyxl"
+    monkeypatch.setattr(spreadsheet, "FORCED_ENGINE", "xlrd")
+    assert engine_for("a/b.xlsx") == "xlrd"
+
+
+def ejemplo():
+    return pd.DataFrame({
+        "CENTRAL": ["Cumbre", "Yunchara", None],
+        "FECHA": pd.to_datetime(["2025-01-01", "2025-02-01", "2025-03-01"]),
+        "Energía kWh": [1.5, np.nan, 3.0],
+        "n": [1, 2, 3],
+    })
+
+
+@pytest.fixture(params=["xlsxwriter", "openpyxl"])
+def libro(request, tmp_path):
+    if request.param == "xlsxwriter":
+        pytest.importorskip("xlsxwriter")
+    path = tmp_path / "libro.xlsx"
+    write_sheet(ejemplo(), path, engine=request.param)
+    return path
+
+
+def test_escritura_y_lectura(libro):
+    leido = read_sheet(libro, engine="openpyxl")
+    pd.testing.assert_frame_equal(leido, ejemplo(), check_dtype=False)
+
+
+def test_calamine_lee_lo_mismo_que_openpyxl(libro):
+    pytest.importorskip("python_calamine")
+    pd.testing.assert_frame_equal(read_sheet(libro, engine="calamine"), read_sheet(libro, engine="openpyxl"))
+
+
+def test_columnas_y_filas_limitadas(libro):
+    leido = read_sheet(libro, usecols=[0, 2], nrows=2)
+    assert list(leido.columns) == ["CENTRAL", "Energía kWh"]
+    assert len(leido) == 2
+
+
+@pytest.mark.parametrize("calamine", [True, False])
+def test_iter_rows_con_y_sin_calamine(libro, monkeypatch, calamine):
+    if calamine:
+        pytest.importorskip("python_calamine")
+    else:
+        con_motores(monkeypatch, "openpyxl")
+    filas = list(iter_rows(libro, columns=[0, 2]))
+
+    assert filas[0] == ["CENTRAL", "Energía kWh"]
+    assert filas[2] == ["Yunchara", ""]
+    df = rows_to_frame(filas[0], filas[1:])
+    pd.testing.assert_frame_equal(df, read_sheet(libro, usecols=[0, 2]), check_dtype=False)
+
+
+def test_motor_de_escritura_desconocido(tmp_path):
+    with pytest.raises(ValueError):
+        write_sheet(ejemplo(), tmp_path / "x.xlsx", engine="xlwt")
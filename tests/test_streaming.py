@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from pipeline import runner
+from pipeline.runner import FALLIDA, HECHA, Registro, Tarea, ejecutar
+from pipeline.streaming import Etapa, ejecutar_streaming
+
+PERIODOS = ["0125", "0225", "0325"]
+DATASETS = ("energia", "precios")
+
+
+@pytest.fixture
+def acciones(monkeypatch):
+    """Reemplaza las acciones del runner; 0225 falla al descargarse."""
+    llamadas = []
+    lock = threading.Lock()
+
+    def registrar(nombre):
+        with lock:
+            llamadas.append(nombre)
+
+    def descargar(periodo):
+        if periodo == "0225":
+            raise ConnectionError("CNDC caído")
+        registrar(f"descargar:{periodo}")
+
+    monkeypatch.setattr(runner, "descargar", descargar)
+    monkeypatch.setattr(runner, "convertir", lambda p: registrar(f"convertir:{p}"))
+    monkeypatch.setattr(runner, "extraer", lambda ds, p: registrar(f"extraer:{ds}:{p}"))
+    monkeypatch.setattr(runner, "normalizar", lambda ds, p: registrar(f"normalizar:{ds}:{p}"))
+    monkeypatch.setattr(runner, "consolidar", lambda ds: registrar(f"consolidar:{ds}"))
+    for nombre in ("monomico", "estrella", "tendencias", "pronostico", "anomalias"):
+        monkeypatch.setattr(runner, nombre, lambda nombre=nombre: registrar(nombre))
+    return llamadas
+
+
+def test_mes_fallido_bloquea_la_consolidacion(acciones, tmp_path):
+    estados = ejecutar_streaming(PERIODOS, DATASETS, forzar=True, registro=Registro(tmp_path / "estado.json"))
+
+    assert estados["descargar:0225"] == FALLIDA
+    assert estados["normalizar:energia:0225"] == FALLIDA
+    assert estados["normalizar:energia:0125"] == HECHA
+    for ds in DATASETS:
+        assert estados[f"consolidar:{ds}"] == FALLIDA
+        assert f"consolidar:{ds}" not in acciones
+    assert estados["estrella"] == FALLIDA
+    assert "estrella" not in acciones
+
+
+def test_sin_fallas_consolida(acciones, tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "descargar", lambda p: acciones.append(f"descargar:{p}"))
+    estados = ejecutar_streaming(PERIODOS, DATASETS, forzar=True, registro=Registro(tmp_path / "estado.json"))
+
+    assert FALLIDA not in estados.values()
+    assert {f"consolidar:{ds}" for ds in DATASETS} <= set(acciones)
+
+
+def test_ejecutar_recibe_estados_previos(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "BASE_DIR", tmp_path)
+    llamadas = []
+    tareas = {"serie": Tarea("serie", lambda: llamadas.append("serie"), outputs=[tmp_path / "s.txt"], deps=["mes"])}
+
+    estados = ejecutar(tareas, registro=Registro(tmp_path / "estado.json"), estados={"mes": FALLIDA})
+
+    assert estados == {"mes": FALLIDA, "serie": FALLIDA}
+    assert llamadas == []
+
+
+def test_cola_acotada_aplica_contrapresion():
+    """Con la etapa siguiente detenida, la anterior no procesa más meses que los que caben."""
+    liberar = threading.Event()
+    procesados = []
+
+    class Contexto:
+        def procesar(self, tarea):
+            tarea.accion()
+
+    def tareas_de_mes(periodo):
+        return [Tarea(periodo, lambda: procesados.append(periodo))]
+
+    def bloqueada(periodo):
+        return [Tarea(periodo, liberar.wait)]
+
+    primera = Etapa("primera", tareas_de_mes, 1, 1, Contexto())
+    segunda = Etapa("segunda", bloqueada, 1, 1, Contexto())
+    primera.salida = segunda.entrada
+    primera.iniciar()
+    segunda.iniciar()
+
+    productor = threading.Thread(target=lambda: [primera.entrada.put(p) for p in map(str, range(10))], daemon=True)
+    productor.start()
+    productor.join(timeout=0.5)
+    # segunda retiene 1 mes, su cola 1 más y primera queda bloqueada con 1 en mano
+    assert len(procesados) <= 3
+    assert productor.is_alive()
+
+    liberar.set()
+    productor.join(timeout=5)
+    primera.cerrar()
+    segunda.cerrar()
+    assert procesados == [str(i) for i in range(10)]
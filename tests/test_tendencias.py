@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from pipeline.tendencias import estadisticas, matrices
+
+
+def largo(valores, generadores=(1,), tecnologia=None):
+    """Filas FECHA, VALOR y ids desde {fecha: valor} por generador; sin tecnologías si no se dan."""
+    filas = [
+        {"FECHA": pd.Timestamp(fecha), "VALOR": valor, "generador_id": g,
+         "tecnologia_id": None if tecnologia is None else tecnologia[g]}
+        for g in generadores for fecha, valor in valores[g].items()
+    ]
+    df = pd.DataFrame(filas)
+    return df.astype({"generador_id": "Int32", "tecnologia_id": "Int32"})
+
+
+def mensual(desde, valores):
+    return pd.Series(valores, index=pd.date_range(desde, periods=len(valores), freq="MS"), dtype="float64")
+
+
+def test_matrices_rellenan_con_cero_solo_los_meses_con_datos():
+    valores = {
+        1: {"2024-01-01": 1.0, "2024-02-01": 2.0, "2024-04-01": 4.0},
+        2: {"2024-01-01": 10.0},
+    }
+    por_nivel = matrices(largo(valores, generadores=(1, 2), tecnologia={1: 7, 2: 7}))
+
+    assert set(por_nivel) == {"sistema", "generador", "tecnologia"}
+    generador = por_nivel["generador"]
+    assert generador.index.tolist() == list(pd.date_range("2024-01-01", "2024-04-01", freq="MS"))
+    # Marzo no tiene datos de nadie: NaN; el generador 2 no aparece en febrero: 0
+    assert generador[1].tolist()[:2] == [1.0, 2.0] and np.isnan(generador.iloc[2]).all()
+    assert generador[2].iloc[[0, 1, 3]].tolist() == [10.0, 0.0, 0.0]
+    assert por_nivel["sistema"][0].iloc[[0, 1, 3]].tolist() == [11.0, 2.0, 4.0]
+    assert por_nivel["tecnologia"][7].iloc[[0, 1, 3]].tolist() == [11.0, 2.0, 4.0]
+
+
+def test_matrices_sin_tecnologias_omite_el_nivel():
+    por_nivel = matrices(largo({1: {"2024-01-01": 1.0}}))
+    assert set(por_nivel) == {"sistema", "generador"}
+
+
+def test_sumas_moviles_necesitan_la_ventana_completa():
+    matriz = mensual("2024-01-01", [1.0, 2.0, 3.0, np.nan, 5.0, 6.0, 7.0]).to_frame(1)
+    resultado = estadisticas(matriz, matriz[1])
+
+    suma = resultado["suma_3"][1]
+    assert suma.iloc[:2].isna().all()
+    assert suma.iloc[2] == 6.0
+    # Cualquier ventana que incluya el mes sin datos queda sin valor
+    assert suma.iloc[3:6].isna().all()
+    assert suma.iloc[6] == 18.0
+    assert resultado["media_3"][1].iloc[6] == 6.0
+    assert resultado["suma_12"][1].isna().all()
+    assert resultado["participacion"][1].dropna().eq(100.0).all()
+
+
+def test_interanual_compara_con_el_mismo_mes_aunque_falte_un_mes():
+    # 2023-03 no tiene datos: el índice sigue siendo mensual y sin huecos
+    valores = [10.0, 20.0, np.nan] + [1.0] * 9 + [15.0, 10.0, 5.0, 0.0]
+    matriz = mensual("2023-01-01", valores).to_frame(1)
+    matriz.loc["2023-04-01", 1] = 0.0
+    resultado = estadisticas(matriz, matriz[1])
+
+    interanual = resultado["interanual"][1]
+    pct = resultado["interanual_pct"][1]
+    assert interanual.iloc[:12].isna().all()
+    assert interanual.loc["2024-01-01"] == 5.0 and pct.loc["2024-01-01"] == 50.0
+    assert interanual.loc["2024-02-01"] == -10.0 and pct.loc["2024-02-01"] == -50.0
+    # Contra un mes sin datos no hay variación; contra un mes en cero no hay porcentaje
+    assert np.isnan(interanual.loc["2024-03-01"]) and np.isnan(pct.loc["2024-03-01"])
+    assert interanual.loc["2024-04-01"] == 0.0 and np.isnan(pct.loc["2024-04-01"])
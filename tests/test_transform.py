@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.live_data import LoadError
+from utils.transform import melt_measure, names_by_id, parse_periods
+
+
+def test_periodos_con_y_sin_cero_inicial():
+    fechas = parse_periods(pd.Series(["012024", "12024", " 122023 ", None, "132024", "x"]))
+    assert fechas.iloc[:3].tolist() == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-01"),
+                                        pd.Timestamp("2023-12-01")]
+    assert fechas.iloc[3:].isna().all()
+
+
+def test_periodos_conserva_el_indice():
+    periodos = pd.Series(["022025", "022025", "12025"], index=[7, 3, 5])
+    fechas = parse_periods(periodos)
+    assert fechas.index.tolist() == [7, 3, 5]
+    assert fechas.dt.month.tolist() == [2, 2, 1]
+
+
+def test_melt_una_medida():
+    df = pd.DataFrame({
+        "CENTRAL": ["Cumbre", "Yunchara"],
+        "TECNOLOGIA": ["Hidro", "Solar"],
+        "Energía kWh 12025": ["1,000", None],
+        "Energía kWh 022025": [2.0, 3.0],
+        "Potencia kW 012025": [9.0, 9.0],
+    })
+
+    largo = melt_measure(df, "Energía kWh")
+
+    assert largo.columns.tolist() == ["FECHA", "CENTRAL", "TECNOLOGIA", "Energía kWh", "Periodo"]
+    assert largo["Energía kWh"].tolist() == [1000.0, 2.0, 3.0]
+    assert largo["FECHA"].dt.month.tolist() == [1, 2, 2]
+    assert len(melt_measure(df, "Energía kWh", dropna=False)) == 4
+    assert melt_measure(df, "Peaje").empty
+
+
+def test_nombres_por_id():
+    df = pd.DataFrame({"central_id": pd.array([2, 1, 2, None], dtype="Int32"),
+                       "CENTRAL": ["Yunchara", "Cumbre", "Yunchara ", "Sin id"]})
+    nombres = names_by_id(df, "central_id", "CENTRAL")
+    assert nombres.to_dict() == {2: "Yunchara", 1: "Cumbre"}
+    assert nombres.get(np.int32(1)) == "Cumbre"
+
+
+def test_melt_rechaza_columnas_con_el_mismo_periodo():
+    df = pd.DataFrame({
+        "CENTRAL": ["Cumbre"],
+        "TECNOLOGIA": ["Hidro"],
+        "Energía kWh 012024": [1.0],
+        "Energía kWh 012024 ": [1.0],
+        "Energía kWh 022024": [2.0],
+    })
+    with pytest.raises(LoadError, match="mismo periodo"):
+        melt_measure(df, "Energía kWh")
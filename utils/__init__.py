@@ -0,0 +1 @@
+"""Utilidades compartidas entre el pipeline y las páginas del dashboard."""
@@ -0,0 +1,71 @@
+"""Puntos marcados como anómalos (pipeline.anomalias) sobre los gráficos de las páginas.
+
+Leen data/estrella/anomalias.parquet: cada rerun sólo filtra la tabla de
+marcas, sin recalcular ventanas. Si la tabla no está, los gráficos se dibujan
+sin marcas.
+
+    flags = central_anomalies('Energía kWh', selected_central_id, selected_range)
+    fig = cached_figure(DATASET, (PAGE, 'central', selected_central_id, selected_range, anomalies_version()),
+                        lambda: mark_anomalies(plot_central(df_central), flags, 'Energía kWh'))
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from utils.figure_cache import pinned_version
+from utils.live_data import live_dataset
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+ANOMALIES_FILE = DATA_DIR / "estrella" / "anomalias.parquet"
+
+# Clave en utils.live_data
+ANOMALIES_KEY = "anomalias"
+
+REASONS = {
+    "z": "lejos de la mediana de los meses previos",
+    "salto": "salto respecto del mes anterior",
+    "z+salto": "salto y lejos de la mediana de los meses previos",
+}
+
+
+def _load_anomalies():
+    if not ANOMALIES_FILE.exists():
+        return None
+    try:
+        return pd.read_parquet(ANOMALIES_FILE)
+    except ImportError:
+        return None
+
+
+def load_anomalies():
+    """Tabla de marcas de la generación actual (None si no está)."""
+    return live_dataset(ANOMALIES_KEY, ANOMALIES_KEY, _load_anomalies, source=ANOMALIES_FILE)
+
+
+def anomalies_version():
+    """Versión de la tabla de marcas del rerun en curso, para las claves de figuras."""
+    return pinned_version(ANOMALIES_KEY)
+
+
+def central_anomalies(measure, central_id, fechas=None):
+    """FECHA, valor, z, salto y motivo de los puntos marcados de la central (None sin tabla)."""
+    flags = load_anomalies()
+    if flags is None:
+        return None
+    mask = (flags["MEDIDA"] == measure) & (flags["central_id"] == central_id)
+    if fechas is not None:
+        mask &= flags["FECHA"].between(pd.Timestamp(fechas[0]), pd.Timestamp(fechas[1]))
+    return flags.loc[mask, ["FECHA", "valor", "z", "salto", "motivo"]].reset_index(drop=True)
+
+
+def mark_anomalies(fig, flags, measure):
+    """Agrega a fig una traza con los puntos marcados y su motivo."""
+    if fig is None or flags is None or flags.empty:
+        return fig
+    fig.add_scatter(
+        x=flags["FECHA"], y=flags["valor"], mode="markers", name="Anomalía",
+        marker=dict(size=14, color="rgba(0,0,0,0)", line=dict(color="#d62728", width=3)),
+        customdata=flags["motivo"].map(REASONS).fillna(flags["motivo"]),
+        hovertemplate=f"%{{x|%Y-%m}}<br>{measure}: %{{y:,.2f}}<br>%{{customdata}}<extra>Anomalía</extra>",
+    )
+    return fig
@@ -0,0 +1,138 @@
+"""Datos de las páginas como archivos Arrow IPC mapeados en memoria.
+
+El DataFrame largo que arma cada página se guarda en data/arrow/<página>.arrow
+con la versión del .xlsx del que salió. Los procesos del dashboard (workers o
+réplicas en la misma máquina) mapean ese archivo en lugar de tener cada uno su
+copia: las columnas numéricas y de fechas son vistas numpy de sólo lectura
+sobre el mapa y las de texto arrays de pyarrow sobre el mismo mapa. Las páginas
+del archivo las comparte el caché del sistema operativo, así cada proceso extra
+casi no suma memoria residual por datos.
+
+Requiere pyarrow; sin él, o con ARROW_CACHE=0, se usa el cargador de la página.
+Las columnas de texto se leen sin copiar con pandas >= 2.3; con versiones
+anteriores se convierten a object (se copian, pero el resultado es el mismo).
+"""
+import functools
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentation import record_error
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+ARROW_DIR = DATA_DIR / "arrow"
+
+# ARROW_CACHE=0 vuelve a una copia pandas por proceso
+ENABLED = os.environ.get("ARROW_CACHE", "1") != "0"
+
+# Clave de los metadatos del esquema con la versión del .xlsx de origen
+VERSION_KEY = b"source_version"
+
+
+def available():
+    if not ENABLED:
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def arrow_path(key):
+    return ARROW_DIR / f"{key}.arrow"
+
+
+def write_frame(df, path, version):
+    """Escribe df como un único lote Arrow IPC sin comprimir (mapeable sin copias)."""
+    import pyarrow as pa
+
+    columnas = []
+    for nombre in df.columns:
+        serie = df[nombre]
+        if serie.dtype.kind == "f":
+            # NaN se guarda como NaN y no como nulo: sin máscara la columna se lee sin copiar
+            columnas.append(pa.array(serie.to_numpy(), from_pandas=False))
+        else:
+            columnas.append(pa.array(serie, from_pandas=True))
+    tabla = pa.Table.from_arrays(columnas, names=[str(c) for c in df.columns]).combine_chunks()
+    tabla = tabla.replace_schema_metadata({VERSION_KEY: str(version).encode()})
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Escritura atómica: otro proceso puede estar mapeando la versión anterior
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as f, pa.ipc.new_file(f, tabla.schema) as writer:
+        writer.write_table(tabla)
+    os.replace(tmp, path)
+
+
+@functools.lru_cache(maxsize=None)
+def _string_dtype():
+    """Texto sobre pyarrow con NaN como faltante; None si pandas no lo tiene (< 2.3)."""
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except (TypeError, ValueError, ImportError):
+        return None
+
+
+def _columna(col):
+    """Columna pandas sobre los buffers de col; copia sólo si Arrow no lo permite."""
+    import pyarrow as pa
+
+    tipo = col.type
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo):
+        dtype = _string_dtype()
+        if dtype is None:
+            return col.to_pandas()
+        return pd.arrays.ArrowStringArray(col, dtype=dtype)
+    primitivo = pa.types.is_integer(tipo) or pa.types.is_floating(tipo) or pa.types.is_timestamp(tipo)
+    if primitivo and col.num_chunks == 1 and col.null_count == 0:
+        return col.chunk(0).to_numpy(zero_copy_only=True)
+    return col.to_pandas()
+
+
+def read_frame(path, version=None):
+    """DataFrame mapeado desde path; None si su versión no es `version`."""
+    import pyarrow as pa
+
+    tabla = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    if version is not None and (tabla.schema.metadata or {}).get(VERSION_KEY) != str(version).encode():
+        return None
+    return pd.DataFrame(
+        {nombre: pd.Series(_columna(tabla.column(nombre)), copy=False) for nombre in tabla.column_names},
+        copy=False,
+    )
+
+
+def load_frame(key, version, loader):
+    """
+    Valor de loader() para la versión dada del .xlsx, mapeado desde data/arrow/.
+
+    El primer proceso que no encuentra el archivo al día llama al cargador y lo
+    escribe; los demás lo mapean. Si el cargador no devuelve un DataFrame
+    (None cuando falta el archivo de origen) el valor se devuelve tal cual.
+    """
+    if version is None or not available():
+        return loader()
+    path = arrow_path(key)
+    if path.exists():
+        try:
+            df = read_frame(path, version)
+        except Exception as e:
+            record_error("arrow_store:mapear", e, key=key)
+            df = None
+        if df is not None:
+            return df
+
+    df = loader()
+    if not isinstance(df, pd.DataFrame):
+        return df
+    try:
+        write_frame(df, path, version)
+        return read_frame(path, version)
+    except Exception as e:
+        record_error("arrow_store:guardar", e, key=key)
+        return df
@@ -0,0 +1,77 @@
+"""Opciones de renderizado para gráficos densos: WebGL, reducción de puntos y etiquetas."""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Modo de renderizado: "auto" decide según la cantidad de puntos, "svg" o "webgl" lo fuerzan
+RENDER_MODE = os.environ.get("CHART_RENDER_MODE", "auto").lower()
+
+# Puntos totales a partir de los cuales un gráfico de líneas pasa a WebGL
+WEBGL_THRESHOLD = int(os.environ.get("CHART_WEBGL_THRESHOLD", 1000))
+
+# Puntos máximos por serie que se envían al navegador
+MAX_POINTS_PER_TRACE = int(os.environ.get("CHART_MAX_POINTS", 500))
+
+# Barras máximas para las que se dibuja el valor sobre cada barra
+MAX_BAR_LABELS = int(os.environ.get("CHART_MAX_BAR_LABELS", 48))
+
+
+def use_webgl(n_points):
+    """Indica si un gráfico con n_points puntos debe dibujarse con Scattergl."""
+    if RENDER_MODE in ("svg", "webgl"):
+        return RENDER_MODE == "webgl"
+    return n_points > WEBGL_THRESHOLD
+
+
+def line_options(n_points, line_shape='spline', markers=True):
+    """
+    Argumentos de px.line según la densidad del gráfico.
+
+    En modo WebGL se desactivan los marcadores y la forma spline, que Scattergl no
+    soporta y que son lo más costoso de dibujar.
+    """
+    if use_webgl(n_points):
+        return dict(render_mode='webgl', line_shape='linear', markers=False)
+    return dict(render_mode='svg', line_shape=line_shape, markers=markers)
+
+
+def bar_text_auto(n_bars):
+    """Muestra el valor de cada barra solo si no hay demasiadas."""
+    return n_bars <= MAX_BAR_LABELS
+
+
+def downsample(df, x, y, by=None, max_points=MAX_POINTS_PER_TRACE):
+    """
+    Reduce cada serie a como mucho max_points puntos conservando el mínimo y el
+    máximo de cada tramo (min/max por bucket), de modo que los picos se mantienen.
+
+    by es la columna que separa las series (una traza por valor). Las series cortas
+    se devuelven sin cambios.
+    """
+    if df.empty or len(df) <= max_points:
+        return df
+
+    keys = [by] if by else []
+    df = df.sort_values(keys + [x]).reset_index(drop=True)
+    if by:
+        grupos = df.groupby(by, sort=False)
+        pos = grupos.cumcount().to_numpy()
+        size = grupos[x].transform('size').to_numpy()
+    else:
+        pos = np.arange(len(df))
+        size = np.full(len(df), len(df))
+
+    if (size <= max_points).all():
+        return df
+
+    n_buckets = max(max_points // 2, 1)
+    bucket = pos * n_buckets // size
+    claves = [df[by].to_numpy(), bucket] if by else [bucket]
+    valores = df[y].groupby(claves)
+    keep = (
+        pd.Index(valores.idxmin().dropna().astype(int))
+        .union(pd.Index(valores.idxmax().dropna().astype(int)))
+        .union(pd.Index(np.flatnonzero(size <= max_points)))
+    )
+    return df.loc[keep]
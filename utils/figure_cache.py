@@ -0,0 +1,141 @@
+"""Caché LRU de figuras Plotly serializadas, compartida entre sesiones y páginas."""
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+
+import plotly.io as pio
+
+from utils.perf_panel import timer
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Versión de cada dataset fijada para el rerun en curso (ver utils.live_data)
+_pinned = ContextVar("figure_cache_pinned", default=None)
+
+
+def dataset_version(path):
+    """Versión de un archivo de datos según su fecha de modificación y tamaño."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def pin_version(dataset, version):
+    """Fija la versión del dataset con la que el rerun en curso calcula sus figuras."""
+    pinned = dict(_pinned.get() or {})
+    pinned[dataset] = version
+    _pinned.set(pinned)
+
+
+def pinned_version(dataset):
+    return (_pinned.get() or {}).get(dataset)
+
+
+class FigureCache:
+    """
+    LRU acotado por tamaño que guarda el JSON de cada figura por clave de selección.
+
+    Las claves incluyen el nombre del dataset; cuando cambia la versión de un
+    dataset se descartan todas sus figuras. Las entradas menos usadas se expulsan
+    hasta que el total de bytes queda por debajo de max_bytes.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, dataset, version, key, builder):
+        """Devuelve la figura guardada para (dataset, key) o la construye con builder()."""
+        entry_key = (dataset, key)
+        with self._lock:
+            if self._versions.get(dataset) != version:
+                self._invalidate(dataset)
+                self._versions[dataset] = version
+            entry = self._entries.get(entry_key)
+            payload = entry[0] if entry is not None else None
+            if entry is not None:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if payload is not None:
+            return pio.from_json(payload)
+
+        fig = builder()
+        if fig is None:
+            return None
+
+        payload = fig.to_json()
+        with self._lock:
+            # No guardar si el dataset cambió mientras se construía la figura
+            if self._versions.get(dataset) == version:
+                self._store(entry_key, payload)
+        return fig
+
+    def invalidate(self, dataset=None):
+        """Descarta las figuras de un dataset, o todas si no se indica ninguno."""
+        with self._lock:
+            if dataset is None:
+                self._entries.clear()
+                self._versions.clear()
+                self._size = 0
+            else:
+                self._invalidate(dataset)
+                self._versions.pop(dataset, None)
+
+    def _invalidate(self, dataset):
+        for entry_key in [k for k in self._entries if k[0] == dataset]:
+            self._size -= self._entries.pop(entry_key)[1]
+
+    def _store(self, entry_key, payload):
+        nbytes = len(payload.encode("utf-8"))
+        if nbytes > self.max_bytes:
+            return
+        if entry_key in self._entries:
+            self._size -= self._entries.pop(entry_key)[1]
+        self._entries[entry_key] = (payload, nbytes)
+        self._size += nbytes
+        while self._size > self.max_bytes:
+            _, (_, old_bytes) = self._entries.popitem(last=False)
+            self._size -= old_bytes
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def cached_figure(dataset, key, builder):
+    """
+    Figura para la selección key del dataset data/<dataset>.xlsx.
+
+    key debe incluir solo los widgets de los que depende la figura, así un cambio
+    en otro widget no obliga a reconstruirla.
+    """
+    version = pinned_version(dataset) or dataset_version(DATA_DIR / f"{dataset}.xlsx")
+    construida = []
+
+    def build():
+        construida.append(True)
+        return builder()
+
+    nombre = key[1] if isinstance(key, tuple) and len(key) > 1 else str(key)
+    with timer(nombre, "figura") as timing:
+        fig = FIGURE_CACHE.get_or_build(dataset, version, key, build)
+        timing.detail = "build" if construida else "hit"
+    return fig
@@ -0,0 +1,105 @@
+"""Pronósticos precalculados por central junto a la historia de las páginas.
+
+Leen data/estrella/pronosticos.parquet (lo escribe pipeline.pronostico): cada
+rerun sólo filtra la tabla, sin ajustar modelos. Si la tabla no está (pipeline
+sin correr o sin pyarrow) la sección avisa y no se dibuja.
+
+    render_central_forecast(PAGE, DATASET, 'Energía kWh', selected_central_id, selected_central, df_central)
+"""
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.figure_cache import cached_figure, pinned_version
+from utils.live_data import live_dataset
+from utils.perf_panel import timer
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+FORECAST_FILE = DATA_DIR / "estrella" / "pronosticos.parquet"
+
+# Clave en utils.live_data y nombre de dataset para la caché de figuras
+FORECAST_KEY = "pronosticos"
+
+MODEL_LABELS = {
+    "suavizado": "Suavizado exponencial",
+    "estacional": "Estacional ingenuo",
+    "tendencia": "Tendencia lineal",
+}
+
+
+def _load_forecasts():
+    if not FORECAST_FILE.exists():
+        return None
+    try:
+        return pd.read_parquet(FORECAST_FILE)
+    except ImportError:
+        return None
+
+
+def load_forecasts():
+    """Tabla de pronósticos de la generación actual (None si no está)."""
+    return live_dataset(FORECAST_KEY, FORECAST_KEY, _load_forecasts, source=FORECAST_FILE)
+
+
+def central_forecast(dataset, measure, central_id):
+    """FECHA, measure, modelo, mae y elegido de los pronósticos de la central."""
+    forecasts = load_forecasts()
+    if forecasts is None:
+        return None
+    mask = (
+        (forecasts["serie"] == dataset) & (forecasts["MEDIDA"] == measure) & (forecasts["central_id"] == central_id)
+    )
+    return (
+        forecasts.loc[mask, ["FECHA", "modelo", "valor", "mae", "elegido"]]
+        .rename(columns={"valor": measure})
+        .reset_index(drop=True)
+    )
+
+
+def plot_forecast(history, forecast, measure, central):
+    """Historia de la central y una traza por modelo; el elegido en trazo continuo."""
+    fig = go.Figure()
+    fig.add_scatter(x=history["FECHA"], y=history[measure], name="Histórico", mode="lines+markers",
+                    line=dict(color="#1f77b4", width=3))
+    for modelo, df_modelo in forecast.groupby("modelo", sort=False):
+        elegido = bool(df_modelo["elegido"].iloc[0])
+        fig.add_scatter(
+            x=df_modelo["FECHA"], y=df_modelo[measure], mode="lines+markers",
+            name=MODEL_LABELS.get(modelo, modelo) + (" (elegido)" if elegido else ""),
+            line=dict(width=3 if elegido else 1.5, dash="solid" if elegido else "dot"),
+            opacity=1 if elegido else 0.6,
+        )
+    fig.update_layout(
+        title=f"Pronóstico para {central}", yaxis_title=measure, xaxis_title="Fecha",
+        template="plotly_white", legend=dict(orientation="h", y=-0.2),
+    )
+    return fig
+
+
+def render_central_forecast(page, dataset, measure, central_id, central, history):
+    """Gráfico de la historia de la central con sus pronósticos y el error del modelo elegido."""
+    import streamlit as st
+
+    with timer("pronostico de la central", "consulta"):
+        forecast = central_forecast(dataset, measure, central_id)
+    if forecast is None:
+        st.caption("Pronósticos no disponibles: se generan con `python -m pipeline.pronostico`.")
+        return
+    if forecast.empty:
+        st.caption(f"Sin pronóstico para {central}: tiene pocos meses con datos.")
+        return
+    history = history.dropna(subset=[measure])
+    fig = cached_figure(
+        FORECAST_KEY,
+        (page, "pronostico", dataset, measure, central_id, history["FECHA"].min(), history["FECHA"].max(),
+         pinned_version(dataset)),
+        lambda: plot_forecast(history, forecast, measure, central),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    elegido = forecast[forecast["elegido"]]
+    if not elegido.empty and pd.notna(elegido["mae"].iloc[0]):
+        st.caption(
+            f"Modelo elegido: {MODEL_LABELS.get(elegido['modelo'].iloc[0])}, con un error medio de "
+            f"{elegido['mae'].iloc[0]:,.2f} en los últimos {len(elegido)} meses conocidos."
+        )
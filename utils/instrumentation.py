@@ -0,0 +1,278 @@
+"""Métricas por etapa (tiempo, CPU, memoria, bytes y filas) guardadas como líneas JSON.
+
+    with stage("normalizar", dataset="energia") as m:
+        ...
+        count_rows(rows_in=len(df))
+
+    @instrument()
+    def download_file(url): ...
+
+    record_error("live_data:recarga", e, key="energia")   # error en un hilo de fondo
+
+    python -m utils.instrumentation report --top 10
+    python -m utils.instrumentation report --classes --last-runs 1
+"""
+import argparse
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Desactiva el registro con METRICS_ENABLED=0
+ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# Archivo JSON lines donde se agregan las mediciones
+METRICS_FILE = Path(os.environ.get("METRICS_FILE", BASE_DIR / ".pipeline" / "metrics.jsonl"))
+
+# tracemalloc hace más lento el código medido; METRICS_TRACE_MEMORY=0 lo apaga
+TRACE_MEMORY = os.environ.get("METRICS_TRACE_MEMORY", "1") != "0"
+
+# Identificador de la corrida actual (un proceso)
+RUN_ID = f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+_current = contextvars.ContextVar("instrumentation_stage", default=None)
+_write_lock = threading.Lock()
+_tracing_lock = threading.Lock()
+_thread = threading.local()
+
+
+class Measurement:
+    """Contadores de una etapa en curso; count_rows() suma sobre la más interna."""
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+        self.rows_in = 0
+        self.rows_out = 0
+        self.classes = {}
+
+
+def _io_counters():
+    """Bytes leídos/escritos por el proceso (Linux); None si no está disponible."""
+    try:
+        with open("/proc/self/io") as f:
+            valores = dict(line.split(": ") for line in f.read().splitlines())
+        return int(valores["rchar"]), int(valores["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def count_rows(rows_in=0, rows_out=0):
+    """
+    Suma filas de entrada/salida a la etapa en curso (no hace nada fuera de una etapa).
+
+    Al cerrar una etapa anidada sus filas se suman también a la etapa que la contiene.
+    """
+    measurement = _current.get()
+    if measurement is not None:
+        measurement.rows_in += rows_in
+        measurement.rows_out += rows_out
+
+
+def count_classes(counts):
+    """Suma filas por clase ({clase: n}, p. ej. central/subtotal/nota) a la etapa en curso."""
+    measurement = _current.get()
+    if measurement is not None:
+        for name, n in counts.items():
+            if n:
+                measurement.classes[name] = measurement.classes.get(name, 0) + int(n)
+
+
+def completed_stages():
+    """Etapas terminadas en este hilo; si no cambia tras una llamada cacheada, fue un acierto de caché."""
+    return getattr(_thread, "completed", 0)
+
+
+def _write(record):
+    METRICS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock, open(METRICS_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+@contextmanager
+def stage(name, **labels):
+    """
+    Mide el bloque y agrega una línea a METRICS_FILE.
+
+    La memoria se mide sólo en la etapa más externa: tracemalloc es global al
+    proceso, así que en etapas anidadas (o simultáneas en otro hilo) peak_mb queda
+    en null y el pico de la externa incluye lo de los demás hilos. Los bytes de E/S
+    también son del proceso completo e incluyen lo que hagan otros hilos.
+    """
+    if not ENABLED:
+        try:
+            yield Measurement(name, labels)
+        finally:
+            _thread.completed = completed_stages() + 1
+        return
+
+    measurement = Measurement(name, labels)
+    token = _current.set(measurement)
+    with _tracing_lock:
+        owns_tracing = TRACE_MEMORY and not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+    io_start = _io_counters()
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    error = None
+    try:
+        yield measurement
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+        peak = None
+        if owns_tracing:
+            with _tracing_lock:
+                peak = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+        io_end = _io_counters()
+        _current.reset(token)
+        _thread.completed = completed_stages() + 1
+        count_rows(measurement.rows_in, measurement.rows_out)
+        count_classes(measurement.classes)
+        _write({
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "run": RUN_ID,
+            "stage": name,
+            "labels": labels,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_mb": None if peak is None else round(peak, 3),
+            "read_bytes": io_end[0] - io_start[0] if io_start and io_end else None,
+            "write_bytes": io_end[1] - io_start[1] if io_start and io_end else None,
+            "rows_in": measurement.rows_in,
+            "rows_out": measurement.rows_out,
+            "row_classes": measurement.classes or None,
+            "error": error,
+        })
+
+
+def record_error(name, error, **labels):
+    """
+    Registra un error ocurrido fuera de una etapa medida (p. ej. en un hilo de
+    fondo): una línea en METRICS_FILE con el campo error, como una etapa
+    fallida, y el mensaje en stderr.
+    """
+    message = f"{type(error).__name__}: {error}"
+    print(f"[{name}] {message}", file=sys.stderr)
+    if not ENABLED:
+        return
+    _write({
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "run": RUN_ID,
+        "stage": name,
+        "labels": labels,
+        "wall_s": 0.0,
+        "cpu_s": 0.0,
+        "peak_mb": None,
+        "read_bytes": None,
+        "write_bytes": None,
+        "rows_in": 0,
+        "rows_out": 0,
+        "row_classes": None,
+        "error": message,
+    })
+
+
+def instrument(name=None):
+    """Decorador: mide cada llamada como una etapa; si devuelve un DataFrame cuenta sus filas."""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name) as measurement:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame) and not measurement.rows_out:
+                    measurement.rows_out = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+# === REPORTE ===
+
+def load_metrics(path=METRICS_FILE):
+    """Mediciones registradas como DataFrame (una fila por llamada)."""
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
+
+
+def summarize(df):
+    """Resumen por etapa ordenado por tiempo total: los puntos calientes primero."""
+    if df.empty:
+        return df
+    resumen = df.groupby("stage").agg(
+        calls=("wall_s", "size"),
+        runs=("run", "nunique"),
+        total_s=("wall_s", "sum"),
+        mean_s=("wall_s", "mean"),
+        p95_s=("wall_s", lambda s: s.quantile(0.95)),
+        cpu_s=("cpu_s", "sum"),
+        peak_mb=("peak_mb", "max"),
+        read_mb=("read_bytes", lambda s: s.sum() / 1e6),
+        write_mb=("write_bytes", lambda s: s.sum() / 1e6),
+        rows_in=("rows_in", "sum"),
+        rows_out=("rows_out", "sum"),
+        errors=("error", "count"),
+    )
+    resumen["share_%"] = 100 * resumen["total_s"] / resumen["total_s"].sum()
+    return resumen.sort_values("total_s", ascending=False)
+
+
+def summarize_classes(df):
+    """Filas por clase y etapa (suma de row_classes): un cambio de formato de los archivos se ve como una clase nueva o un salto."""
+    if df.empty or "row_classes" not in df.columns:
+        return pd.DataFrame()
+    con_clases = df.dropna(subset=["row_classes"])
+    if con_clases.empty:
+        return pd.DataFrame()
+    clases = pd.DataFrame(con_clases["row_classes"].tolist(), index=con_clases.index).fillna(0).astype(int)
+    return clases.groupby(con_clases["stage"]).sum().sort_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.instrumentation")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="Resumen de etapas por tiempo total")
+    report.add_argument("--file", default=METRICS_FILE, help="Archivo de métricas JSON lines")
+    report.add_argument("--top", type=int, default=15, help="Etapas a mostrar")
+    report.add_argument("--last-runs", type=int, help="Considerar sólo las últimas N corridas")
+    report.add_argument("--classes", action="store_true", help="Filas por clase (central, subtotal, nota...) por etapa")
+    args = parser.parse_args(argv)
+
+    df = load_metrics(args.file)
+    if df.empty:
+        print(f"No hay métricas en {args.file}")
+        return 1
+    if args.last_runs:
+        ultimas = df.groupby("run")["ts"].min().sort_values().index[-args.last_runs:]
+        df = df[df["run"].isin(ultimas)]
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20, "display.float_format", "{:.3f}".format):
+        if args.classes:
+            print(summarize_classes(df).to_string())
+        else:
+            print(summarize(df).head(args.top).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
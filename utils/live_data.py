@@ -0,0 +1,192 @@
+"""Datos de las páginas con recarga en caliente y cambio atómico de generación.
+
+Cada página registra su cargador y el archivo de data/ del que depende. Un hilo
+vigila la versión (fecha de modificación y tamaño) de esos archivos; cuando uno
+cambia y se mantiene estable durante una vuelta, carga la nueva versión en
+segundo plano y reemplaza la generación completa con una sola asignación. Las
+sesiones siguen leyendo la generación anterior mientras tanto: nadie espera la
+recarga ni ve datos a medio actualizar. Sólo la primera carga de cada página
+es síncrona.
+
+Con pyarrow instalado cada valor se mapea desde data/arrow/ (ver
+utils.arrow_store), así varios procesos del servidor comparten los mismos datos.
+
+Los cargadores no muestran nada: si no pueden cargar lanzan LoadError (u otra
+excepción). El error queda registrado en utils.instrumentation y guardado por
+clave, y live_dataset lo muestra en la página cuando se dibuja: sin datos como
+error, y si falló una recarga como aviso, con la generación anterior en uso.
+
+    df = live_dataset(PAGE, DATASET, load_and_transform_data)
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+from utils.arrow_store import load_frame
+from utils.figure_cache import dataset_version, pin_version
+from utils.instrumentation import record_error
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Segundos entre revisiones de data/; 0 desactiva la recarga en caliente
+WATCH_INTERVAL = float(os.environ.get("DATA_WATCH_INTERVAL", 30))
+
+
+class LoadError(Exception):
+    """Un cargador no pudo armar los datos de la página; el mensaje se muestra tal cual."""
+
+
+def _mensaje(error):
+    return str(error) if isinstance(error, LoadError) else f"Error al cargar datos: {error}"
+
+
+class Generation:
+    """Instantánea inmutable: {clave: (versión del archivo, valor)}."""
+
+    def __init__(self, number, entries):
+        self.number = number
+        self.entries = entries
+
+
+class LiveStore:
+    def __init__(self, watch_interval=WATCH_INTERVAL):
+        self.watch_interval = watch_interval
+        self.generation = Generation(0, {})
+        self.reloads = 0
+        # {clave: mensaje} del último error de carga o recarga; se borra al cargar bien
+        self.errors = {}
+        self._sources = {}
+        self._loaders = {}
+        self._pending = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._watcher = None
+        self._listeners = []
+
+    def register(self, key, source, loader):
+        with self._lock:
+            self._sources[key] = Path(source)
+            self._loaders[key] = loader
+            self._key_locks.setdefault(key, threading.Lock())
+            if self._watcher is None and self.watch_interval > 0:
+                self._watcher = threading.Thread(target=self._watch, name="live-data-watcher", daemon=True)
+                self._watcher.start()
+
+    def add_listener(self, listener):
+        """listener(fuentes) se llama en segundo plano con los archivos recargados, antes del cambio."""
+        self._listeners.append(listener)
+
+    def get(self, key):
+        """(versión, valor) de la generación actual; carga en primer plano sólo si falta."""
+        entry = self.generation.entries.get(key)
+        if entry is not None:
+            return entry
+        with self._key_locks[key]:
+            entry = self.generation.entries.get(key)
+            if entry is None:
+                try:
+                    entry = self._load(key)
+                except Exception as e:
+                    self._fallo("live_data:carga", key, e)
+                    return None, None
+                self.errors.pop(key, None)
+                if entry[1] is not None:
+                    self._swap({key: entry})
+        return entry
+
+    def _load(self, key):
+        version = dataset_version(self._sources[key])
+        return version, load_frame(key, version, self._loaders[key])
+
+    def _fallo(self, etapa, key, error):
+        record_error(etapa, error, key=key)
+        self.errors[key] = _mensaje(error)
+
+    def _swap(self, updates):
+        with self._swap_lock:
+            actual = self.generation
+            # Las claves no actualizadas pasan a la nueva generación sin copiarse
+            self.generation = Generation(actual.number + 1, {**actual.entries, **updates})
+
+    def check(self):
+        """
+        Una vuelta del vigilante: recarga las claves cuyo archivo cambió y ya no
+        se está escribiendo (misma versión que en la vuelta anterior).
+        """
+        with self._lock:
+            claves = list(self._sources)
+        vigentes = self.generation.entries
+        listas = []
+        for key in claves:
+            if key not in vigentes:
+                continue
+            version = dataset_version(self._sources[key])
+            if version is None or version == vigentes[key][0]:
+                self._pending.pop(key, None)
+                if version is not None:
+                    # El archivo volvió a la versión en uso: el error de recarga ya no aplica
+                    self.errors.pop(key, None)
+            elif self._pending.get(key) == version:
+                listas.append(key)
+            else:
+                self._pending[key] = version
+
+        updates = {}
+        for key in listas:
+            with self._key_locks[key]:
+                try:
+                    entry = self._load(key)
+                except Exception as e:
+                    # Se sigue sirviendo la generación anterior; se reintenta en la próxima vuelta
+                    self._fallo("live_data:recarga", key, e)
+                    continue
+            if entry[1] is not None:
+                updates[key] = entry
+                self.errors.pop(key, None)
+                self._pending.pop(key, None)
+        if updates:
+            for listener in self._listeners:
+                try:
+                    listener(sorted({self._sources[k] for k in updates}))
+                except Exception as e:
+                    # Los datos nuevos se publican igual: lo derivado se rehace al consultarlo
+                    record_error("live_data:oyente", e, listener=getattr(listener, "__qualname__", repr(listener)))
+            self._swap(updates)
+            self.reloads += 1
+        return list(updates)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                self.check()
+            except Exception as e:
+                record_error("live_data:vigilante", e)
+
+
+STORE = LiveStore()
+
+
+def live_dataset(key, dataset, loader, store=STORE, source=None):
+    """
+    Valor del cargador de la página `key` para data/<dataset>.xlsx (o para el
+    archivo source, si los datos no salen de un .xlsx).
+
+    La versión queda fijada para el resto del rerun, así las figuras cacheadas
+    se asocian a los mismos datos con los que se calcularon. Si la carga o la
+    última recarga falló, el error se muestra en la página: None sin datos.
+    """
+    store.register(key, source or DATA_DIR / f"{dataset}.xlsx", loader)
+    version, value = store.get(key)
+    pin_version(dataset, version)
+    error = store.errors.get(key)
+    if error:
+        import streamlit as st
+
+        if value is None:
+            st.error(error)
+        else:
+            st.warning(f"{error}. Se muestran los datos anteriores.")
+    return value
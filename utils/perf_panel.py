@@ -0,0 +1,123 @@
+"""Panel de rendimiento por rerun en la barra lateral de las páginas.
+
+Se activa con `?perf=1` en la URL o con PERF_PANEL=1 en el entorno del servidor.
+Cada rerun muestra el tiempo de la carga de datos (acierto o fallo de caché),
+del filtrado, de cada groupby y de cada figura (acierto o construcción), más
+la memoria de los objetos cacheados. Desactivado, timer() no mide nada.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+
+from utils.instrumentation import completed_stages
+
+# Activa el panel para todas las sesiones
+ENV_ENABLED = os.environ.get("PERF_PANEL", "0") == "1"
+
+# Parámetro de la URL que lo activa en una sesión
+QUERY_PARAM = "perf"
+
+_rerun = ContextVar("perf_rerun", default=None)
+
+
+class Timing:
+    def __init__(self, kind, label):
+        self.kind = kind
+        self.label = label
+        self.seconds = 0.0
+        self.detail = ""
+
+
+class Rerun:
+    """Mediciones del rerun en curso de una página."""
+
+    def __init__(self, page):
+        self.page = page
+        self.start = time.perf_counter()
+        self.timings = []
+        self.objects = {}
+
+
+def enabled():
+    if ENV_ENABLED:
+        return True
+    import streamlit as st
+
+    return st.query_params.get(QUERY_PARAM, "0").lower() in ("1", "true", "si")
+
+
+def begin_rerun(page):
+    """Inicia las mediciones del rerun; sin panel activo las deja apagadas."""
+    rerun = Rerun(page) if enabled() else None
+    _rerun.set(rerun)
+    return rerun
+
+
+@contextmanager
+def timer(label, kind="calculo"):
+    """Mide el bloque en el rerun en curso; el Timing devuelto admite un detalle."""
+    rerun = _rerun.get()
+    timing = Timing(kind, label)
+    if rerun is None:
+        yield timing
+        return
+    inicio = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.seconds = time.perf_counter() - inicio
+        rerun.timings.append(timing)
+
+
+def timed_load(loader):
+    """Llama al cargador cacheado de la página y registra si fue acierto o fallo de caché."""
+    with timer("load_and_transform_data", "carga") as timing:
+        antes = completed_stages()
+        df = loader()
+        # El cargador está instrumentado: sólo completa una etapa si se ejecutó
+        timing.detail = "hit" if completed_stages() == antes else "miss"
+    track_object("datos cacheados", df)
+    return df
+
+
+def track_object(name, obj):
+    """Registra la memoria de un objeto cacheado (DataFrame) para el panel."""
+    rerun = _rerun.get()
+    if rerun is not None and isinstance(obj, pd.DataFrame):
+        rerun.objects[name] = int(obj.memory_usage(deep=True).sum())
+
+
+def render_panel():
+    """Dibuja el panel en la barra lateral al final de la página."""
+    rerun = _rerun.get()
+    if rerun is None:
+        return
+    import streamlit as st
+
+    from utils.figure_cache import FIGURE_CACHE
+    from utils.live_data import STORE
+
+    total = time.perf_counter() - rerun.start
+    tabla = pd.DataFrame(
+        [(t.kind, t.label, t.seconds * 1000, t.detail) for t in rerun.timings],
+        columns=["tipo", "paso", "ms", "detalle"],
+    )
+    with st.sidebar.expander("⏱️ Rendimiento del rerun", expanded=True):
+        st.caption(f"{rerun.page}: {total * 1000:,.0f} ms en total, "
+                   f"{tabla['ms'].sum():,.0f} ms medidos")
+        if not tabla.empty:
+            st.dataframe(
+                tabla.sort_values("ms", ascending=False).style.format({"ms": "{:,.1f}"}),
+                hide_index=True, use_container_width=True,
+            )
+        for name, nbytes in rerun.objects.items():
+            st.caption(f"{name}: {nbytes / 1e6:,.2f} MB")
+        st.caption(
+            f"Caché de figuras: {len(FIGURE_CACHE)} figuras, {FIGURE_CACHE.size / 1e6:,.2f} MB "
+            f"de {FIGURE_CACHE.max_bytes / 1e6:,.0f} MB ({FIGURE_CACHE.hits} aciertos, "
+            f"{FIGURE_CACHE.misses} fallos)"
+        )
+        st.caption(f"Generación de datos {STORE.generation.number} ({STORE.reloads} recargas en caliente)")
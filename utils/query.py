@@ -0,0 +1,158 @@
+"""Consultas agregadas de las series para las páginas: pandas o DuckDB embebido.
+
+Con QUERY_BACKEND=duckdb las consultas se resuelven en un DuckDB en proceso
+sobre los shards Parquet de data/parquet/<serie>/<año>.parquet (los mismos que
+se publican en Hugging Face): el filtro de medida, fechas y entidades baja al
+lector Parquet y la agregación usa varios hilos, así cada sesión sólo guarda
+el resultado agregado. Con el backend por defecto (pandas) la misma consulta
+se hace sobre el DataFrame largo que ya cargó la página.
+
+Las páginas agrupan y filtran por los ids enteros de pipeline.claves
+(central_id, generador_id, tecnologia_id) y agregan los nombres al resultado:
+
+    query(DATASET, 'Energía kWh', by=['FECHA'], fechas=rango, filtros={'generador_id': sel}, df=df)
+"""
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from utils.figure_cache import dataset_version
+
+# "pandas" (por defecto) o "duckdb"
+BACKEND = os.environ.get("QUERY_BACKEND", "pandas").lower()
+
+# Hilos y memoria de DuckDB; la memoria es el tope de todo el proceso, no por sesión
+DUCKDB_THREADS = int(os.environ.get("QUERY_THREADS", os.cpu_count() or 1))
+DUCKDB_MEMORY_LIMIT = os.environ.get("QUERY_MEMORY_LIMIT", "512MB")
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+PARQUET_DIR = DATA_DIR / "parquet"
+
+# Agregaciones admitidas: nombre de pandas → expresión SQL sobre VALOR
+AGREGACIONES = {
+    "sum": "coalesce(sum(VALOR), 0)",
+    "mean": "avg(VALOR)",
+    "min": "min(VALOR)",
+    "max": "max(VALOR)",
+    "count": "count(VALOR)",
+}
+
+
+def _valores(valor):
+    return list(valor) if isinstance(valor, (list, tuple, set, pd.Series)) else [valor]
+
+
+def query_pandas(df, measure, by=(), fechas=None, filtros=None, agg="sum", dropna=False):
+    """Implementación pandas de query() sobre el DataFrame largo de una página."""
+    by = list(by)
+    mask = df[measure].notna() if dropna else pd.Series(True, index=df.index)
+    if fechas is not None:
+        mask &= df["FECHA"].between(pd.Timestamp(fechas[0]), pd.Timestamp(fechas[1]))
+    for columna, valor in (filtros or {}).items():
+        mask &= df[columna].isin(_valores(valor))
+    sub = df.loc[mask, by + [measure]]
+    if not by:
+        return pd.DataFrame({measure: [sub[measure].agg(agg)]})
+    return sub.groupby(by, as_index=False)[measure].agg(agg)
+
+
+class DuckDBBackend:
+    """Conexión DuckDB en memoria compartida por las sesiones del proceso."""
+
+    def __init__(self, parquet_dir=PARQUET_DIR, threads=DUCKDB_THREADS, memory_limit=DUCKDB_MEMORY_LIMIT):
+        import duckdb
+
+        self.parquet_dir = Path(parquet_dir)
+        self.con = duckdb.connect()
+        self.con.execute(f"SET threads = {int(threads)}")
+        self.con.execute(f"SET memory_limit = '{memory_limit}'")
+        self._versions = {}
+        # Un lock por dataset: regenerar los shards de una serie no frena las consultas de las demás
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def preparar(self, fuentes):
+        """Regenera por adelantado los shards de los .xlsx recargados (oyente de utils.live_data)."""
+        for fuente in fuentes:
+            self._fuente(Path(fuente).stem)
+
+    def _lock_de(self, dataset):
+        with self._lock:
+            return self._locks.setdefault(dataset, threading.Lock())
+
+    def _fuente(self, dataset):
+        """Patrón de los shards del dataset, regenerándolos si el .xlsx cambió."""
+        path = DATA_DIR / f"{dataset}.xlsx"
+        version = dataset_version(path)
+        patron = self.parquet_dir / dataset / "*.parquet"
+        with self._lock_de(dataset):
+            if self._versions.get(dataset) != version:
+                if version is not None:
+                    # Los shards los escribe la publicación; si faltan o quedaron viejos se rehacen los de esta serie
+                    from pipeline.publicar import escribir_shards_serie
+
+                    escribir_shards_serie(path)
+                self._versions[dataset] = version
+        return patron.as_posix()
+
+    def query(self, dataset, measure, by=(), fechas=None, filtros=None, agg="sum", dropna=False):
+        by = list(by)
+        condiciones, parametros = ["MEDIDA = ?"], [measure]
+        if dropna:
+            condiciones.append("VALOR IS NOT NULL AND NOT isnan(VALOR)")
+        if fechas is not None:
+            condiciones.append("FECHA BETWEEN ? AND ?")
+            parametros += [pd.Timestamp(fechas[0]).to_pydatetime(), pd.Timestamp(fechas[1]).to_pydatetime()]
+        for columna, valor in (filtros or {}).items():
+            # Los shards guardan los nombres sin espacios en los extremos y los ids como enteros
+            valores = [v.strip() if isinstance(v, str) else int(v) for v in _valores(valor)]
+            condiciones.append(f'"{columna}" IN ({", ".join("?" * len(valores))})')
+            parametros += valores
+        # Como en pandas, los grupos sin valor en la columna de agrupación se descartan
+        condiciones += [f"nullif(CAST(\"{c}\" AS VARCHAR), '') IS NOT NULL" for c in by if c != "FECHA"]
+
+        columnas = ", ".join(f'"{c}"' for c in by)
+        sql = (
+            f"SELECT {columnas + ', ' if by else ''}{AGREGACIONES[agg]} AS valor "
+            f"FROM read_parquet(?) WHERE {' AND '.join(condiciones)}"
+        )
+        if by:
+            sql += f" GROUP BY {columnas} ORDER BY {columnas}"
+        # Un cursor por consulta: la conexión base no se comparte entre hilos
+        cursor = self.con.cursor()
+        try:
+            resultado = cursor.execute(sql, [self._fuente(dataset)] + parametros).df()
+        finally:
+            cursor.close()
+        return resultado.rename(columns={"valor": measure})
+
+
+_duckdb = None
+_duckdb_lock = threading.Lock()
+
+
+def duckdb_backend():
+    global _duckdb
+    with _duckdb_lock:
+        if _duckdb is None:
+            from utils.live_data import STORE
+
+            _duckdb = DuckDBBackend()
+            STORE.add_listener(_duckdb.preparar)
+    return _duckdb
+
+
+def query(dataset, measure, by=(), fechas=None, filtros=None, agg="sum", dropna=False, df=None):
+    """
+    Agrega measure por las columnas by, dentro de fechas=(inicio, fin) y con
+    filtros={columna: valor o lista}. Devuelve by + [measure], una fila por grupo.
+
+    dropna=True descarta las filas sin valor antes de agrupar, como las páginas
+    que cargan con melt_measure(..., dropna=True). df es el DataFrame largo de la
+    página y sólo lo usa el backend pandas.
+    """
+    if BACKEND == "duckdb":
+        return duckdb_backend().query(dataset, measure, by, fechas, filtros, agg, dropna)
+    return query_pandas(df, measure, by, fechas, filtros, agg, dropna)
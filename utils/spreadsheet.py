@@ -0,0 +1,392 @@
+"""Lectura de hojas de cálculo con el motor más rápido instalado.
+
+    df = read_sheet(path)                                # como pd.read_excel
+    df = read_sheet(path, usecols=[0, 1, 5], nrows=100)
+    python -m utils.spreadsheet benchmark downloads/     # compara los motores
+    write_sheet(df, path, column_formats={"FECHA": "yyyy-mm"})
+
+    for fila in iter_rows(path, columns=[0, 1, 5]):      # de a una fila
+        ...
+
+Por formato se usa el primer motor disponible: calamine (python-calamine,
+escrito en Rust) para .xlsx y .xls; si no está, openpyxl para .xlsx (pandas lo
+abre en modo read_only) y xlrd para los .xls antiguos. SPREADSHEET_ENGINE
+fuerza un motor para todas las lecturas. Los DataFrames resultantes son los
+mismos con cualquier motor.
+
+iter_rows() recorre la primera hoja fila por fila (calamine o openpyxl en modo
+read_only) quedándose sólo con las columnas pedidas; rows_to_frame() arma el
+DataFrame de las filas conservadas con la misma inferencia de tipos de pandas.
+write_sheet() escribe con memoria constante (xlsxwriter u openpyxl write_only).
+"""
+import argparse
+import functools
+import importlib.util
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+# Fuerza un motor de pandas (calamine, openpyxl, xlrd) para todas las lecturas
+FORCED_ENGINE = os.environ.get("SPREADSHEET_ENGINE") or None
+
+# Motores por extensión en orden de preferencia
+ENGINES = {
+    ".xlsx": ("calamine", "openpyxl"),
+    ".xlsm": ("calamine", "openpyxl"),
+    ".xls": ("calamine", "xlrd"),
+}
+DEFAULT_ENGINES = ("calamine", "openpyxl")
+
+# Módulo que necesita cada motor
+MODULES = {"calamine": "python_calamine", "openpyxl": "openpyxl", "xlrd": "xlrd"}
+
+
+@functools.cache
+def installed(engine):
+    return importlib.util.find_spec(MODULES[engine]) is not None
+
+
+def _suffix(source):
+    if isinstance(source, (str, os.PathLike)):
+        return Path(source).suffix.lower()
+    # Bytes o archivo abierto: el formato lo detecta el motor
+    return None
+
+
+def engine_for(source):
+    """Motor de pandas para source; None deja que pandas elija."""
+    if FORCED_ENGINE:
+        return FORCED_ENGINE
+    for engine in ENGINES.get(_suffix(source), DEFAULT_ENGINES):
+        if installed(engine):
+            return engine
+    return None
+
+
+def read_sheet(source, sheet_name=0, header=0, usecols=None, nrows=None, skiprows=None, engine=None, **kwargs):
+    """
+    pd.read_excel con el motor más rápido para el formato de source.
+
+    usecols (índices, nombres o función) y nrows limitan lo que se convierte a
+    DataFrame; el resto de los argumentos pasa tal cual a pandas.
+    """
+    return pd.read_excel(
+        source, sheet_name=sheet_name, header=header, usecols=usecols, nrows=nrows,
+        skiprows=skiprows, engine=engine or engine_for(source), **kwargs,
+    )
+
+
+# === LECTURA POR FILAS ===
+
+def _celda(valor):
+    """Valor de celda como lo entrega pandas al parser: vacío → "", float entero → int."""
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def _filas_crudas(source):
+    """Filas de la primera hoja, de a una, con el lector por filas más rápido instalado."""
+    if installed("calamine"):
+        from python_calamine import CalamineWorkbook
+
+        hoja = CalamineWorkbook.from_path(str(source)).get_sheet_by_index(0)
+        # calamine incluye las filas vacías iniciales pero no las columnas vacías iniciales
+        prefijo = [""] * (hoja.start[1] if hoja.start else 0)
+        for fila in hoja.iter_rows():
+            yield prefijo + fila
+    elif _suffix(source) == ".xls":
+        df = read_sheet(source, header=None, dtype=object, na_filter=False)
+        yield from (list(fila) for fila in df.itertuples(index=False))
+    else:
+        import openpyxl
+
+        libro = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        try:
+            yield from libro.worksheets[0].iter_rows(values_only=True)
+        finally:
+            libro.close()
+
+
+def iter_rows(source, columns=None):
+    """
+    Filas de la primera hoja como listas, leídas de a una sin armar la grilla.
+
+    columns (índices) limita cada fila a esas columnas. Como en read_sheet, las
+    celdas vacías son "" y las filas vacías del final se descartan.
+    """
+    vacias = []
+    for fila in _filas_crudas(source):
+        fila = [_celda(v) for v in fila]
+        if not any(v != "" for v in fila):
+            # Sólo se entregan si después aparece una fila con datos
+            vacias.append(fila)
+            continue
+        for vacia in vacias:
+            yield _recortar(vacia, columns)
+        vacias = []
+        yield _recortar(fila, columns)
+
+
+def _recortar(fila, columns):
+    if columns is None:
+        while fila and fila[-1] == "":
+            fila.pop()
+        return fila
+    return [fila[i] if i < len(fila) else "" for i in columns]
+
+
+def rows_to_frame(header, rows):
+    """DataFrame de las filas con header como nombres, con la misma inferencia de tipos que read_sheet."""
+    from pandas.io.parsers import TextParser
+
+    filas = [list(header)] + list(rows)
+    ancho = max(len(f) for f in filas)
+    filas = [f + [""] * (ancho - len(f)) for f in filas]
+    return TextParser(filas, header=0).read()
+
+
+# === ESCRITURA ===
+
+# Formato por defecto de las columnas de fechas (el mismo que usa pandas)
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+# Filas que se pasan a objetos de Python por vez al escribir
+WRITE_CHUNK = 1000
+
+
+def writer_engine():
+    """xlsxwriter en modo constant_memory si está instalado; si no, openpyxl write_only."""
+    forced = os.environ.get("SPREADSHEET_WRITER")
+    if forced:
+        return forced
+    return "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+
+def _vacio(valor):
+    return valor is None or valor is pd.NaT or valor is pd.NA or (isinstance(valor, float) and valor != valor)
+
+
+def _filas_de(df):
+    """Filas de df como tuplas de Python, armadas de a WRITE_CHUNK filas."""
+    for inicio in range(0, len(df), WRITE_CHUNK):
+        bloque = df.iloc[inicio:inicio + WRITE_CHUNK]
+        yield from zip(*(bloque[c].tolist() for c in bloque.columns))
+
+
+def _formatos(df, column_formats):
+    formatos = {c: DATETIME_FORMAT for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])}
+    formatos.update(column_formats or {})
+    return [formatos.get(c) for c in df.columns]
+
+
+def write_sheet(df, path, column_formats=None, sheet_name="Sheet1", engine=None):
+    """
+    Escribe df (sin índice, con encabezado) en un .xlsx fila por fila.
+
+    Ninguno de los dos motores arma el libro en memoria: xlsxwriter con
+    constant_memory vuelca cada fila al archivo temporal de la hoja apenas se
+    escribe, y openpyxl en modo write_only hace lo mismo. El tiempo crece en
+    línea con la cantidad de celdas y la memoria queda acotada por un bloque
+    de WRITE_CHUNK filas.
+    column_formats={columna: formato numérico de Excel} se aplica a toda la
+    columna; las fechas usan DATETIME_FORMAT si no se indica otro.
+    """
+    engine = engine or writer_engine()
+    formatos = _formatos(df, column_formats)
+    encabezado = [str(c) for c in df.columns]
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if engine == "xlsxwriter":
+        _write_xlsxwriter(df, path, sheet_name, encabezado, formatos)
+    elif engine == "openpyxl":
+        _write_openpyxl(df, path, sheet_name, encabezado, formatos)
+    else:
+        raise ValueError(f"Motor de escritura desconocido: {engine}")
+
+
+def _write_xlsxwriter(df, path, sheet_name, encabezado, formatos):
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(str(path), {
+        "constant_memory": True,
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "nan_inf_to_errors": True,
+    })
+    try:
+        hoja = libro.add_worksheet(sheet_name)
+        negrita = libro.add_format({"bold": True, "border": 1, "align": "center"})
+        estilos = {f: libro.add_format({"num_format": f}) for f in set(formatos) if f}
+        por_columna = [estilos.get(f) for f in formatos]
+        for j, nombre in enumerate(encabezado):
+            hoja.write_string(0, j, nombre, negrita)
+        for i, fila in enumerate(_filas_de(df), start=1):
+            for j, valor in enumerate(fila):
+                if _vacio(valor):
+                    continue
+                estilo = por_columna[j]
+                if isinstance(valor, str):
+                    hoja.write_string(i, j, valor, estilo)
+                elif isinstance(valor, bool):
+                    hoja.write_boolean(i, j, valor, estilo)
+                elif isinstance(valor, (int, float)):
+                    hoja.write_number(i, j, valor, estilo)
+                elif hasattr(valor, "year"):
+                    hoja.write_datetime(i, j, valor, estilo)
+                else:
+                    hoja.write_string(i, j, str(valor), estilo)
+    finally:
+        libro.close()
+
+
+def _write_openpyxl(df, path, sheet_name, encabezado, formatos):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(sheet_name)
+    borde = Side(style="thin")
+    celdas = []
+    for nombre in encabezado:
+        celda = WriteOnlyCell(hoja, value=nombre)
+        celda.font = Font(bold=True)
+        celda.border = Border(left=borde, right=borde, top=borde, bottom=borde)
+        celda.alignment = Alignment(horizontal="center")
+        celdas.append(celda)
+    hoja.append(celdas)
+    for fila in _filas_de(df):
+        valores = []
+        for valor, formato in zip(fila, formatos):
+            if _vacio(valor):
+                valor = None
+            if formato and valor is not None:
+                celda = WriteOnlyCell(hoja, value=valor)
+                celda.number_format = formato
+                valor = celda
+            valores.append(valor)
+        hoja.append(valores)
+    libro.save(path)
+
+
+# === BENCHMARK ===
+
+def benchmark(paths, repeticiones=1):
+    """
+    Tiempo total de lectura de cada motor instalado sobre paths, por extensión.
+
+    Verifica además que cada motor devuelve el mismo DataFrame que el de
+    referencia (el último de la lista, el que pandas usaría por defecto).
+    """
+    filas = []
+    for suffix in sorted({_suffix(p) for p in paths}):
+        archivos = [p for p in paths if _suffix(p) == suffix]
+        motores = [e for e in ENGINES.get(suffix, DEFAULT_ENGINES) if installed(e)]
+        referencia = {}
+        for engine in reversed(motores):
+            total, distintos = 0.0, 0
+            for path in archivos:
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    df = read_sheet(path, engine=engine)
+                    total += time.perf_counter() - inicio
+                if path not in referencia:
+                    referencia[path] = df
+                elif not df.equals(referencia[path]):
+                    distintos += 1
+            filas.append({
+                "formato": suffix,
+                "motor": engine,
+                "archivos": len(archivos),
+                "total_s": total / repeticiones,
+                "ms_por_archivo": 1000 * total / repeticiones / max(len(archivos), 1),
+                "distintos": distintos,
+            })
+    tabla = pd.DataFrame(filas)
+    if not tabla.empty:
+        base = tabla.groupby("formato")["total_s"].transform("first")
+        tabla["aceleracion"] = base / tabla["total_s"]
+    return tabla
+
+
+def benchmark_write(meses=(12, 60, 240), centrales=60, engines=None):
+    """
+    Escritura de una serie ancha sintética (centrales × meses) con df.to_excel
+    y con write_sheet: tiempo y pico de memoria de Python (tracemalloc).
+    """
+    import tempfile
+    import tracemalloc
+
+    import numpy as np
+
+    engines = engines or ["xlsxwriter", "openpyxl"]
+    if not importlib.util.find_spec("xlsxwriter"):
+        engines = [e for e in engines if e != "xlsxwriter"]
+    filas = []
+    rng = np.random.default_rng(0)
+    for n in meses:
+        df = pd.DataFrame({"CENTRAL": [f"Central {i}" for i in range(centrales)]})
+        periodos = pd.period_range("2000-01", periods=n, freq="M")
+        valores = pd.DataFrame(rng.random((centrales, n)) * 1e6,
+                               columns=[f"Energía kWh {p.strftime('%m%Y')}" for p in periodos])
+        df = pd.concat([df, valores], axis=1)
+        escritores = [("pandas.to_excel", lambda d, p: d.to_excel(p, index=False))]
+        escritores += [(f"write_sheet:{e}", lambda d, p, e=e: write_sheet(d, p, engine=e)) for e in engines]
+        with tempfile.TemporaryDirectory() as tmp:
+            for nombre, escribir in escritores:
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                escribir(df, Path(tmp) / "serie.xlsx")
+                segundos = time.perf_counter() - inicio
+                pico = tracemalloc.get_traced_memory()[1] / 1e6
+                tracemalloc.stop()
+                filas.append({"meses": n, "celdas": df.size, "escritor": nombre,
+                              "total_s": segundos, "pico_mb": pico})
+    return pd.DataFrame(filas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.spreadsheet")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("benchmark", help="Comparar los motores instalados sobre una carpeta")
+    bench.add_argument("carpeta", nargs="?", default="downloads", help="Carpeta con .xlsx/.xls")
+    bench.add_argument("--repeticiones", type=int, default=1, help="Lecturas de cada archivo por motor")
+    bench.add_argument("--limite", type=int, help="Medir sólo los primeros N archivos de cada formato")
+    bench_write = sub.add_parser("benchmark-write", help="Comparar escritores sobre series anchas sintéticas")
+    bench_write.add_argument("--meses", type=int, nargs="+", default=[12, 60, 240], help="Columnas mensuales")
+    bench_write.add_argument("--centrales", type=int, default=60, help="Filas de la serie")
+    args = parser.parse_args(argv)
+
+    if args.command == "benchmark-write":
+        tabla = benchmark_write(args.meses, args.centrales)
+        with pd.option_context("display.width", 200, "display.float_format", "{:.3f}".format):
+            print(tabla.to_string(index=False))
+        return 0
+
+    paths = []
+    for suffix in ENGINES:
+        encontrados = sorted(p for p in Path(args.carpeta).glob(f"*{suffix}") if not p.name.startswith("~$"))
+        paths += encontrados[:args.limite]
+    if not paths:
+        print(f"No hay hojas de cálculo en {args.carpeta}")
+        return 1
+
+    print("Motores instalados:", ", ".join(e for e in MODULES if installed(e)))
+    with warnings.catch_warnings():
+        # openpyxl avisa por cada estilo por defecto que no encuentra
+        warnings.simplefilter("ignore")
+        tabla = benchmark(paths, args.repeticiones)
+    with pd.option_context("display.width", 200, "display.float_format", "{:.3f}".format):
+        print(tabla.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
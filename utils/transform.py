@@ -0,0 +1,74 @@
+"""Transformaciones de series ancho → largo usadas por las páginas del dashboard."""
+import pandas as pd
+
+from utils.live_data import LoadError
+
+
+def parse_periods(periodos):
+    """
+    Convierte códigos de periodo MMYYYY (o MYYYY sin cero inicial) a fechas.
+
+    Solo se parsean los códigos únicos y el resultado se difunde al resto de filas,
+    de modo que el costo no crece con el número de filas.
+    """
+    periodos = pd.Series(periodos)
+    unicos = pd.Series(periodos.dropna().unique())
+    fechas = pd.to_datetime(
+        unicos.astype(str).str.strip().str.zfill(6),
+        format='%m%Y',
+        errors='coerce'
+    )
+    return periodos.map(pd.Series(fechas.values, index=unicos.values))
+
+
+def to_numeric_clean(serie):
+    """Convierte a número eliminando separadores de miles; lo no numérico queda NaN."""
+    if serie.dtype == object or pd.api.types.is_string_dtype(serie):
+        serie = serie.astype(str).str.replace(',', '', regex=False)
+    return pd.to_numeric(serie, errors='coerce')
+
+
+def melt_measure(df, measure, id_vars=('CENTRAL', 'TECNOLOGIA'), dropna=True):
+    """
+    Pasa una tabla con columnas '<measure> MMYYYY' a formato largo en un solo melt.
+
+    Devuelve las columnas FECHA, id_vars, measure y Periodo. Con dropna=True se
+    descartan las filas sin valor numérico. Si dos columnas dan el mismo código de
+    periodo (p. ej. con un espacio de más) lanza LoadError en lugar de duplicarlo.
+    """
+    id_vars = list(id_vars)
+    value_cols = [col for col in df.columns if measure in col]
+    columnas = ['FECHA'] + id_vars + [measure, 'Periodo']
+    if not value_cols:
+        return pd.DataFrame(columns=columnas)
+
+    # El código de periodo es la última palabra del nombre de la columna
+    periodos = {col: col.split()[-1].strip() for col in value_cols}
+    repetidas = pd.Series(periodos)
+    repetidas = repetidas[repetidas.duplicated(keep=False)]
+    if not repetidas.empty:
+        detalle = ", ".join(f"'{col}'" for col in repetidas.index)
+        raise LoadError(f"Columnas de {measure} con el mismo periodo: {detalle}")
+    melted = (
+        df[id_vars + value_cols]
+        .rename(columns=periodos)
+        .melt(id_vars=id_vars, var_name='Periodo', value_name=measure)
+    )
+
+    melted[measure] = to_numeric_clean(melted[measure])
+    melted['FECHA'] = parse_periods(melted['Periodo'])
+
+    subset = ['FECHA', measure] if dropna else ['FECHA']
+    melted = melted.dropna(subset=subset)
+    return melted[columnas].reset_index(drop=True)
+
+
+def names_by_id(df, id_col, name_col):
+    """
+    Nombre a mostrar de cada id de df (el de su primera fila), como Series id → nombre.
+
+    Las páginas agrupan y filtran por los ids de pipeline.claves y usan esta
+    tabla para las etiquetas y los selectores; las filas sin id no aparecen.
+    """
+    pares = df[[id_col, name_col]].dropna(subset=[id_col]).drop_duplicates(id_col)
+    return pd.Series(pares[name_col].to_numpy(), index=pares[id_col].to_numpy(), name=name_col)
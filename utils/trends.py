@@ -0,0 +1,97 @@
+"""Vistas móviles, interanuales y acumuladas precalculadas para las páginas.
+
+Leen data/estrella/tendencias.parquet (lo escribe pipeline.tendencias): cada
+rerun sólo filtra la tabla ya calculada, sin groupby ni ventanas. Si la tabla
+no está (pipeline sin correr o sin pyarrow) la sección avisa y no se dibuja.
+
+    render_system_trend(PAGE, DATASET, 'Energía kWh', selected_range)
+"""
+from pathlib import Path
+
+import pandas as pd
+import plotly.express as px
+
+from utils.charts import line_options
+from utils.figure_cache import cached_figure
+from utils.live_data import live_dataset
+from utils.perf_panel import timer
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TRENDS_FILE = DATA_DIR / "estrella" / "tendencias.parquet"
+
+# Clave en utils.live_data y nombre de dataset para la caché de figuras
+TRENDS_KEY = "tendencias"
+
+# Vista → columna de tendencias.parquet
+VIEWS = {
+    "Suma móvil 3 meses": "suma_3",
+    "Suma móvil 6 meses": "suma_6",
+    "Suma móvil 12 meses": "suma_12",
+    "Media móvil 3 meses": "media_3",
+    "Media móvil 6 meses": "media_6",
+    "Media móvil 12 meses": "media_12",
+    "Variación interanual": "interanual",
+    "Variación interanual (%)": "interanual_pct",
+    "Acumulado": "acumulado",
+}
+
+
+def _load_trends():
+    if not TRENDS_FILE.exists():
+        return None
+    try:
+        return pd.read_parquet(TRENDS_FILE)
+    except ImportError:
+        return None
+
+
+def load_trends():
+    """Tabla de tendencias de la generación actual (None si no está)."""
+    return live_dataset(TRENDS_KEY, TRENDS_KEY, _load_trends, source=TRENDS_FILE)
+
+
+def trend_series(dataset, measure, view, fechas=None, level="sistema", ids=None):
+    """FECHA y measure con los valores de la vista, para el nivel (y los ids) indicados."""
+    trends = load_trends()
+    if trends is None:
+        return None
+    mask = (trends["serie"] == dataset) & (trends["MEDIDA"] == measure) & (trends["nivel"] == level)
+    if fechas is not None:
+        mask &= trends["FECHA"].between(pd.Timestamp(fechas[0]), pd.Timestamp(fechas[1]))
+    if ids is not None:
+        mask &= trends["id"].isin(ids)
+    columna = VIEWS[view]
+    return (
+        trends.loc[mask, ["FECHA", "id", columna]]
+        .rename(columns={columna: measure})
+        .dropna(subset=[measure])
+        .reset_index(drop=True)
+    )
+
+
+def plot_trend(df, measure, view, title):
+    fig = px.line(df, x="FECHA", y=measure, title=title, **line_options(len(df)))
+    fig.update_layout(yaxis_title=f"{measure} ({view.lower()})", xaxis_title="Fecha", showlegend=False)
+    if VIEWS[view].startswith("interanual"):
+        fig.add_hline(y=0, line_dash="dot", line_color="gray")
+    return fig
+
+
+def render_system_trend(page, dataset, measure, fechas):
+    """Selector de vista y gráfico de la tendencia del sistema."""
+    import streamlit as st
+
+    view = st.selectbox("Tendencia del sistema", list(VIEWS), key=f"{page}:tendencia")
+    with timer("tendencia del sistema", "consulta"):
+        df = trend_series(dataset, measure, view, fechas)
+    if df is None:
+        st.caption("Tendencias no disponibles: se generan con `python -m pipeline.tendencias`.")
+        return
+    if df.empty:
+        st.caption(f"Sin datos suficientes para «{view}» en el rango elegido.")
+        return
+    fig = cached_figure(
+        TRENDS_KEY, (page, "tendencia", dataset, measure, view, fechas),
+        lambda: plot_trend(df, measure, view, f"{measure}: {view.lower()} del sistema"),
+    )
+    st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,113 @@
+"""Precalentamiento del dashboard al arrancar el servidor.
+
+Ejecuta cada página de pages/ sin sesión de Streamlit (modo "bare": los widgets
+devuelven su valor por defecto), así se cargan los datasets en utils.live_data,
+se calculan los agregados de la selección por defecto y se guardan sus figuras
+en utils.figure_cache. Como esas cachés son del proceso, el precalentamiento
+sirve sólo si corre en el mismo proceso que el servidor:
+
+    python -m utils.warmup serve [argumentos de streamlit run]
+    python -m utils.warmup                  # una pasada y el reporte de tiempos
+
+La primera visita después de un despliegue encuentra las cachés llenas. Si
+llega antes de que termine, espera la carga en curso de su página en lugar de
+repetirla.
+"""
+import argparse
+import logging
+import runpy
+import sys
+import threading
+import time
+from pathlib import Path
+
+from utils.instrumentation import stage
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PAGES_DIR = BASE_DIR / "pages"
+MAIN_SCRIPT = BASE_DIR / "Bienvenidos.py"
+
+# Logger de streamlit que avisa de la falta de ScriptRunContext
+CONTEXT_LOGGER = "streamlit.runtime.scriptrunner_utils.script_run_context"
+
+
+class SinContexto(logging.Filter):
+    """Descarta sólo el aviso de ScriptRunContext faltante emitido por un hilo dado."""
+
+    def __init__(self, hilo):
+        super().__init__()
+        self.hilo = hilo
+
+    def filter(self, record):
+        return not (record.thread == self.hilo and "missing ScriptRunContext" in record.getMessage())
+
+
+def pages():
+    return sorted(PAGES_DIR.glob("*.py"))
+
+
+def warm_up(paginas=None):
+    """Ejecuta las páginas una vez; devuelve {página: segundos} (None si falló)."""
+    from utils.figure_cache import FIGURE_CACHE
+    from utils.live_data import STORE
+
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    tiempos = {}
+    inicio = time.perf_counter()
+    # Sin sesión cada llamada a st.* avisa que falta el ScriptRunContext. Se filtra
+    # sólo ese aviso y sólo de este hilo: en `serve` el servidor arranca en paralelo
+    logger = logging.getLogger(CONTEXT_LOGGER)
+    filtro = SinContexto(threading.get_ident())
+    logger.addFilter(filtro)
+    try:
+        for pagina in paginas or pages():
+            pagina = Path(pagina)
+            t = time.perf_counter()
+            try:
+                with stage(f"warmup:{pagina.stem}"):
+                    runpy.run_path(str(pagina), run_name="__warmup__")
+                tiempos[pagina.stem] = time.perf_counter() - t
+            except Exception as e:
+                tiempos[pagina.stem] = None
+                print(f"[warmup] Error en {pagina.name}: {e}")
+    finally:
+        logger.removeFilter(filtro)
+
+    total = time.perf_counter() - inicio
+    for nombre, segundos in tiempos.items():
+        print(f"[warmup] {nombre}: {'error' if segundos is None else f'{segundos:.2f} s'}")
+    print(f"[warmup] {len(tiempos)} páginas en {total:.2f} s: {len(STORE.generation.entries)} datasets, "
+          f"{len(FIGURE_CACHE)} figuras ({FIGURE_CACHE.size / 1e6:,.2f} MB)")
+    return tiempos
+
+
+def warm_up_in_background(paginas=None):
+    hilo = threading.Thread(target=warm_up, args=(paginas,), name="warmup", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def serve(streamlit_args):
+    """Arranca `streamlit run Bienvenidos.py` en este proceso con el precalentamiento en paralelo."""
+    from streamlit.web import cli
+
+    warm_up_in_background()
+    sys.argv = ["streamlit", "run", str(MAIN_SCRIPT), *streamlit_args]
+    return cli.main()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.warmup", description=__doc__.split("\n")[0])
+    parser.add_argument("command", nargs="?", choices=["serve"], help="Arrancar el servidor precalentado")
+    parser.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="Argumentos para streamlit run")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve(args.streamlit_args)
+    tiempos = warm_up()
+    return 1 if None in tiempos.values() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())